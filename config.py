@@ -24,7 +24,16 @@ GEMINI_API_KEY = get_env_str("GEMINI_API_KEY")
 GROQ_API_KEY = get_env_str("GROQ_API_KEY")
 OPENROUTER_API_KEY = get_env_str("OPENROUTER_API_KEY")
 EMBEDDING_MODEL = get_env_str("EMBEDDING_MODEL", "cohere")
+EMBEDDING_BACKEND = get_env_str("EMBEDDING_BACKEND", "torch")  # Local encoder: torch, onnx or static
 SIMILARITY_THRESHOLD = get_env_float("SIMILARITY_THRESHOLD", 0.8)
+GROQ_REQUESTS_PER_MIN = get_env_int("GROQ_REQUESTS_PER_MIN", 30)
+GROQ_TOKENS_PER_MIN = get_env_int("GROQ_TOKENS_PER_MIN", 6000)
+CIRCUIT_FAILURE_THRESHOLD = get_env_int("CIRCUIT_FAILURE_THRESHOLD", 3)  # Consecutive failures before a provider is skipped
+CIRCUIT_COOLDOWN_SECONDS = get_env_float("CIRCUIT_COOLDOWN_SECONDS", 60)  # Then one probe call after this long
+ROUTER_EXPLORE_SECONDS = get_env_float("ROUTER_EXPLORE_SECONDS", 300)  # Re-measure an idle provider after this long
+LLM_HEDGING = get_env_str("LLM_HEDGING", "false").lower() == "true"  # Duplicate slow LLM calls to the next provider
+LLM_HEDGE_BUDGET = get_env_float("LLM_HEDGE_BUDGET", 0.1)  # Max share of calls that may be hedged
+LLM_CACHE_BYPASS = get_env_str("LLM_CACHE_BYPASS", "false").lower() == "true"  # Always re-query LLMs (still refreshes the cache)
 
 # Feature toggles
 ENABLE_LINKEDIN = get_env_str("ENABLE_LINKEDIN", "true").lower() == "true"
@@ -57,7 +66,16 @@ def get_config():
         "groq_api_key": GROQ_API_KEY,
         "openrouter_api_key": OPENROUTER_API_KEY,
         "embedding_model": EMBEDDING_MODEL,
+        "embedding_backend": EMBEDDING_BACKEND,
         "similarity_threshold": SIMILARITY_THRESHOLD,
+        "llm_cache_bypass": LLM_CACHE_BYPASS,
+        "groq_requests_per_min": GROQ_REQUESTS_PER_MIN,
+        "groq_tokens_per_min": GROQ_TOKENS_PER_MIN,
+        "circuit_failure_threshold": CIRCUIT_FAILURE_THRESHOLD,
+        "circuit_cooldown_seconds": CIRCUIT_COOLDOWN_SECONDS,
+        "router_explore_seconds": ROUTER_EXPLORE_SECONDS,
+        "llm_hedging": LLM_HEDGING,
+        "hedge_budget_ratio": LLM_HEDGE_BUDGET,
         "enable_linkedin": ENABLE_LINKEDIN,
         "enable_internshala": ENABLE_INTERNSHALA,
         "enable_angellist": ENABLE_ANGELLIST,
@@ -8,9 +8,15 @@ echo "📦 Packaging AI Internship Application Bot for AWS Lambda..."
 echo "🗂️  Creating package directory..."
 mkdir -p ./package
 
-# Install dependencies to the package directory
+# Install dependencies to the package directory (no torch / sentence-transformers;
+# Lambda encodes with the static embedding backend)
 echo "📚 Installing dependencies..."
-pip install -r requirements.txt -t ./package
+pip install -r requirements-lambda.txt -t ./package
+
+if [ -d ./package/torch ]; then
+    echo "❌ torch ended up in the bundle; check requirements-lambda.txt"
+    exit 1
+fi
 
 # Copy source code and configuration files
 echo "📋 Copying source files..."
@@ -18,6 +24,15 @@ cp -r src/ ./package/
 cp *.py ./package/
 cp .env ./package/  # Copy environment variables
 
+# Copy the distilled static embeddings
+STATIC_DIR="models/all-MiniLM-L6-v2-static"
+if [ ! -f "$STATIC_DIR/embeddings.npy" ]; then
+    echo "🧪 Distilling static embeddings (needs torch locally, not in the bundle)..."
+    python src/embedding_backends.py distill all-MiniLM-L6-v2 "$STATIC_DIR"
+fi
+mkdir -p "./package/$STATIC_DIR"
+cp "$STATIC_DIR/embeddings.npy" "$STATIC_DIR/tokenizer.json" "./package/$STATIC_DIR/"
+
 # Copy resume file if it exists
 if [ -f "YARRAGOLLAHARIPRASAD Resume.pdf" ]; then
     echo "📄 Copying resume file..."
@@ -43,6 +58,6 @@ echo ""
 echo "🚀 Next steps:"
 echo "1. Upload deployment.zip to AWS Lambda"
 echo "2. Set the handler to 'lambda_handler.handler'"
-echo "3. Configure environment variables in the Lambda console"
+echo "3. Configure environment variables in the Lambda console (set EMBEDDING_BACKEND=static)"
 echo "4. Set up an EventBridge rule to trigger the Lambda function every 3 hours"
 echo ""
\ No newline at end of file
@@ -1,31 +1,101 @@
+import asyncio
 import json
-import requests
+import os
+import time
 import openai
 import google.generativeai as genai
 import cohere
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from typing import Dict, List, Optional, Any
 import logging
+import threading
+try:
+    from .embedding_cache import get_embedding_cache
+    from .http_clients import get_http_stats, get_provider_session
+    from .provider_router import ProviderRouter
+    from .rate_limiter import ProviderLimiter, retry_after_seconds
+    from .response_cache import get_response_cache
+except ImportError:
+    # Imported as a top-level module by the scripts run from src/
+    from embedding_cache import get_embedding_cache
+    from http_clients import get_http_stats, get_provider_session
+    from provider_router import ProviderRouter
+    from rate_limiter import ProviderLimiter, retry_after_seconds
+    from response_cache import get_response_cache
 
 class MultiAgentAI:
     """Multi-agent AI system using different models for specialized tasks."""
     
+    COHERE_EMBED_MODEL = "embed-english-v3.0"
+    OPENAI_EMBED_MODEL = "text-embedding-ada-002"
+    OPENAI_EMBED_DIM = 1536
+    # Per-request input limits of the embeddings endpoint, kept below the hard caps
+    OPENAI_EMBED_MAX_INPUTS = 2048
+    OPENAI_EMBED_MAX_INPUT_TOKENS = 8191
+    OPENAI_EMBED_BATCH_TOKENS = 100000
+    OPENAI_EMBED_CONCURRENCY = 4
+    OPENAI_EMBED_TIMEOUT = 60
+    # Default (requests/min, tokens/min) per provider for concurrent calls; override with
+    # config keys like 'groq_requests_per_min' / 'groq_tokens_per_min'
+    RATE_LIMITS = {'groq': (30, 6000), 'gemini': (15, 1000000)}
+    RATE_LIMIT_RETRIES = 3
+    # Providers per task in default preference order; the router reorders them by measured latency
+    PROVIDER_ROUTES = {
+        'resume_parse': ['groq', 'gemini'],
+        'job_analysis': ['groq', 'gemini'],
+        'cover_letter': ['openrouter', 'openai'],
+    }
+    # Hedging: duplicate a call to the next provider once it runs past the leader's rolling p90
+    HEDGE_PERCENTILE = 0.9
+    HEDGE_MIN_SAMPLES = 5
+    HEDGE_WORKERS = 8
+    
     def __init__(self, config: Dict):
         """Initialize the multi-agent AI system."""
         self.config = config
         self.logger = logging.getLogger(__name__)
+        # Identical prompts are answered from disk unless the cache is bypassed
+        self.response_cache = get_response_cache()
+        self.bypass_cache = bool(config.get('llm_cache_bypass', False))
+        self._rate_limiters: Dict[str, ProviderLimiter] = {}
+        self.router = ProviderRouter(
+            self.PROVIDER_ROUTES,
+            failure_threshold=int(config.get('circuit_failure_threshold') or 3),
+            cooldown=float(config.get('circuit_cooldown_seconds') or 60),
+            explore_after=float(config.get('router_explore_seconds') or 300),
+        )
+        # Opt-in; hedges are capped at hedge_budget_ratio of routed calls (plus one)
+        self.hedging = bool(config.get('llm_hedging', False))
+        self.hedge_budget_ratio = float(config.get('hedge_budget_ratio') or 0.1)
+        self._hedge_pool = None
+        self._hedge_lock = threading.Lock()
+        self.hedge_stats = {'calls': 0, 'hedged': 0, 'hedge_wins': 0, 'over_budget': 0, 'cancelled': 0}
         
         # Initialize API clients
         self._setup_apis()
         
     def _setup_apis(self):
         """Setup all API clients."""
+        # Keep-alive sessions with bounded pools and timeouts for the HTTP providers
+        pool_size = int(self.config.get('http_pool_size') or os.getenv('LLM_HTTP_POOL_SIZE', 8))
+        connect_timeout = float(self.config.get('http_connect_timeout') or os.getenv('LLM_CONNECT_TIMEOUT', 5))
+        read_timeout = float(self.config.get('http_read_timeout') or os.getenv('LLM_READ_TIMEOUT', 60))
+        self.http = {
+            name: get_provider_session(name, pool_size, connect_timeout, read_timeout)
+            for name in ("groq", "openrouter", "openai")
+        }
+        
         try:
             # OpenAI
             openai.api_key = self.config['openai_api_key']
+            self.openai_api_key = self.config['openai_api_key']
+            self.openai_base_url = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1").rstrip("/")
+            self._openai_embed_pool = None
             
             # Gemini
             genai.configure(api_key=self.config['gemini_api_key'])
-            self.gemini_model = genai.GenerativeModel('gemini-2.0-flash-exp')
+            self.gemini_model_name = 'gemini-2.0-flash-exp'
+            self.gemini_model = genai.GenerativeModel(self.gemini_model_name)
             
             # Cohere
             self.cohere_client = cohere.Client(self.config['cohere_api_key'])
@@ -41,112 +111,247 @@ class MultiAgentAI:
         except Exception as e:
             self.logger.error(f"Error setting up APIs: {e}")
     
-    def parse_resume_with_groq(self, resume_text: str) -> Dict:
-        """Parse resume using Groq (LLaMA 3) for structured extraction."""
+    @staticmethod
+    def _extract_json(content: str) -> Dict:
+        """The outermost {...} object in an LLM response (raises json.JSONDecodeError if there is none)."""
+        start = content.find('{')
+        end = content.rfind('}') + 1
+        return json.loads(content[start:end])
+    
+    @classmethod
+    def _extract_resume_json(cls, content: str) -> Dict:
+        """Parsed resume JSON; raises ValueError unless it lists at least one skill."""
+        parsed = cls._extract_json(content)
+        skills = parsed.get('skills') if isinstance(parsed, dict) else None
+        if not isinstance(skills, list) or not skills:
+            raise ValueError("resume JSON has no skills")
+        return parsed
+    
+    def _cached_completion(self, task: str, provider: str, model: str, prompt: str, params: Dict,
+                           call, bypass_cache: bool = False, validate=None, lookup: bool = True) -> str:
+        """
+        Response text for ``prompt``, from the response cache or from ``call()``.
+        
+        A fresh response is only stored once ``validate`` (if given) accepts it, so
+        unparseable answers are never replayed. Bypassing skips the lookup but still
+        stores the fresh response. ``lookup=False`` is for callers that already
+        checked the cache (or noted the bypass) themselves.
+        """
+        if not lookup:
+            pass
+        elif bypass_cache or self.bypass_cache:
+            self.response_cache.note_bypass(task)
+        else:
+            cached = self.response_cache.get(task, provider, model, prompt, params)
+            if cached is not None:
+                self.logger.info(f"💾 Using cached {provider} response for {task}")
+                return cached
+        start = time.perf_counter()
         try:
-            prompt = f"""
-            Analyze the following resume and extract structured information in JSON format.
-            
-            Resume:
-            {resume_text}
-            
-            Extract and return ONLY a JSON object with the following structure:
-            {{
-                "skills": ["skill1", "skill2", "skill3"],
-                "soft_skills": ["soft_skill1", "soft_skill2"],
-                "education": "degree and institution",
-                "experience": ["experience1", "experience2"],
-                "certifications": ["cert1", "cert2"],
-                "domains": ["domain1", "domain2"]
-            }}
-            
-            Rules:
-            - Only return valid JSON
-            - Extract technical skills (programming languages, tools, frameworks)
-            - Extract soft skills (communication, leadership, etc.)
-            - Include education level and institution
-            - List relevant work/internship experiences
-            - Include certifications and courses
-            - Identify career domains of interest
-            """
-            
-            headers = {
-                "Authorization": f"Bearer {self.groq_api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            data = {
-                "model": "llama3-70b-8192",
-                "messages": [{"role": "user", "content": prompt}],
-                "temperature": 0.1,
-                "max_tokens": 1000
-            }
-            
-            response = requests.post(self.groq_url, headers=headers, json=data)
-            response.raise_for_status()
-            
-            result = response.json()
-            content = result['choices'][0]['message']['content']
-            
-            # Extract JSON from response
+            content = call()
+            if validate is not None:
+                validate(content)
+        except Exception:
+            self.router.record(task, provider, time.perf_counter() - start, ok=False)
+            raise
+        self.router.record(task, provider, time.perf_counter() - start, ok=True)
+        self.response_cache.put(task, provider, model, prompt, content, params)
+        return content
+    
+    def _route(self, task: str, attempts: Dict[str, Any], default):
+        """
+        Run ``task`` on the best available provider, falling through the router's order.
+        
+        ``attempts`` maps provider -> zero-argument callable that raises on failure.
+        Returns (provider, result), or (None, default()) if every provider failed.
+        """
+        if self.hedging:
+            return self._route_hedged(task, attempts, default)
+        for provider in self.router.order(task):
+            if provider not in attempts or not self.router.allow(task, provider):
+                continue
             try:
-                # Find JSON in the response
-                start = content.find('{')
-                end = content.rfind('}') + 1
-                json_str = content[start:end]
-                parsed_data = json.loads(json_str)
-                
-                self.logger.info("✅ Resume parsed successfully with Groq")
-                return parsed_data
-                
-            except json.JSONDecodeError:
-                self.logger.warning("⚠️ Failed to parse JSON from Groq response, trying Gemini")
-                return self.parse_resume_with_gemini(resume_text)
-                
-        except Exception as e:
-            self.logger.error(f"❌ Error parsing resume with Groq: {e}")
-            return self.parse_resume_with_gemini(resume_text)
+                return provider, attempts[provider]()
+            except Exception as e:
+                self.logger.warning(f"⚠️ {provider} failed for {task}: {e}")
+        return None, default()
+    
+    def _launch_hedge(self, launch) -> Optional[str]:
+        """Start a backup call if the budget allows; the budget is only charged when one is submitted."""
+        with self._hedge_lock:
+            if self.hedge_stats['hedged'] + 1 > self.hedge_budget_ratio * self.hedge_stats['calls'] + 1:
+                self.hedge_stats['over_budget'] += 1
+                return None
+            backup = launch()
+            if backup is not None:
+                self.hedge_stats['hedged'] += 1
+            return backup
+    
+    def _route_hedged(self, task: str, attempts: Dict[str, Any], default):
+        """
+        Like _route, but once the leading call outlives its provider's rolling p90 a
+        duplicate goes to the next provider and the first good answer wins.
+        
+        A losing call that has not started is cancelled; one already in flight is
+        abandoned (its result is discarded, bounded by the HTTP read timeout).
+        """
+        if self._hedge_pool is None:
+            self._hedge_pool = ThreadPoolExecutor(max_workers=self.HEDGE_WORKERS, thread_name_prefix="hedge")
+        with self._hedge_lock:
+            self.hedge_stats['calls'] += 1
+        pending = [provider for provider in self.router.order(task) if provider in attempts]
+        running = {}
+        
+        def launch():
+            while pending:
+                provider = pending.pop(0)
+                if self.router.allow(task, provider):
+                    running[self._hedge_pool.submit(attempts[provider])] = provider
+                    return provider
+            return None
+        
+        leader = launch()
+        started = time.perf_counter()
+        hedged = False
+        while running:
+            timeout = None
+            if not hedged and pending and leader is not None:
+                p90 = self.router.latency_percentile(task, leader, self.HEDGE_PERCENTILE, self.HEDGE_MIN_SAMPLES)
+                if p90 is not None:
+                    timeout = max(0.0, p90 - (time.perf_counter() - started))
+            done, _ = wait(list(running), timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                hedged = True
+                backup = self._launch_hedge(launch)
+                if backup is not None:
+                    self.logger.info(f"🔀 {leader} passed its p90 for {task}, hedging with {backup}")
+                continue
+            for future in done:
+                provider = running.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    self.logger.warning(f"⚠️ {provider} failed for {task}: {e}")
+                    continue
+                for loser in running:
+                    if loser.cancel():
+                        with self._hedge_lock:
+                            self.hedge_stats['cancelled'] += 1
+                if hedged and provider != leader:
+                    with self._hedge_lock:
+                        self.hedge_stats['hedge_wins'] += 1
+                return provider, result
+            if not running:
+                # Every call so far failed: fall back to the next provider as usual
+                leader, started, hedged = launch(), time.perf_counter(), False
+        return None, default()
+    
+    def get_hedge_stats(self) -> Dict:
+        with self._hedge_lock:
+            stats = dict(self.hedge_stats)
+        stats['hedge_rate'] = round(stats['hedged'] / stats['calls'], 4) if stats['calls'] else 0.0
+        return stats
     
-    def parse_resume_with_gemini(self, resume_text: str) -> Dict:
-        """Parse resume using Gemini Pro 2.5 as fallback."""
+    def _groq_completion(self, data: Dict) -> str:
+        headers = {
+            "Authorization": f"Bearer {self.groq_api_key}",
+            "Content-Type": "application/json"
+        }
+        response = self.http['groq'].post(self.groq_url, headers=headers, json=data)
+        response.raise_for_status()
+        return response.json()['choices'][0]['message']['content']
+    
+    def parse_resume(self, resume_text: str, bypass_cache: bool = False) -> Dict:
+        """Parse resume on the fastest healthy provider (Groq, then Gemini, by default)."""
+        provider, parsed_data = self._route('resume_parse', {
+            'groq': lambda: self._parse_resume_groq(resume_text, bypass_cache),
+            'gemini': lambda: self._parse_resume_gemini(resume_text, bypass_cache),
+        }, self._default_resume_structure)
+        if provider:
+            self.logger.info(f"✅ Resume parsed successfully with {provider.capitalize()}")
+        else:
+            self.logger.error("❌ Error parsing resume: no provider returned valid JSON with skills")
+        return parsed_data
+    
+    def parse_resume_with_groq(self, resume_text: str, bypass_cache: bool = False) -> Dict:
+        """Parse resume, preferring Groq (LLaMA 3); routed with Gemini as the alternative."""
+        return self.parse_resume(resume_text, bypass_cache)
+    
+    def parse_resume_with_gemini(self, resume_text: str, bypass_cache: bool = False) -> Dict:
+        """Parse resume using Gemini only."""
         try:
-            prompt = f"""
-            Analyze this resume and extract structured information:
-            
-            {resume_text}
-            
-            Return ONLY a JSON object with this exact structure:
-            {{
-                "skills": ["skill1", "skill2", "skill3"],
-                "soft_skills": ["soft_skill1", "soft_skill2"],
-                "education": "degree and institution",
-                "experience": ["experience1", "experience2"],
-                "certifications": ["cert1", "cert2"],
-                "domains": ["domain1", "domain2"]
-            }}
-            """
-            
-            response = self.gemini_model.generate_content(prompt)
-            content = response.text
-            
-            # Extract JSON from response
-            try:
-                start = content.find('{')
-                end = content.rfind('}') + 1
-                json_str = content[start:end]
-                parsed_data = json.loads(json_str)
-                
-                self.logger.info("✅ Resume parsed successfully with Gemini")
-                return parsed_data
-                
-            except json.JSONDecodeError:
-                self.logger.error("❌ Failed to parse JSON from Gemini response")
-                return self._default_resume_structure()
-                
+            parsed_data = self._parse_resume_gemini(resume_text, bypass_cache)
+            self.logger.info("✅ Resume parsed successfully with Gemini")
+            return parsed_data
         except Exception as e:
             self.logger.error(f"❌ Error parsing resume with Gemini: {e}")
             return self._default_resume_structure()
     
+    def _parse_resume_groq(self, resume_text: str, bypass_cache: bool = False) -> Dict:
+        """Structured extraction with Groq (LLaMA 3); raises on failure."""
+        prompt = f"""
+        Analyze the following resume and extract structured information in JSON format.
+        
+        Resume:
+        {resume_text}
+        
+        Extract and return ONLY a JSON object with the following structure:
+        {{
+            "skills": ["skill1", "skill2", "skill3"],
+            "soft_skills": ["soft_skill1", "soft_skill2"],
+            "education": "degree and institution",
+            "experience": ["experience1", "experience2"],
+            "certifications": ["cert1", "cert2"],
+            "domains": ["domain1", "domain2"]
+        }}
+        
+        Rules:
+        - Only return valid JSON
+        - Extract technical skills (programming languages, tools, frameworks)
+        - Extract soft skills (communication, leadership, etc.)
+        - Include education level and institution
+        - List relevant work/internship experiences
+        - Include certifications and courses
+        - Identify career domains of interest
+        """
+        
+        data = {
+            "model": "llama3-70b-8192",
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": 0.1,
+            "max_tokens": 1000
+        }
+        params = {"temperature": data["temperature"], "max_tokens": data["max_tokens"]}
+        content = self._cached_completion(
+            'resume_parse', 'groq', data['model'], prompt, params,
+            lambda: self._groq_completion(data), bypass_cache, validate=self._extract_resume_json
+        )
+        return self._extract_resume_json(content)
+    
+    def _parse_resume_gemini(self, resume_text: str, bypass_cache: bool = False) -> Dict:
+        """Structured extraction with Gemini; raises on failure."""
+        prompt = f"""
+        Analyze this resume and extract structured information:
+        
+        {resume_text}
+        
+        Return ONLY a JSON object with this exact structure:
+        {{
+            "skills": ["skill1", "skill2", "skill3"],
+            "soft_skills": ["soft_skill1", "soft_skill2"],
+            "education": "degree and institution",
+            "experience": ["experience1", "experience2"],
+            "certifications": ["cert1", "cert2"],
+            "domains": ["domain1", "domain2"]
+        }}
+        """
+        
+        content = self._cached_completion(
+            'resume_parse', 'gemini', self.gemini_model_name, prompt, {},
+            lambda: self.gemini_model.generate_content(prompt).text, bypass_cache, validate=self._extract_resume_json
+        )
+        return self._extract_resume_json(content)
+    
     def _default_resume_structure(self) -> Dict:
         """Return default resume structure if parsing fails."""
         return {
@@ -240,27 +445,13 @@ class MultiAgentAI:
             # Log the number of texts being processed
             self.logger.info(f"Generating Cohere embeddings for {len(filtered_texts)} texts")
             
-            # Initialize Cohere client and generate embeddings
+            # Only texts missing from the shared embedding cache reach the Cohere API
+            expected_dim = 1024  # Cohere embed-english-v3.0 should be 1024 dimensions
             try:
-                response = self.cohere_client.embed(
-                    texts=filtered_texts,
-                    model="embed-english-v3.0",
-                    input_type="search_document"
+                embeddings = get_embedding_cache().get_or_compute(
+                    "cohere", self.COHERE_EMBED_MODEL, filtered_texts, self._embed_with_cohere
                 )
-                embeddings = response.embeddings
-                
-                # Verify all embeddings have the expected dimension - STRICT enforcement
-                expected_dim = 1024  # Cohere embed-english-v3.0 should be 1024 dimensions
-                
-                for i, emb in enumerate(embeddings):
-                    if len(emb) != expected_dim:
-                        self.logger.warning(f"⚠️ Cohere returned unexpected dimension: {len(emb)}, expected {expected_dim}")
-                        # Instead of raising error, try to pad or truncate to expected dimension
-                        if len(emb) > expected_dim:
-                            embeddings[i] = emb[:expected_dim]  # Truncate
-                        else:
-                            # Pad with zeros
-                            embeddings[i] = emb + [0.0] * (expected_dim - len(emb))
+                embeddings = [emb.tolist() for emb in embeddings]
                 
                 self.logger.info(f"✅ Generated {len(embeddings)} Cohere embeddings with dimension {expected_dim}")
                 return embeddings
@@ -274,7 +465,74 @@ class MultiAgentAI:
             # If all else fails, return empty list
             return []
 
+    def _embed_with_cohere(self, texts: List[str]) -> List[List[float]]:
+        """Call Cohere for the given texts, forcing every vector to 1024 dimensions."""
+        response = self.cohere_client.embed(
+            texts=texts,
+            model=self.COHERE_EMBED_MODEL,
+            input_type="search_document"
+        )
+        embeddings = response.embeddings
+        
+        # Verify all embeddings have the expected dimension - STRICT enforcement
+        expected_dim = 1024  # Cohere embed-english-v3.0 should be 1024 dimensions
+        
+        for i, emb in enumerate(embeddings):
+            if len(emb) != expected_dim:
+                self.logger.warning(f"⚠️ Cohere returned unexpected dimension: {len(emb)}, expected {expected_dim}")
+                # Instead of raising error, try to pad or truncate to expected dimension
+                if len(emb) > expected_dim:
+                    embeddings[i] = emb[:expected_dim]  # Truncate
+                else:
+                    # Pad with zeros
+                    embeddings[i] = emb + [0.0] * (expected_dim - len(emb))
+        return embeddings
+
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        """Conservative token estimate (about 3 characters per token for English text)."""
+        return len(text) // 3 + 1
+
+    def _openai_embedding_batches(self, texts: List[str], indices: List[int]) -> List[List[int]]:
+        """Group text indices into requests that respect the input-count and token budgets."""
+        batches, current, current_tokens = [], [], 0
+        for i in indices:
+            tokens = min(self._estimate_tokens(texts[i]), self.OPENAI_EMBED_MAX_INPUT_TOKENS)
+            if current and (len(current) >= self.OPENAI_EMBED_MAX_INPUTS
+                            or current_tokens + tokens > self.OPENAI_EMBED_BATCH_TOKENS):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(i)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    def _embed_openai_batch(self, texts: List[str]) -> List[List[float]]:
+        """One embeddings request; returns vectors in the order of ``texts``."""
+        max_chars = self.OPENAI_EMBED_MAX_INPUT_TOKENS * 3
+        response = self.http['openai'].post(
+            f"{self.openai_base_url}/embeddings",
+            headers={
+                "Authorization": f"Bearer {self.openai_api_key}",
+                "Content-Type": "application/json"
+            },
+            json={"model": self.OPENAI_EMBED_MODEL, "input": [text[:max_chars] for text in texts]},
+            timeout=(self.http['openai'].timeout[0], self.OPENAI_EMBED_TIMEOUT)
+        )
+        response.raise_for_status()
+        data = sorted(response.json()['data'], key=lambda item: item['index'])
+        if len(data) != len(texts):
+            raise ValueError(f"got {len(data)} embeddings for {len(texts)} inputs")
+        return [item['embedding'] for item in data]
+
     def generate_embeddings_with_openai(self, texts: List[str]) -> List[List[float]]:
+        """
+        Generate OpenAI embeddings in token-budgeted batches, a few requests at a time.
+
+        Results line up with ``texts``; a text whose batch failed or whose vector has the
+        wrong dimension gets an empty list in its slot.
+        """
         try:
             # Check for empty texts
             if not texts or all(not text.strip() for text in texts):
@@ -284,127 +542,178 @@ class MultiAgentAI:
             # Log the number of texts being processed
             self.logger.info(f"Generating OpenAI embeddings for {len(texts)} texts")
             
-            embeddings = []
-            expected_dim = 1536  # OpenAI text-embedding-ada-002 should be 1536 dimensions
-            
-            for i, text in enumerate(texts):
-                try:
-                    response = openai.Embedding.create(
-                        input=text,
-                        model="text-embedding-ada-002"
+            expected_dim = self.OPENAI_EMBED_DIM  # text-embedding-ada-002 should be 1536 dimensions
+            cache = get_embedding_cache()
+            cached = cache.get_many("openai", self.OPENAI_EMBED_MODEL, texts)
+            embeddings = [vector.tolist() if vector is not None else [] for vector in cached]
+            missing = [i for i, vector in enumerate(cached) if vector is None]
+            
+            batches = self._openai_embedding_batches(texts, missing)
+            if batches:
+                if self._openai_embed_pool is None:
+                    self._openai_embed_pool = ThreadPoolExecutor(
+                        max_workers=self.config.get('openai_embed_concurrency', self.OPENAI_EMBED_CONCURRENCY),
+                        thread_name_prefix="openai-embed"
                     )
-                    emb = response['data'][0]['embedding']
-                    
-                    # Verify embedding dimension
-                    if len(emb) != expected_dim:
-                        self.logger.error(
-                            f"❌ OpenAI embedding dimension mismatch for text {i}: got {len(emb)}, expected {expected_dim}"
-                        )
+                futures = [
+                    self._openai_embed_pool.submit(self._embed_openai_batch, [texts[i] for i in batch])
+                    for batch in batches
+                ]
+                for batch, future in zip(batches, futures):
+                    try:
+                        vectors = future.result()
+                    except Exception as batch_error:
+                        self.logger.error(f"❌ OpenAI embedding failed for texts {batch[0]}-{batch[-1]}: {batch_error}")
                         continue
-                        
-                    embeddings.append(emb)
-                except Exception as text_error:
-                    self.logger.error(f"❌ OpenAI embedding failed for text {i}: {text_error}")
+                    for i, emb in zip(batch, vectors):
+                        # Verify embedding dimension
+                        if len(emb) != expected_dim:
+                            self.logger.error(
+                                f"❌ OpenAI embedding dimension mismatch for text {i}: got {len(emb)}, expected {expected_dim}"
+                            )
+                            continue
+                        embeddings[i] = emb
+                    cache.put_many(
+                        "openai", self.OPENAI_EMBED_MODEL,
+                        [texts[i] for i in batch if embeddings[i]], [embeddings[i] for i in batch if embeddings[i]]
+                    )
             
             # Check if we got embeddings for all texts
-            if len(embeddings) != len(texts):
-                self.logger.warning(f"⚠️ Only generated {len(embeddings)}/{len(texts)} OpenAI embeddings")
+            generated = sum(1 for emb in embeddings if emb)
+            if generated != len(texts):
+                self.logger.warning(f"⚠️ Only generated {generated}/{len(texts)} OpenAI embeddings")
                 
             # If we didn't get any embeddings, return empty list
-            if not embeddings:
+            if not generated:
                 self.logger.error("❌ Failed to generate any OpenAI embeddings")
                 return []
                 
-            self.logger.info(f"✅ Generated {len(embeddings)} OpenAI embeddings with dimension {expected_dim}")
+            self.logger.info(f"✅ Generated {generated} OpenAI embeddings with dimension {expected_dim} "
+                             f"in {len(batches)} requests")
             return embeddings
             
         except Exception as e:
             self.logger.error(f"❌ OpenAI embedding failed: {e}")
             return []
 
-    def generate_cover_letter_with_openrouter(self, job_description: str, resume_data: Dict, company: str, position: str) -> str:
-        """Generate professional cover letter using OpenRouter (Claude/Mistral)."""
-        try:
-            prompt = f"""
-            Create a professional, personalized cover letter for the following position:
-            
-            Position: {position}
-            Company: {company}
-            Job Description: {job_description}
-            
-            Candidate Information:
-            - Skills: {', '.join(resume_data.get('skills', []))}
-            - Experience: {', '.join(resume_data.get('experience', []))}
-            - Education: {resume_data.get('education', '')}
-            - Certifications: {', '.join(resume_data.get('certifications', []))}
-            
-            Requirements:
-            - Professional and engaging tone
-            - Highlight relevant skills and experience
-            - Show enthusiasm for the role and company
-            - Keep it concise (200-300 words)
-            - Include specific examples from experience
-            - Address how you can contribute to the company
-            """
-            
-            headers = {
-                "Authorization": f"Bearer {self.openrouter_api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            data = {
-                "model": "anthropic/claude-3.5-sonnet",
-                "messages": [{"role": "user", "content": prompt}],
-                "temperature": 0.7,
-                "max_tokens": 500
-            }
-            
-            response = requests.post(self.openrouter_url, headers=headers, json=data)
-            response.raise_for_status()
-            
-            result = response.json()
-            cover_letter = result['choices'][0]['message']['content']
-            
-            self.logger.info("✅ Cover letter generated successfully with OpenRouter")
-            return cover_letter
-            
-        except Exception as e:
-            self.logger.error(f"❌ Error generating cover letter with OpenRouter: {e}")
-            return self.generate_cover_letter_with_openai(job_description, resume_data, company, position)
+    def generate_cover_letter(self, job_description: str, resume_data: Dict, company: str, position: str,
+                              bypass_cache: bool = False) -> str:
+        """Generate cover letter on the fastest healthy provider (OpenRouter, then OpenAI, by default)."""
+        provider, cover_letter = self._route('cover_letter', {
+            'openrouter': lambda: self._cover_letter_openrouter(job_description, resume_data, company, position, bypass_cache),
+            'openai': lambda: self._cover_letter_openai(job_description, resume_data, company, position, bypass_cache),
+        }, lambda: self._default_cover_letter(company, position))
+        if provider:
+            self.logger.info(f"✅ Cover letter generated successfully with {'OpenRouter' if provider == 'openrouter' else 'OpenAI'}")
+        else:
+            self.logger.error("❌ Error generating cover letter: every provider failed")
+        return cover_letter
+    
+    def generate_cover_letter_with_openrouter(self, job_description: str, resume_data: Dict, company: str, position: str,
+                                              bypass_cache: bool = False) -> str:
+        """Generate cover letter, preferring OpenRouter (Claude/Mistral); routed with OpenAI as the alternative."""
+        return self.generate_cover_letter(job_description, resume_data, company, position, bypass_cache)
     
-    def generate_cover_letter_with_openai(self, job_description: str, resume_data: Dict, company: str, position: str) -> str:
-        """Generate cover letter using OpenAI as fallback."""
+    def generate_cover_letter_with_openai(self, job_description: str, resume_data: Dict, company: str, position: str,
+                                          bypass_cache: bool = False) -> str:
+        """Generate cover letter using OpenAI only."""
         try:
-            prompt = f"""
-            Create a professional cover letter for:
-            Position: {position}
-            Company: {company}
-            
-            Job Description: {job_description}
-            
-            My Background:
-            - Skills: {', '.join(resume_data.get('skills', []))}
-            - Experience: {', '.join(resume_data.get('experience', []))}
-            - Education: {resume_data.get('education', '')}
-            
-            Make it professional, engaging, and tailored to the role.
-            """
-            
-            response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=400,
-                temperature=0.7
-            )
-            
-            cover_letter = response.choices[0].message.content
+            cover_letter = self._cover_letter_openai(job_description, resume_data, company, position, bypass_cache)
             self.logger.info("✅ Cover letter generated successfully with OpenAI")
             return cover_letter
-            
         except Exception as e:
             self.logger.error(f"❌ Error generating cover letter with OpenAI: {e}")
             return self._default_cover_letter(company, position)
     
+    def _cover_letter_openrouter(self, job_description: str, resume_data: Dict, company: str, position: str,
+                                 bypass_cache: bool = False) -> str:
+        """Professional cover letter from OpenRouter (Claude/Mistral); raises on failure."""
+        prompt = f"""
+        Create a professional, personalized cover letter for the following position:
+        
+        Position: {position}
+        Company: {company}
+        Job Description: {job_description}
+        
+        Candidate Information:
+        - Skills: {', '.join(resume_data.get('skills', []))}
+        - Experience: {', '.join(resume_data.get('experience', []))}
+        - Education: {resume_data.get('education', '')}
+        - Certifications: {', '.join(resume_data.get('certifications', []))}
+        
+        Requirements:
+        - Professional and engaging tone
+        - Highlight relevant skills and experience
+        - Show enthusiasm for the role and company
+        - Keep it concise (200-300 words)
+        - Include specific examples from experience
+        - Address how you can contribute to the company
+        """
+        
+        headers = {
+            "Authorization": f"Bearer {self.openrouter_api_key}",
+            "Content-Type": "application/json"
+        }
+        
+        data = {
+            "model": "anthropic/claude-3.5-sonnet",
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": 0.7,
+            "max_tokens": 500
+        }
+        
+        def call():
+            response = self.http['openrouter'].post(self.openrouter_url, headers=headers, json=data)
+            response.raise_for_status()
+            return response.json()['choices'][0]['message']['content']
+        
+        cover_letter = self._cached_completion(
+            'cover_letter', 'openrouter', data['model'], prompt,
+            {"temperature": data["temperature"], "max_tokens": data["max_tokens"]}, call, bypass_cache
+        )
+        return cover_letter
+    
+    def _cover_letter_openai(self, job_description: str, resume_data: Dict, company: str, position: str,
+                             bypass_cache: bool = False) -> str:
+        """Cover letter from OpenAI; raises on failure."""
+        prompt = f"""
+        Create a professional cover letter for:
+        Position: {position}
+        Company: {company}
+        
+        Job Description: {job_description}
+        
+        My Background:
+        - Skills: {', '.join(resume_data.get('skills', []))}
+        - Experience: {', '.join(resume_data.get('experience', []))}
+        - Education: {resume_data.get('education', '')}
+        
+        Make it professional, engaging, and tailored to the role.
+        """
+        
+        headers = {
+            "Authorization": f"Bearer {self.openai_api_key}",
+            "Content-Type": "application/json"
+        }
+        
+        data = {
+            "model": "gpt-3.5-turbo",
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": 0.7,
+            "max_tokens": 400
+        }
+        
+        def call():
+            response = self.http['openai'].post(f"{self.openai_base_url}/chat/completions", headers=headers, json=data)
+            response.raise_for_status()
+            return response.json()['choices'][0]['message']['content']
+        
+        cover_letter = self._cached_completion(
+            'cover_letter', 'openai', data['model'], prompt,
+            {"temperature": data["temperature"], "max_tokens": data["max_tokens"]}, call, bypass_cache
+        )
+        return cover_letter
+    
     def _default_cover_letter(self, company: str, position: str) -> str:
         """Return a default cover letter if generation fails."""
         return f"""
@@ -420,12 +729,22 @@ class MultiAgentAI:
         [Your Name]
         """
     
+    def get_routing_stats(self) -> Dict:
+        """Per task and provider: breaker state, rolling latency, error rate and routing counts."""
+        return self.router.get_stats()
+    
+    def get_http_stats(self) -> Dict[str, Dict]:
+        """Per-provider request counts, latency percentiles and pool wait times."""
+        return get_http_stats()
+    
     def calculate_similarity_score(self, resume_embedding: List[float], job_embedding: List[float]) -> float:
         import numpy as np
         try:
             # Check if embeddings are empty
-            if not resume_embedding or not job_embedding:
-                self.logger.error(f"❌ Empty embeddings detected: resume={bool(resume_embedding)}, job={bool(job_embedding)}")
+            resume_empty = resume_embedding is None or len(resume_embedding) == 0
+            job_empty = job_embedding is None or len(job_embedding) == 0
+            if resume_empty or job_empty:
+                self.logger.error(f"❌ Empty embeddings detected: resume={not resume_empty}, job={not job_empty}")
                 return 0.0
                 
             # Check for dimension mismatch
@@ -466,10 +785,8 @@ class MultiAgentAI:
             self.logger.error(f"❌ Error calculating similarity score: {e}")
             return 0.0
     
-    def analyze_job_description(self, job_description: str) -> Dict:
-        """Analyze job description to extract key requirements and skills."""
-        try:
-            prompt = f"""
+    def _job_analysis_prompt(self, job_description: str) -> str:
+        return f"""
             Analyze this job description and extract key information:
             
             {job_description}
@@ -484,56 +801,149 @@ class MultiAgentAI:
                 "key_responsibilities": ["responsibility1", "responsibility2"]
             }}
             """
-            
-            # Try Groq first
-            try:
-                headers = {
-                    "Authorization": f"Bearer {self.groq_api_key}",
-                    "Content-Type": "application/json"
-                }
-                
-                data = {
-                    "model": "llama3-70b-8192",
-                    "messages": [{"role": "user", "content": prompt}],
-                    "temperature": 0.1,
-                    "max_tokens": 500
-                }
-                
-                response = requests.post(self.groq_url, headers=headers, json=data)
-                response.raise_for_status()
-                
-                result = response.json()
-                content = result['choices'][0]['message']['content']
-                
-                # Extract JSON
-                start = content.find('{')
-                end = content.rfind('}') + 1
-                json_str = content[start:end]
-                parsed_data = json.loads(json_str)
-                
-                self.logger.info("✅ Job description analyzed successfully with Groq")
-                return parsed_data
-                
-            except Exception:
-                # Fallback to Gemini
-                response = self.gemini_model.generate_content(prompt)
-                content = response.text
-                
-                start = content.find('{')
-                end = content.rfind('}') + 1
-                json_str = content[start:end]
-                parsed_data = json.loads(json_str)
-                
-                self.logger.info("✅ Job description analyzed successfully with Gemini")
-                return parsed_data
-                
-        except Exception as e:
-            self.logger.error(f"❌ Error analyzing job description: {e}")
-            return {
-                "required_skills": [],
-                "preferred_skills": [],
-                "experience_level": "entry",
-                "job_type": "internship",
-                "location": "remote",
-                "key_responsibilities": []
-            }
\ No newline at end of file
+    
+    @staticmethod
+    def _job_analysis_request(prompt: str) -> Dict:
+        return {
+            "model": "llama3-70b-8192",
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": 0.1,
+            "max_tokens": 500
+        }
+    
+    @staticmethod
+    def _default_job_analysis() -> Dict:
+        return {
+            "required_skills": [],
+            "preferred_skills": [],
+            "experience_level": "entry",
+            "job_type": "internship",
+            "location": "remote",
+            "key_responsibilities": []
+        }
+    
+    def analyze_job_description(self, job_description: str, bypass_cache: bool = False) -> Dict:
+        """Analyze job description to extract key requirements and skills."""
+        prompt = self._job_analysis_prompt(job_description)
+        provider, parsed_data = self._route('job_analysis', {
+            'groq': lambda: self._analyze_groq(prompt, bypass_cache),
+            'gemini': lambda: self._analyze_gemini(prompt, bypass_cache),
+        }, self._default_job_analysis)
+        if provider:
+            self.logger.info(f"✅ Job description analyzed successfully with {provider.capitalize()}")
+        else:
+            self.logger.error("❌ Error analyzing job description: no provider returned valid JSON")
+        return parsed_data
+    
+    def _analyze_groq(self, prompt: str, bypass_cache: bool = False) -> Dict:
+        data = self._job_analysis_request(prompt)
+        content = self._cached_completion(
+            'job_analysis', 'groq', data['model'], prompt,
+            {"temperature": data["temperature"], "max_tokens": data["max_tokens"]},
+            lambda: self._groq_completion(data), bypass_cache, validate=self._extract_json
+        )
+        return self._extract_json(content)
+    
+    def _analyze_gemini(self, prompt: str, bypass_cache: bool = False, lookup: bool = True) -> Dict:
+        content = self._cached_completion(
+            'job_analysis', 'gemini', self.gemini_model_name, prompt, {},
+            lambda: self.gemini_model.generate_content(prompt).text, bypass_cache,
+            validate=self._extract_json, lookup=lookup
+        )
+        return self._extract_json(content)
+    
+    def _rate_limiter(self, provider: str) -> ProviderLimiter:
+        """Shared requests/min + tokens/min limiter for ``provider``, sized from config."""
+        if provider not in self._rate_limiters:
+            defaults = self.RATE_LIMITS[provider]
+            self._rate_limiters[provider] = ProviderLimiter(
+                float(self.config.get(f'{provider}_requests_per_min') or defaults[0]),
+                float(self.config.get(f'{provider}_tokens_per_min') or defaults[1]),
+            )
+        return self._rate_limiters[provider]
+    
+    async def _analyze_with_groq_async(self, prompt: str, data: Dict) -> tuple:
+        """
+        One rate-limited Groq completion, retrying 429/503 after Retry-After (or a backoff).
+        
+        Returns (content, seconds spent on the successful request).
+        """
+        limiter = self._rate_limiter('groq')
+        tokens = self._estimate_tokens(prompt) + data['max_tokens']
+        headers = {
+            "Authorization": f"Bearer {self.groq_api_key}",
+            "Content-Type": "application/json"
+        }
+        for attempt in range(self.RATE_LIMIT_RETRIES + 1):
+            await limiter.acquire(tokens)
+            start = time.perf_counter()
+            response = await asyncio.to_thread(self.http['groq'].post, self.groq_url, headers=headers, json=data)
+            if response.status_code in (429, 503) and attempt < self.RATE_LIMIT_RETRIES:
+                delay = retry_after_seconds(response.headers.get('Retry-After'))
+                delay = delay if delay is not None else 2 ** attempt
+                self.logger.warning(f"⚠️ Groq answered {response.status_code}, retrying in {delay:.1f}s")
+                limiter.pause(delay)
+                continue
+            response.raise_for_status()
+            return response.json()['choices'][0]['message']['content'], time.perf_counter() - start
+    
+    async def _analyze_one_async(self, job_description: str, semaphore: asyncio.Semaphore,
+                                 bypass_cache: bool) -> Dict:
+        prompt = self._job_analysis_prompt(job_description)
+        data = self._job_analysis_request(prompt)
+        params = {"temperature": data["temperature"], "max_tokens": data["max_tokens"]}
+        cache_entries = {'groq': (data['model'], params), 'gemini': (self.gemini_model_name, {})}
+        if not (bypass_cache or self.bypass_cache):
+            # Any provider's cached answer will do; checked in the router's default preference
+            # order so the lookup does not count as a routing decision, and counted as one lookup
+            cached = self.response_cache.get_any(
+                'job_analysis', [(provider, *cache_entries[provider]) for provider in self.router.routes['job_analysis']],
+                prompt
+            )
+            if cached is not None:
+                return self._extract_json(cached)
+        else:
+            self.response_cache.note_bypass('job_analysis')
+        
+        async with semaphore:
+            for provider in self.router.order('job_analysis'):
+                if not self.router.allow('job_analysis', provider):
+                    continue
+                try:
+                    if provider == 'gemini':
+                        await self._rate_limiter('gemini').acquire(self._estimate_tokens(prompt))
+                        return await asyncio.to_thread(self._analyze_gemini, prompt, bypass_cache, False)
+                    start = time.perf_counter()
+                    try:
+                        content, seconds = await self._analyze_with_groq_async(prompt, data)
+                        parsed_data = self._extract_json(content)
+                    except Exception:
+                        self.router.record('job_analysis', 'groq', time.perf_counter() - start, ok=False)
+                        raise
+                    self.router.record('job_analysis', 'groq', seconds, ok=True)
+                    self.response_cache.put('job_analysis', 'groq', data['model'], prompt, content, params)
+                    return parsed_data
+                except Exception as e:
+                    self.logger.warning(f"⚠️ {provider} analysis failed: {e}")
+            self.logger.error("❌ Error analyzing job description: every provider failed")
+            return self._default_job_analysis()
+    
+    async def analyze_many(self, descriptions: List[str], max_concurrency: Optional[int] = None,
+                           bypass_cache: bool = False) -> List[Dict]:
+        """
+        Analyze many job descriptions concurrently; results are in input order.
+        
+        Requests run under each provider's requests/min and tokens/min limits and
+        back off on 429/503 as told by Retry-After. Cached prompts skip the network.
+        From synchronous code: ``asyncio.run(ai.analyze_many(descriptions))``.
+        """
+        if not descriptions:
+            return []
+        semaphore = asyncio.Semaphore(max_concurrency or self.http['groq'].pool_size)
+        start = time.perf_counter()
+        results = await asyncio.gather(*(
+            self._analyze_one_async(description, semaphore, bypass_cache) for description in descriptions
+        ))
+        self.logger.info(f"✅ Analyzed {len(descriptions)} job descriptions in {time.perf_counter() - start:.2f}s "
+                         f"(groq limiter: {self._rate_limiter('groq').get_stats()})")
+        return list(results)
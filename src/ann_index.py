@@ -0,0 +1,154 @@
+"""
+In-process IVF (inverted file) index for approximate nearest-neighbour search.
+
+Vectors are clustered with k-means; each stored row is assigned to its nearest
+centroid. A query scores only the rows of the ``nprobe`` closest clusters, then
+ranks those candidates exactly. The index keeps just the centroids and one
+cluster id per row; the vectors themselves are read from a caller-supplied
+source (e.g. the memory-mapped JobEmbeddingStore matrix), so inserts are cheap
+appends and the saved index stays small.
+"""
+import logging
+import os
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Rows (by id) -> float32 matrix of those rows
+VectorSource = Callable[[np.ndarray], np.ndarray]
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+def kmeans(vectors: np.ndarray, k: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """Spherical k-means (cosine); returns (k, dim) unit centroids."""
+    rng = np.random.default_rng(seed)
+    data = _normalize(vectors)
+    centroids = data[rng.choice(len(data), size=k, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = np.argmax(data @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, data)
+        empty = np.bincount(assignment, minlength=k) == 0
+        # Re-seed empty clusters from random points so every list stays usable
+        sums[empty] = data[rng.choice(len(data), size=int(empty.sum()))]
+        centroids = _normalize(sums)
+    return centroids
+
+class IVFIndex:
+    """Cosine IVF index over row ids 0..n-1 of an external vector source."""
+
+    TRAIN_SAMPLE = 20000
+
+    def __init__(self, source: VectorSource, nprobe: int = 16, min_train_rows: int = 2048):
+        """
+        Args:
+            source: Function returning the float32 vectors for an array of row ids
+            nprobe: Clusters searched per query (higher = better recall, slower)
+            min_train_rows: Below this many rows the index is not trained and searches are exact
+        """
+        self.source = source
+        self.nprobe = nprobe
+        self.min_train_rows = min_train_rows
+        self.centroids: Optional[np.ndarray] = None
+        self.assignments = np.zeros(0, dtype=np.int32)
+        self.count = 0
+        self.trained_at = 0
+        self._lists: Optional[List[np.ndarray]] = None
+
+    @property
+    def trained(self) -> bool:
+        return self.centroids is not None
+
+    def train(self, nlist: Optional[int] = None):
+        """(Re)cluster the rows stored so far and reassign every row."""
+        if not self.count:
+            return
+        nlist = nlist or int(np.clip(4 * np.sqrt(self.count), 16, 4096))
+        nlist = min(nlist, self.count)
+        rng = np.random.default_rng(0)
+        sample = np.sort(rng.choice(self.count, size=min(self.count, self.TRAIN_SAMPLE), replace=False))
+        self.centroids = kmeans(self.source(sample), nlist)
+        self.assignments = self._assign(np.arange(self.count))
+        self.trained_at = self.count
+        self._lists = None
+        logger.info(f"Trained IVF index: {nlist} lists over {self.count} rows")
+
+    def _assign(self, rows: np.ndarray, chunk: int = 65536) -> np.ndarray:
+        out = np.empty(len(rows), dtype=np.int32)
+        for start in range(0, len(rows), chunk):
+            block = _normalize(self.source(rows[start:start + chunk]))
+            out[start:start + chunk] = np.argmax(block @ self.centroids.T, axis=1)
+        return out
+
+    def add(self, count: int):
+        """Index the next ``count`` rows of the source (ids self.count .. self.count + count - 1)."""
+        if count <= 0:
+            return
+        new_rows = np.arange(self.count, self.count + count)
+        self.count += count
+        if not self.trained:
+            if self.count >= self.min_train_rows:
+                self.train()
+            return
+        self.assignments = np.concatenate([self.assignments, self._assign(new_rows)])
+        self._lists = None
+        # Lists drift out of balance as data grows; recluster after 4x growth
+        if self.count >= 4 * self.trained_at:
+            self.train()
+
+    def _inverted_lists(self) -> List[np.ndarray]:
+        if self._lists is None:
+            order = np.argsort(self.assignments, kind="stable")
+            bounds = np.searchsorted(self.assignments[order], np.arange(len(self.centroids) + 1))
+            self._lists = [order[bounds[i]:bounds[i + 1]] for i in range(len(self.centroids))]
+        return self._lists
+
+    def search(self, query: np.ndarray, k: int = 10, nprobe: Optional[int] = None,
+               exclude: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Approximate top-``k`` rows by cosine similarity to ``query``.
+
+        Returns (row ids, cosine similarities), best first.
+        """
+        if not self.count:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        query = _normalize(query)[0]
+        if self.trained:
+            probes = np.argsort(-(self.centroids @ query))[:nprobe or self.nprobe]
+            lists = self._inverted_lists()
+            candidates = np.sort(np.concatenate([lists[p] for p in probes]))
+        else:
+            candidates = np.arange(self.count)
+        if exclude is not None and len(exclude):
+            candidates = candidates[~np.isin(candidates, exclude)]
+        if not len(candidates):
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+        similarities = _normalize(self.source(candidates)) @ query
+        k = min(k, len(candidates))
+        best = np.argpartition(-similarities, k - 1)[:k]
+        best = best[np.argsort(-similarities[best])]
+        return candidates[best], similarities[best]
+
+    def save(self, path: str):
+        """Write centroids and row assignments to ``path`` (.npz)."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = path + ".tmp.npz"
+        np.savez(tmp, centroids=self.centroids if self.trained else np.zeros((0, 0), dtype=np.float32),
+                 assignments=self.assignments, meta=np.array([self.count, self.trained_at, self.nprobe]))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str, source: VectorSource, min_train_rows: int = 2048) -> "IVFIndex":
+        data = np.load(path)
+        count, trained_at, nprobe = (int(x) for x in data['meta'])
+        index = cls(source, nprobe=nprobe, min_train_rows=min_train_rows)
+        index.count, index.trained_at = count, trained_at
+        if data['centroids'].size:
+            index.centroids = data['centroids']
+            index.assignments = data['assignments']
+        return index
@@ -1,46 +1,226 @@
+import csv
 import json
 import os
-from datetime import datetime
-from typing import List, Dict, Optional
-import pandas as pd
+import re
+import sqlite3
+from collections import Counter, deque
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
 
 class ApplicationTracker:
-    def __init__(self, applications_file: str = "applications.txt"):
-        """Initialize application tracker with text file storage."""
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS applications (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            company TEXT NOT NULL,
+            platform TEXT NOT NULL,
+            link TEXT NOT NULL DEFAULT '',
+            similarity_score REAL NOT NULL DEFAULT 0.0,
+            status TEXT NOT NULL,
+            applied_at TEXT NOT NULL,
+            tracked_at TEXT NOT NULL,
+            updated_at TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_applications_status ON applications(status);
+        CREATE INDEX IF NOT EXISTS idx_applications_platform ON applications(platform);
+        CREATE INDEX IF NOT EXISTS idx_applications_applied_at ON applications(applied_at);
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_applications_link ON applications(link) WHERE link != '';
+    """
+    # Full-text index kept in step with the table by triggers and stored in the same database
+    FTS_SCHEMA = """
+        CREATE VIRTUAL TABLE IF NOT EXISTS applications_fts USING fts5(
+            title, company, link,
+            content='applications', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        );
+        CREATE TRIGGER IF NOT EXISTS applications_fts_insert AFTER INSERT ON applications BEGIN
+            INSERT INTO applications_fts(rowid, title, company, link)
+            VALUES (new.id, new.title, new.company, new.link);
+        END;
+        CREATE TRIGGER IF NOT EXISTS applications_fts_delete AFTER DELETE ON applications BEGIN
+            INSERT INTO applications_fts(applications_fts, rowid, title, company, link)
+            VALUES ('delete', old.id, old.title, old.company, old.link);
+        END;
+        CREATE TRIGGER IF NOT EXISTS applications_fts_update AFTER UPDATE OF title, company, link ON applications BEGIN
+            INSERT INTO applications_fts(applications_fts, rowid, title, company, link)
+            VALUES ('delete', old.id, old.title, old.company, old.link);
+            INSERT INTO applications_fts(rowid, title, company, link)
+            VALUES (new.id, new.title, new.company, new.link);
+        END;
+    """
+    COLUMNS = ('id', 'title', 'company', 'platform', 'link', 'similarity_score',
+               'status', 'applied_at', 'tracked_at', 'updated_at')
+    RECENT_LIMIT = 10
+    # Query parameters that only track where a click came from; anything else (jk, gh_jid, ...) names the posting
+    TRACKING_PARAMS = frozenset({'trk', 'trkinfo', 'refid', 'trackingid', 'ref', 'src', 'source', 'from',
+                                 'fbclid', 'gclid', 'msclkid', 'mc_cid', 'mc_eid'})
+
+    def __init__(self, applications_file: str = "applications.txt", db_file: str = None):
+        """Initialize application tracker with SQLite storage.
+
+        ``applications_file`` is the legacy JSON store; it is imported once into
+        ``db_file`` (default: same name with a ``.db`` extension) and used as the
+        target of save_applications() exports.
+        """
         self.applications_file = applications_file
-        self.applications = self.load_applications()
-        
+        self.db_file = db_file or os.path.splitext(applications_file)[0] + ".db"
+        self.conn = self._connect()
+        self._migrate_from_json()
+        self._rebuild_aggregates()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_file)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        has_fts = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'applications_fts'").fetchone()
+        conn.executescript(self.SCHEMA)
+        try:
+            conn.executescript(self.FTS_SCHEMA)
+            if not has_fts:
+                # Index rows written before the full-text table existed
+                with conn:
+                    conn.execute("INSERT INTO applications_fts(applications_fts) VALUES ('rebuild')")
+            self.fts_enabled = True
+        except sqlite3.OperationalError as e:
+            print(f"⚠️ SQLite FTS5 unavailable, search falls back to LIKE scans: {e}")
+            self.fts_enabled = False
+        return conn
+
+    def _migrate_from_json(self):
+        """One-shot import of the legacy JSON file into an empty database.
+
+        The import runs in one transaction and the schema version is only bumped
+        once it commits, so a failed migration leaves nothing behind and is
+        retried on the next start.
+        """
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= 1:
+            return
+        try:
+            legacy = self._read_legacy()
+        except Exception as e:
+            print(f"❌ Error reading {self.applications_file}, migration will be retried: {e}")
+            return
+        count_rows = "SELECT COUNT(*) FROM applications"
+        before = self.conn.execute(count_rows).fetchone()[0]
+        try:
+            seen_ids = set()
+            with self.conn:
+                for app in legacy:
+                    # The old list-length IDs can repeat after clear_applications()
+                    if app.get('id') in seen_ids:
+                        app = {**app, 'id': None}
+                    seen_ids.add(app.get('id'))
+                    self._upsert(app)
+        except Exception as e:
+            print(f"❌ Error migrating applications, migration will be retried: {e}")
+            return
+        self.conn.execute("PRAGMA user_version = 1")
+        if legacy:
+            inserted = self.conn.execute(count_rows).fetchone()[0] - before
+            print(f"✅ Migrated {inserted} applications from {self.applications_file} to {self.db_file}")
+            if inserted < len(legacy):
+                print(f"⚠️ Merged {len(legacy) - inserted} legacy applications that repeated an existing link")
+
+    def _read_legacy(self) -> List[Dict]:
+        if os.path.exists(self.applications_file):
+            with open(self.applications_file, 'r', encoding='utf-8') as f:
+                content = f.read().strip()
+                if content:
+                    return json.loads(content)
+        return []
+
     def load_applications(self) -> List[Dict]:
-        """Load applications from text file."""
+        """Load applications from the legacy text file."""
         try:
-            if os.path.exists(self.applications_file):
-                with open(self.applications_file, 'r', encoding='utf-8') as f:
-                    content = f.read().strip()
-                    if content:
-                        return json.loads(content)
-            return []
+            return self._read_legacy()
         except Exception as e:
             print(f"❌ Error loading applications: {e}")
             return []
-    
+
+    @property
+    def applications(self) -> List[Dict]:
+        """All applications, ordered by ID."""
+        return self._query("SELECT * FROM applications ORDER BY id")
+
+    def _query(self, sql: str, params: tuple = ()) -> List[Dict]:
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
     def save_applications(self):
-        """Save applications to text file."""
+        """Export all applications to the text file as JSON."""
         try:
+            # Same layout as json.dump(..., indent=2), written one chunk at a time
             with open(self.applications_file, 'w', encoding='utf-8') as f:
-                json.dump(self.applications, f, indent=2, ensure_ascii=False)
+                f.write("[")
+                separator = "\n"
+                for chunk in self.iter_applications():
+                    for app in chunk:
+                        body = json.dumps(app, indent=2, ensure_ascii=False).replace("\n", "\n  ")
+                        f.write(f"{separator}  {body}")
+                        separator = ",\n"
+                f.write("\n]" if separator != "\n" else "]")
         except Exception as e:
             print(f"❌ Error saving applications: {e}")
-    
-    def add_application(self, title: str, company: str, platform: str, 
-                       link: str = "", similarity_score: float = 0.0, 
-                       status: str = "Applied", applied_at: str = None) -> bool:
-        """Add a new application to the tracker."""
+
+    def _upsert(self, application: Dict, overwrite: bool = True) -> sqlite3.Cursor:
+        """Insert an application; a row with the same non-empty link is updated in place, or kept when not overwrite."""
+        row = {column: application.get(column) for column in self.COLUMNS}
+        row['link'] = row['link'] or ''
+        row['similarity_score'] = row['similarity_score'] or 0.0
+        row['tracked_at'] = row['tracked_at'] or datetime.now().isoformat()
+        return self.conn.execute(
+            """
+            INSERT INTO applications (id, title, company, platform, link, similarity_score,
+                                      status, applied_at, tracked_at, updated_at)
+            VALUES (:id, :title, :company, :platform, :link, :similarity_score,
+                    :status, :applied_at, :tracked_at, :updated_at)
+            ON CONFLICT(link) WHERE link != '' DO """ + ("""UPDATE SET
+                similarity_score = excluded.similarity_score,
+                status = excluded.status,
+                applied_at = excluded.applied_at,
+                updated_at = excluded.tracked_at
+            """ if overwrite else "NOTHING"),
+            row
+        )
+
+    def _rebuild_aggregates(self):
+        """Recompute the running summary counters from the database."""
+        self._status_counts = Counter({row['status']: row['n'] for row in self.conn.execute(
+            "SELECT status, COUNT(*) AS n FROM applications GROUP BY status")})
+        self._platform_counts = Counter({row['platform']: row['n'] for row in self.conn.execute(
+            "SELECT platform, COUNT(*) AS n FROM applications GROUP BY platform")})
+        self._refresh_recent()
+
+    def _refresh_recent(self):
+        self._recent = deque(
+            self._query("SELECT * FROM applications ORDER BY applied_at DESC LIMIT ?", (self.RECENT_LIMIT,)),
+            maxlen=self.RECENT_LIMIT
+        )
+
+    def _track_recent(self, application: Dict):
+        """Keep the newest-first recent list current after an insert."""
+        if not self._recent or application['applied_at'] >= self._recent[0]['applied_at']:
+            self._recent.appendleft(application)
+        elif len(self._recent) < self.RECENT_LIMIT or application['applied_at'] > self._recent[-1]['applied_at']:
+            # Back-dated entry landing inside the window: re-read it from the applied_at index
+            self._refresh_recent()
+
+    def add_application(self, title: str, company: str, platform: str,
+                       link: str = "", similarity_score: float = 0.0,
+                       status: str = "Applied", applied_at: str = None, overwrite: bool = False) -> bool:
+        """
+        Add a new application to the tracker.
+
+        A link that is already tracked keeps its stored row and returns False,
+        unless overwrite=True replaces its status, score and applied_at.
+        """
         try:
             if applied_at is None:
                 applied_at = datetime.now().isoformat()
-            
+
             application = {
-                'id': len(self.applications) + 1,
                 'title': title,
                 'company': company,
                 'platform': platform,
@@ -50,140 +230,365 @@ class ApplicationTracker:
                 'applied_at': applied_at,
                 'tracked_at': datetime.now().isoformat()
             }
-            
-            self.applications.append(application)
-            self.save_applications()
-            
+
+            with self.conn:
+                existing = None
+                if link:
+                    # Repeat the partial-index predicate so the lookup can use idx_applications_link
+                    existing = self.conn.execute(
+                        "SELECT id, status FROM applications WHERE link = ? AND link != ''", (link,)
+                    ).fetchone()
+                if existing and not overwrite:
+                    print(f"ℹ️ Already tracked: {title} at {company} ({existing['status']})")
+                    return False
+                cursor = self._upsert(application, overwrite)
+                if not cursor.rowcount:
+                    # Another connection tracked the link after the lookup
+                    print(f"ℹ️ Already tracked: {title} at {company}")
+                    return False
+
+            self._status_counts[status] += 1
+            if existing:
+                # The upsert keeps the stored platform, so only the status moves
+                self._status_counts[existing['status']] -= 1
+                self._refresh_recent()
+            else:
+                self._platform_counts[platform] += 1
+                self._track_recent({**application, 'id': cursor.lastrowid, 'updated_at': None})
+
             print(f"✅ Application tracked: {title} at {company} ({status})")
             return True
-            
+
         except Exception as e:
             print(f"❌ Error adding application: {e}")
             return False
-    
+
     def update_application_status(self, application_id: int, new_status: str) -> bool:
         """Update the status of an application."""
         try:
-            for app in self.applications:
-                if app['id'] == application_id:
-                    app['status'] = new_status
-                    app['updated_at'] = datetime.now().isoformat()
-                    self.save_applications()
-                    print(f"✅ Updated application {application_id} status to: {new_status}")
-                    return True
-            
+            updated_at = datetime.now().isoformat()
+            with self.conn:
+                previous = self.conn.execute(
+                    "SELECT status FROM applications WHERE id = ?", (application_id,)
+                ).fetchone()
+                cursor = self.conn.execute(
+                    "UPDATE applications SET status = ?, updated_at = ? WHERE id = ?",
+                    (new_status, updated_at, application_id)
+                )
+            if cursor.rowcount:
+                self._status_counts[previous['status']] -= 1
+                self._status_counts[new_status] += 1
+                for app in self._recent:
+                    if app['id'] == application_id:
+                        app['status'] = new_status
+                        app['updated_at'] = updated_at
+                print(f"✅ Updated application {application_id} status to: {new_status}")
+                return True
+
             print(f"❌ Application {application_id} not found")
             return False
-            
+
         except Exception as e:
             print(f"❌ Error updating application: {e}")
             return False
-    
+
     def get_applications(self, status: str = None, platform: str = None) -> List[Dict]:
         """Get applications with optional filtering."""
-        filtered_applications = self.applications
-        
+        clauses, params = [], []
+
         if status:
-            filtered_applications = [app for app in filtered_applications if app['status'] == status]
-        
+            clauses.append("status = ?")
+            params.append(status)
+
         if platform:
-            filtered_applications = [app for app in filtered_applications if app['platform'] == platform]
-        
-        return filtered_applications
-    
+            clauses.append("platform = ?")
+            params.append(platform)
+
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return self._query(f"SELECT * FROM applications{where} ORDER BY id", tuple(params))
+
     def get_applications_summary(self) -> Dict:
-        """Get summary statistics of applications."""
-        if not self.applications:
-            return {
-                'total_applications': 0,
-                'successful_applications': 0,
-                'failed_applications': 0,
-                'pending_applications': 0,
-                'platforms': {},
-                'recent_applications': []
-            }
-        
-        total = len(self.applications)
-        successful = len([app for app in self.applications if app['status'] == 'Applied'])
-        failed = len([app for app in self.applications if app['status'] == 'Failed'])
-        pending = len([app for app in self.applications if app['status'] == 'Pending'])
-        
-        # Count by platform
-        platforms = {}
-        for app in self.applications:
-            platform = app['platform']
-            platforms[platform] = platforms.get(platform, 0) + 1
-        
-        # Get recent applications (last 10)
-        recent = sorted(self.applications, key=lambda x: x['applied_at'], reverse=True)[:10]
-        
+        """Get summary statistics of applications from the running counters."""
         return {
-            'total_applications': total,
-            'successful_applications': successful,
-            'failed_applications': failed,
-            'pending_applications': pending,
-            'platforms': platforms,
-            'recent_applications': recent
+            'total_applications': sum(self._status_counts.values()),
+            'successful_applications': self._status_counts['Applied'],
+            'failed_applications': self._status_counts['Failed'],
+            'pending_applications': self._status_counts['Pending'],
+            'platforms': {platform: n for platform, n in self._platform_counts.items() if n > 0},
+            'recent_applications': [dict(app) for app in self._recent]
         }
-    
-    def export_to_csv(self, filename: str = "applications_export.csv") -> bool:
-        """Export applications to CSV file."""
+
+    def iter_applications(self, chunk_size: int = 1000) -> Iterator[List[Dict]]:
+        """Yield all applications, ordered by ID, in lists of at most ``chunk_size`` rows."""
+        cursor = self.conn.execute("SELECT * FROM applications ORDER BY id")
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield [dict(row) for row in rows]
+
+    def _export(self, filename: str, label: str, write_chunks: Callable[[Iterator[List[Dict]]], int]) -> bool:
+        """Shared wrapper for the streaming exporters."""
         try:
-            if not self.applications:
+            if not sum(self._status_counts.values()):
                 print("⚠️ No applications to export")
                 return False
-            
-            df = pd.DataFrame(self.applications)
-            df.to_csv(filename, index=False, encoding='utf-8')
-            print(f"✅ Exported {len(self.applications)} applications to {filename}")
+
+            exported = write_chunks(self.iter_applications())
+            print(f"✅ Exported {exported} applications to {filename}")
             return True
-            
+
         except Exception as e:
-            print(f"❌ Error exporting to CSV: {e}")
+            print(f"❌ Error exporting to {label}: {e}")
             return False
-    
+
+    def export_to_csv(self, filename: str = "applications_export.csv") -> bool:
+        """Export applications to CSV file."""
+        def write_chunks(chunks):
+            exported = 0
+            with open(filename, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=self.COLUMNS)
+                writer.writeheader()
+                for chunk in chunks:
+                    writer.writerows(chunk)
+                    exported += len(chunk)
+            return exported
+
+        return self._export(filename, "CSV", write_chunks)
+
+    def export_to_jsonl(self, filename: str = "applications_export.jsonl") -> bool:
+        """Export applications to a JSON Lines file, one application per line."""
+        def write_chunks(chunks):
+            exported = 0
+            with open(filename, 'w', encoding='utf-8') as f:
+                for chunk in chunks:
+                    f.writelines(json.dumps(app, ensure_ascii=False) + "\n" for app in chunk)
+                    exported += len(chunk)
+            return exported
+
+        return self._export(filename, "JSONL", write_chunks)
+
+    def export_to_parquet(self, filename: str = "applications_export.parquet") -> bool:
+        """Export applications to a Parquet file, one row group per chunk (requires pyarrow)."""
+        def write_chunks(chunks):
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError as e:
+                raise ImportError("Parquet export needs the 'pyarrow' package (pip install pyarrow)") from e
+
+            schema = pa.schema([
+                ('id', pa.int64()), ('title', pa.string()), ('company', pa.string()),
+                ('platform', pa.string()), ('link', pa.string()), ('similarity_score', pa.float64()),
+                ('status', pa.string()), ('applied_at', pa.string()), ('tracked_at', pa.string()),
+                ('updated_at', pa.string())
+            ])
+            exported = 0
+            with pq.ParquetWriter(filename, schema) as writer:
+                for chunk in chunks:
+                    writer.write_table(pa.Table.from_pylist(chunk, schema=schema))
+                    exported += len(chunk)
+            return exported
+
+        return self._export(filename, "Parquet", write_chunks)
+
     def export_to_excel(self, filename: str = "applications_export.xlsx") -> bool:
-        """Export applications to Excel file."""
-        try:
-            if not self.applications:
-                print("⚠️ No applications to export")
-                return False
-            
-            df = pd.DataFrame(self.applications)
-            df.to_excel(filename, index=False, engine='openpyxl')
-            print(f"✅ Exported {len(self.applications)} applications to {filename}")
-            return True
-            
-        except Exception as e:
-            print(f"❌ Error exporting to Excel: {e}")
-            return False
-    
+        """Export applications to Excel file using openpyxl's write-only mode."""
+        def write_chunks(chunks):
+            from openpyxl import Workbook
+
+            workbook = Workbook(write_only=True)
+            sheet = workbook.create_sheet("Applications")
+            sheet.append(list(self.COLUMNS))
+            exported = 0
+            for chunk in chunks:
+                for app in chunk:
+                    sheet.append([app[column] for column in self.COLUMNS])
+                exported += len(chunk)
+            workbook.save(filename)
+            return exported
+
+        return self._export(filename, "Excel", write_chunks)
+
+    def to_dataframe(self):
+        """Return all applications as a pandas DataFrame (imports pandas on demand)."""
+        import pandas as pd
+
+        return pd.read_sql_query("SELECT * FROM applications ORDER BY id", self.conn)
+
     def clear_applications(self) -> bool:
         """Clear all applications (use with caution)."""
         try:
-            self.applications = []
-            self.save_applications()
+            with self.conn:
+                self.conn.execute("DELETE FROM applications")
+            self._rebuild_aggregates()
             print("✅ All applications cleared")
             return True
         except Exception as e:
             print(f"❌ Error clearing applications: {e}")
             return False
-    
+
     def get_application_by_id(self, application_id: int) -> Optional[Dict]:
         """Get a specific application by ID."""
-        for app in self.applications:
-            if app['id'] == application_id:
-                return app
-        return None
-    
-    def search_applications(self, query: str) -> List[Dict]:
-        """Search applications by title or company name."""
-        query = query.lower()
-        results = []
-        
-        for app in self.applications:
-            if (query in app['title'].lower() or 
-                query in app['company'].lower()):
-                results.append(app)
-        
-        return results 
\ No newline at end of file
+        row = self.conn.execute("SELECT * FROM applications WHERE id = ?", (application_id,)).fetchone()
+        return dict(row) if row else None
+
+    def search_applications(self, query: str, limit: int = None) -> List[Dict]:
+        """Search applications by title, company or link.
+
+        Every term in ``query`` must match the start of a word; results are ranked
+        by relevance (BM25) when the full-text index is available.
+        """
+        terms = re.findall(r"[^\W_]+", query.lower())
+        if not terms:
+            return self.applications[:limit] if limit else self.applications
+
+        if not self.fts_enabled:
+            clauses = " AND ".join("(title LIKE ? OR company LIKE ? OR link LIKE ?)" for _ in terms)
+            params = tuple(f"%{term}%" for term in terms for _ in range(3))
+            return self._query(f"SELECT * FROM applications WHERE {clauses} ORDER BY id LIMIT ?",
+                               params + (limit or -1,))
+
+        match = " AND ".join(f'"{term}"*' for term in terms)
+        return self._query(
+            """
+            SELECT applications.* FROM applications_fts
+            JOIN applications ON applications.id = applications_fts.rowid
+            WHERE applications_fts MATCH ?
+            ORDER BY bm25(applications_fts)
+            LIMIT ?
+            """,
+            (match, limit or -1)
+        )
+
+    def get_applications_by_date_range(self, start_date: datetime, end_date: datetime) -> List[Dict]:
+        """Get applications with applied_at between start_date and end_date (inclusive)."""
+        # Range scan on the applied_at index; ISO timestamps sort lexicographically
+        return self._query(
+            "SELECT * FROM applications WHERE applied_at >= ? AND applied_at <= ? ORDER BY applied_at",
+            (start_date.isoformat(), end_date.isoformat())
+        )
+
+    def _weekly_buckets(self, since: str = None) -> List[Dict]:
+        """Aggregate applications into ISO-week buckets, oldest first."""
+        where, params = ("WHERE applied_at >= ?", (since,)) if since else ("", ())
+        buckets: Dict[str, Dict] = {}
+        for row in self.conn.execute(
+            f"""
+            SELECT date(substr(applied_at, 1, 10), 'weekday 0', '-6 days') AS week_start,
+                   status, platform, COUNT(*) AS n, SUM(similarity_score) AS score_sum
+            FROM applications {where}
+            GROUP BY week_start, status, platform
+            ORDER BY week_start
+            """,
+            params
+        ):
+            bucket = buckets.setdefault(row['week_start'], {
+                'week_start': row['week_start'],
+                'total': 0,
+                'statuses': Counter(),
+                'platforms': Counter(),
+                'score_sum': 0.0
+            })
+            bucket['total'] += row['n']
+            bucket['statuses'][row['status']] += row['n']
+            bucket['platforms'][row['platform']] += row['n']
+            bucket['score_sum'] += row['score_sum'] or 0.0
+
+        weeks = []
+        for bucket in buckets.values():
+            score_sum = bucket.pop('score_sum')
+            bucket['statuses'] = dict(bucket['statuses'])
+            bucket['platforms'] = dict(bucket['platforms'])
+            bucket['average_similarity'] = round(score_sum / bucket['total'], 4) if bucket['total'] else 0.0
+            weeks.append(bucket)
+        return weeks
+
+    def get_statistics(self) -> Dict:
+        """Get overall statistics, including per-week totals."""
+        summary = self.get_applications_summary()
+        total = summary['total_applications']
+        average = self.conn.execute("SELECT AVG(similarity_score) FROM applications").fetchone()[0]
+        first, last = self.conn.execute("SELECT MIN(applied_at), MAX(applied_at) FROM applications").fetchone()
+
+        return {
+            'total_applications': total,
+            'statuses': {status: n for status, n in self._status_counts.items() if n > 0},
+            'platforms': summary['platforms'],
+            'success_rate': round(summary['successful_applications'] / total, 4) if total else 0.0,
+            'average_similarity': round(average, 4) if average is not None else 0.0,
+            'first_application': first,
+            'last_application': last,
+            'weekly': [
+                {'week_start': week['week_start'], 'total': week['total'], 'statuses': week['statuses']}
+                for week in self._weekly_buckets()
+            ]
+        }
+
+    def generate_weekly_report(self, weeks: int = 1) -> Dict:
+        """Report on the last ``weeks`` calendar weeks, bucketed per week."""
+        today = datetime.now().date()
+        week_start = today - timedelta(days=today.weekday()) - timedelta(weeks=weeks - 1)
+        buckets = self._weekly_buckets(since=week_start.isoformat())
+        total = sum(bucket['total'] for bucket in buckets)
+        statuses = Counter()
+        platforms = Counter()
+        for bucket in buckets:
+            statuses.update(bucket['statuses'])
+            platforms.update(bucket['platforms'])
+
+        return {
+            'period_start': week_start.isoformat(),
+            'period_end': today.isoformat(),
+            'total_applications': total,
+            'successful_applications': statuses['Applied'],
+            'failed_applications': statuses['Failed'],
+            'pending_applications': statuses['Pending'],
+            'platforms': dict(platforms),
+            'weeks': buckets
+        }
+
+    @staticmethod
+    def _dedup_key(application: Dict) -> Tuple[str, str, str]:
+        """Normalized (company, title, link) used to spot duplicate applications."""
+        link = (application.get('link') or '').strip().lower()
+        if link:
+            parts = urlsplit(link)
+            query = urlencode(sorted(
+                (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+                if not name.startswith('utm_') and name not in ApplicationTracker.TRACKING_PARAMS
+            ))
+            link = f"{parts.netloc}{parts.path}".rstrip('/') + (f"?{query}" if query else "")
+        return (
+            ' '.join((application.get('company') or '').casefold().split()),
+            ' '.join((application.get('title') or '').casefold().split()),
+            link
+        )
+
+    def clean_duplicates(self) -> int:
+        """Remove duplicate applications in one pass, keeping the earliest tracked row."""
+        try:
+            seen = set()
+            duplicates = []
+            for row in self.conn.execute("SELECT id, company, title, link FROM applications ORDER BY id"):
+                key = self._dedup_key(dict(row))
+                if key in seen:
+                    duplicates.append((row['id'],))
+                else:
+                    seen.add(key)
+
+            if duplicates:
+                with self.conn:
+                    self.conn.executemany("DELETE FROM applications WHERE id = ?", duplicates)
+                self._rebuild_aggregates()
+
+            print(f"✅ Removed {len(duplicates)} duplicate applications")
+            return len(duplicates)
+
+        except Exception as e:
+            print(f"❌ Error cleaning duplicates: {e}")
+            return 0
+
+    def close(self):
+        """Close the database connection."""
+        self.conn.close()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark ANN Index
+
+This script measures the IVF index in ann_index.py against exact brute-force
+search over the same vectors: build time, query latency and recall@k for a
+range of nprobe settings, plus the cost of incremental inserts.
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from ann_index import IVFIndex
+from benchmark_compact_embeddings import make_embeddings
+
+def exact_top_k(vectors: np.ndarray, query: np.ndarray, k: int) -> np.ndarray:
+    similarities = vectors @ (query / np.linalg.norm(query))
+    best = np.argpartition(-similarities, k - 1)[:k]
+    return best[np.argsort(-similarities[best])]
+
+def run_benchmark(count: int, dim: int, queries: int, top_k: int, nprobes, insert_batch: int):
+    vectors = make_embeddings(count, dim, clusters=max(50, count // 2000))
+    # Queries near stored jobs, like a resume that matches some postings well
+    rng = np.random.default_rng(4)
+    query_vectors = (vectors[rng.integers(0, count, queries)]
+                     + 0.05 * rng.standard_normal((queries, dim))).astype(np.float32)
+
+    def source(rows):
+        return vectors[rows]
+
+    print(f"{count} vectors x {dim} dims, {queries} queries, recall@{top_k}\n")
+
+    start = time.perf_counter()
+    expected = [set(exact_top_k(vectors, q, top_k)) for q in query_vectors]
+    exact_ms = (time.perf_counter() - start) / queries * 1e3
+
+    start = time.perf_counter()
+    index = IVFIndex(source)
+    index.add(count - insert_batch)
+    build_s = time.perf_counter() - start
+    start = time.perf_counter()
+    index.add(insert_batch)
+    insert_ms = (time.perf_counter() - start) * 1e3
+    print(f"Build: {build_s:.2f}s for {count - insert_batch} rows ({len(index.centroids)} lists), "
+          f"incremental insert of {insert_batch}: {insert_ms:.1f}ms\n")
+
+    print(f"{'search':<14} {'latency':>10} {'recall':>8} {'speedup':>8}")
+    print(f"{'brute force':<14} {exact_ms:>8.2f}ms {1.0:>8.1%} {1.0:>7.1f}x")
+    for nprobe in nprobes:
+        index.search(query_vectors[0], top_k, nprobe=nprobe)  # warm the inverted lists
+        start = time.perf_counter()
+        found = [set(index.search(q, top_k, nprobe=nprobe)[0]) for q in query_vectors]
+        latency_ms = (time.perf_counter() - start) / queries * 1e3
+        recall = np.mean([len(f & e) / top_k for f, e in zip(found, expected)])
+        print(f"{f'ivf nprobe={nprobe}':<14} {latency_ms:>8.2f}ms {recall:>8.1%} {exact_ms / latency_ms:>7.1f}x")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the IVF ANN index against brute force")
+    parser.add_argument("--count", type=int, default=200000, help="Number of job vectors")
+    parser.add_argument("--dim", type=int, default=384, help="Embedding dimension")
+    parser.add_argument("--queries", type=int, default=50, help="Number of queries")
+    parser.add_argument("--top-k", type=int, default=50, help="Neighbours per query")
+    parser.add_argument("--nprobe", default="1,4,8,16,32,64", help="Comma-separated nprobe values")
+    parser.add_argument("--insert-batch", type=int, default=1000, help="Rows added incrementally after the build")
+    args = parser.parse_args()
+    run_benchmark(args.count, args.dim, args.queries, args.top_k,
+                  [int(n) for n in args.nprobe.split(",")], args.insert_batch)
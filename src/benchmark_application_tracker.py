@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark Application Tracker
+
+This script fills an ApplicationTracker with synthetic applications and
+times inserts and the common queries, next to the old list-plus-JSON-file
+behaviour.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from application_tracker import ApplicationTracker
+
+STATUSES = ["Applied", "Failed", "Pending"]
+PLATFORMS = ["linkedin", "internshala", "indeed"]
+COMPANIES = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries", "Wayne Enterprises"]
+TITLES = ["Software Engineering Intern", "Data Science Intern", "Frontend Intern",
+          "Machine Learning Intern", "Backend Developer Intern", "DevOps Intern"]
+
+def make_applications(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    return [
+        {
+            'title': rng.choice(TITLES),
+            'company': rng.choice(COMPANIES),
+            'platform': rng.choice(PLATFORMS),
+            'link': f"https://www.linkedin.com/jobs/view/{4000000000 + i}/",
+            'similarity_score': round(rng.random(), 3),
+            'status': rng.choice(STATUSES),
+            'applied_at': (start + timedelta(minutes=rng.randint(0, 60 * 24 * 365))).isoformat(),
+        }
+        for i in range(count)
+    ]
+
+def timed(fn, repeat: int = 1) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+def legacy_inserts(path: str, applications):
+    """Reproduce the old add_application(): append and rewrite the whole file."""
+    stored = []
+    for app in applications:
+        stored.append({**app, 'id': len(stored) + 1})
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(stored, f, indent=2, ensure_ascii=False)
+    return stored
+
+def fill_tracker(tracker: ApplicationTracker, applications):
+    with contextlib.redirect_stdout(io.StringIO()):
+        for app in applications:
+            tracker.add_application(**app)
+
+def run_benchmark(count: int, legacy_max: int):
+    applications = make_applications(count)
+    with tempfile.TemporaryDirectory() as tmp:
+        tracker = ApplicationTracker(os.path.join(tmp, "applications.txt"))
+        insert_time = timed(lambda: fill_tracker(tracker, applications))
+
+        legacy_count = min(count, legacy_max)
+        legacy_time = timed(lambda: legacy_inserts(os.path.join(tmp, "legacy.txt"), applications[:legacy_count]))
+        legacy = [{**app, 'id': i + 1} for i, app in enumerate(applications)]
+
+        middle_id = count // 2
+        results = [
+            ("get_applications(status)",
+             timed(lambda: [a for a in legacy if a['status'] == 'Pending'], 5),
+             timed(lambda: tracker.get_applications(status='Pending'), 5)),
+            ("get_application_by_id",
+             timed(lambda: next(a for a in legacy if a['id'] == middle_id), 100),
+             timed(lambda: tracker.get_application_by_id(middle_id), 100)),
+            ("search_applications",
+             timed(lambda: [a for a in legacy if 'data' in a['title'].lower() or 'data' in a['company'].lower()], 5),
+             timed(lambda: tracker.search_applications('data'), 5)),
+            ("search_applications top 50",
+             timed(lambda: [a for a in legacy if 'data' in a['title'].lower() or 'data' in a['company'].lower()][:50], 5),
+             timed(lambda: tracker.search_applications('data', limit=50), 5)),
+            ("search (2 prefix terms)",
+             timed(lambda: [a for a in legacy if 'mach' in a['title'].lower() and 'hoo' in a['company'].lower()], 5),
+             timed(lambda: tracker.search_applications('mach hoo', limit=50), 5)),
+            ("get_applications_summary",
+             timed(lambda: sorted(legacy, key=lambda x: x['applied_at'], reverse=True)[:10], 5),
+             timed(tracker.get_applications_summary, 5)),
+        ]
+        tracker.close()
+
+    print(f"Inserted {count} applications: {insert_time:.2f}s "
+          f"({insert_time / count * 1e6:.0f}us/insert)")
+    print(f"Legacy JSON rewrite for {legacy_count} inserts: {legacy_time:.2f}s "
+          f"({legacy_time / legacy_count * 1e6:.0f}us/insert)\n")
+    print(f"{'query':<28} {'legacy list':>12} {'sqlite':>12}")
+    for name, legacy_seconds, sqlite_seconds in results:
+        print(f"{name:<28} {legacy_seconds * 1e3:>10.2f}ms {sqlite_seconds * 1e3:>10.2f}ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark ApplicationTracker storage")
+    parser.add_argument("--count", type=int, default=100000, help="Number of applications")
+    parser.add_argument("--legacy-max", type=int, default=2000,
+                        help="Largest insert count to run the quadratic legacy path for")
+    args = parser.parse_args()
+    run_benchmark(args.count, args.legacy_max)
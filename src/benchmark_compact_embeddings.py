@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark Compact Embeddings
+
+This script compares the storage formats for job embeddings: Python lists
+of floats (what parse_resume used to keep), float32, float16 and int8 with a
+per-vector scale. It reports memory and disk size, and how closely each
+compact format reproduces the float32 scores and top-k rankings.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from compact_embeddings import load_embeddings, save_embeddings
+from embedding_backends import similarity_scores
+
+def make_embeddings(count: int, dim: int, clusters: int = 50, seed: int = 3):
+    """Clustered unit vectors, closer to real job embeddings than pure noise."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, clusters, count)] + 0.6 * rng.standard_normal((count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+def list_memory(vectors: np.ndarray, sample: int = 100) -> int:
+    """Approximate size of the same vectors as Python lists of floats."""
+    rows = vectors[:sample].tolist()
+    per_row = sum(sys.getsizeof(row) + sum(sys.getsizeof(x) for x in row) for row in rows) / len(rows)
+    return int(per_row * len(vectors))
+
+def ranking_agreement(reference: np.ndarray, candidate: np.ndarray, top_k: int):
+    """Top-k overlap and Spearman rank correlation between two score vectors."""
+    expected = set(np.argpartition(-reference, top_k)[:top_k])
+    actual = set(np.argpartition(-candidate, top_k)[:top_k])
+    ranks_ref = np.argsort(np.argsort(-reference))
+    ranks_cand = np.argsort(np.argsort(-candidate))
+    spearman = np.corrcoef(ranks_ref, ranks_cand)[0, 1]
+    return len(expected & actual) / top_k, spearman
+
+def run_benchmark(count: int, dim: int, queries: int, top_k: int):
+    vectors = make_embeddings(count, dim)
+    query_vectors = make_embeddings(queries, dim, seed=4)
+    reference = [similarity_scores(q, vectors) for q in query_vectors]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, "embeddings.json")
+        with open(json_path, "w") as f:
+            json.dump(vectors.tolist(), f)
+        print(f"{count} vectors x {dim} dims, {queries} queries, top-{top_k}\n")
+        print(f"{'format':<10} {'memory':>10} {'disk':>10} {'score time':>11} {'max |dscore|':>13} "
+              f"{'top-k overlap':>14} {'spearman':>9}")
+        print(f"{'list/json':<10} {list_memory(vectors) / 1e6:>8.1f}MB {os.path.getsize(json_path) / 1e6:>8.1f}MB")
+
+        for fmt in ("float32", "float16", "int8"):
+            path = os.path.join(tmp, fmt)
+            disk = sum(save_embeddings(path, vectors, fmt=fmt).values())
+            stored = load_embeddings(path)
+            memory = stored.codes.nbytes + (stored.scales.nbytes if stored.scales is not None else 0)
+
+            start = time.perf_counter()
+            scores = [stored.similarity_scores(q) for q in query_vectors]
+            score_time = (time.perf_counter() - start) / queries
+
+            max_error = max(float(np.max(np.abs(s - r))) for s, r in zip(scores, reference))
+            agreement = [ranking_agreement(r, s, top_k) for r, s in zip(reference, scores)]
+            overlap = np.mean([a[0] for a in agreement])
+            spearman = np.mean([a[1] for a in agreement])
+            print(f"{fmt:<10} {memory / 1e6:>8.1f}MB {disk / 1e6:>8.1f}MB {score_time * 1e3:>9.1f}ms "
+                  f"{max_error:>13.2e} {overlap:>13.1%} {spearman:>9.5f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark compact embedding storage")
+    parser.add_argument("--count", type=int, default=100000, help="Number of job vectors")
+    parser.add_argument("--dim", type=int, default=384, help="Embedding dimension")
+    parser.add_argument("--queries", type=int, default=20, help="Number of resume queries")
+    parser.add_argument("--top-k", type=int, default=50, help="Ranking depth to compare")
+    args = parser.parse_args()
+    run_benchmark(args.count, args.dim, args.queries, args.top_k)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark Embedding Backends
+
+This script runs the same fixed corpus through each local embedding backend
+and reports load time, throughput, p50/p99 single-text latency and resident
+memory. Every backend runs in its own process so RSS is not shared. It also
+checks that the ONNX vectors stay within ONNX_COSINE_TOLERANCE of torch and
+how well each backend's nearest neighbours agree with torch's.
+"""
+
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from benchmark_embeddings import make_descriptions
+from embedding_backends import DEFAULT_MODEL, ONNX_COSINE_TOLERANCE, load_model, model_key
+from model_registry import rss_bytes
+
+TOP_K = 10
+
+def ranking_overlap(reference: np.ndarray, candidate: np.ndarray, queries: int = 20) -> float:
+    """Mean overlap of the top-k neighbours of the first ``queries`` texts in both spaces."""
+    overlaps = []
+    for i in range(min(queries, len(reference))):
+        expected = set(np.argsort(-(reference @ reference[i]))[1:TOP_K + 1])
+        actual = set(np.argsort(-(candidate @ candidate[i]))[1:TOP_K + 1])
+        overlaps.append(len(expected & actual) / TOP_K)
+    return float(np.mean(overlaps))
+
+def run_backend(backend: str, corpus, batch_size: int, output_path: str, queue):
+    rss_start = rss_bytes()
+    start = time.perf_counter()
+    model = load_model(model_key(DEFAULT_MODEL, backend))
+    load_seconds = time.perf_counter() - start
+    model.encode(corpus[:8], batch_size=batch_size)  # warm up
+
+    latencies = []
+    for text in corpus:
+        start = time.perf_counter()
+        model.encode([text])
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    vectors = np.asarray(model.encode(corpus, batch_size=batch_size), dtype=np.float32)
+    batch_seconds = time.perf_counter() - start
+    np.save(output_path, vectors)
+
+    queue.put({
+        'backend': backend,
+        'load_s': load_seconds,
+        'texts_per_s': len(corpus) / batch_seconds,
+        'p50_ms': float(np.percentile(latencies, 50)) * 1e3,
+        'p99_ms': float(np.percentile(latencies, 99)) * 1e3,
+        'rss_mb': (rss_bytes() - rss_start) / 1024 / 1024,
+    })
+
+def run_benchmark(backends, count: int, batch_size: int):
+    corpus = make_descriptions(count)
+    context = multiprocessing.get_context("spawn")
+    results = []
+    vectors = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in backends:
+            output_path = os.path.join(tmp, f"{backend}.npy")
+            queue = context.Queue()
+            process = context.Process(target=run_backend, args=(backend, corpus, batch_size, output_path, queue))
+            process.start()
+            results.append(queue.get())
+            process.join()
+            vectors[backend] = np.load(output_path)
+
+    print(f"Encoded {count} texts per backend (batch_size={batch_size})\n")
+    print(f"{'backend':<8} {'load':>8} {'texts/s':>9} {'p50':>9} {'p99':>9} {'RSS':>9}")
+    for r in results:
+        print(f"{r['backend']:<8} {r['load_s']:>7.2f}s {r['texts_per_s']:>9.1f} "
+              f"{r['p50_ms']:>7.2f}ms {r['p99_ms']:>7.2f}ms {r['rss_mb']:>7.1f}MB")
+
+    if 'torch' in vectors:
+        for backend, matrix in vectors.items():
+            if backend == 'torch':
+                continue
+            if backend == 'onnx':
+                cosines = np.sum(vectors['torch'] * matrix, axis=1)
+                status = "✅" if cosines.min() >= 1 - ONNX_COSINE_TOLERANCE else "❌"
+                print(f"\n{status} onnx vs torch cosine: min {cosines.min():.4f}, "
+                      f"mean {cosines.mean():.4f} (tolerance {ONNX_COSINE_TOLERANCE})")
+            # Backends may use a different space (static is PCA-reduced), so also compare rankings
+            print(f"{backend} vs torch top-{TOP_K} overlap: {ranking_overlap(vectors['torch'], matrix):.2%}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark local embedding backends")
+    parser.add_argument("--backends", default="torch,onnx,static", help="Comma-separated backends to compare")
+    parser.add_argument("--count", type=int, default=500, help="Number of texts in the corpus")
+    parser.add_argument("--batch-size", type=int, default=64, help="Encode batch size for the throughput run")
+    args = parser.parse_args()
+    run_benchmark(args.backends.split(","), args.count, args.batch_size)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark Embeddings
+
+This script scores synthetic job postings against one resume on CPU, once
+with the old per-job loop (two encode calls and a scalar cosine per job)
+and once with the batched path (resume encoded once, all descriptions in
+one encode call, one matrix-vector product).
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from embedding_backends import DEFAULT_MODEL, similarity_scores
+
+SKILLS = ["Python", "Java", "SQL", "React", "Docker", "AWS", "TensorFlow", "PyTorch",
+          "Kubernetes", "Pandas", "Node.js", "Git", "Linux", "Spark", "Tableau"]
+ROLES = ["Software Engineering", "Data Science", "Machine Learning", "Frontend", "Backend", "DevOps"]
+
+RESUME = ("Computer science student with internship experience building data pipelines in Python and SQL, "
+          "training machine learning models with PyTorch and deploying services with Docker on AWS.")
+
+def make_descriptions(count: int, seed: int = 5):
+    rng = random.Random(seed)
+    descriptions = []
+    for i in range(count):
+        skills = ", ".join(rng.sample(SKILLS, 5))
+        role = rng.choice(ROLES)
+        descriptions.append(
+            f"Posting {i}: {role} intern wanted. You will work with {skills} on production systems, "
+            f"collaborate with a small team and ship features every sprint. "
+            f"Requirements: coursework in {rng.choice(ROLES).lower()}, strong communication skills."
+        )
+    return descriptions
+
+def per_job_scores(model, descriptions):
+    """Reproduce the old cycle: encode the resume and one description for every job."""
+    scores = []
+    for description in descriptions:
+        resume_embedding = model.encode([RESUME])[0]
+        job_embedding = model.encode([description])[0]
+        scores.append(float(similarity_scores(resume_embedding, job_embedding[np.newaxis, :])[0]))
+    return np.array(scores)
+
+def batched_scores(model, descriptions, batch_size: int):
+    resume_embedding = model.encode([RESUME])[0]
+    job_embeddings = model.encode(descriptions, batch_size=batch_size)
+    return similarity_scores(resume_embedding, job_embeddings)
+
+def run_benchmark(count: int, batch_size: int):
+    from sentence_transformers import SentenceTransformer
+
+    # Encode directly with the model so the embedding cache does not hide the work
+    model = SentenceTransformer(DEFAULT_MODEL, device="cpu")
+    descriptions = make_descriptions(count)
+    model.encode(descriptions[:8])  # warm up
+
+    start = time.perf_counter()
+    loop = per_job_scores(model, descriptions)
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batched = batched_scores(model, descriptions, batch_size)
+    batch_time = time.perf_counter() - start
+
+    print(f"Scored {count} postings on CPU (batch_size={batch_size})\n")
+    print(f"{'path':<12} {'total':>10} {'per job':>10}")
+    print(f"{'per-job':<12} {loop_time:>9.2f}s {loop_time / count * 1e3:>8.2f}ms")
+    print(f"{'batched':<12} {batch_time:>9.2f}s {batch_time / count * 1e3:>8.2f}ms")
+    print(f"\nSpeedup: {loop_time / batch_time:.1f}x, "
+          f"max score difference: {np.max(np.abs(loop - batched)):.2e}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark batched job scoring")
+    parser.add_argument("--count", type=int, default=500, help="Number of job postings")
+    parser.add_argument("--batch-size", type=int, default=64, help="SentenceTransformer encode batch size")
+    args = parser.parse_args()
+    run_benchmark(args.count, args.batch_size)
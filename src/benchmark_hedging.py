@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Benchmark Hedging
+
+This script simulates job-analysis calls against two local stand-in LLM
+servers with injected latency distributions (a lognormal body plus a heavy
+tail) and compares MultiAgentAI with and without request hedging: latency
+percentiles, how many calls were hedged and won by the backup, and the extra
+requests sent.
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import requests
+
+# Keep the benchmark's responses out of the real caches
+os.environ["EMBEDDING_CACHE_DIR"] = tempfile.mkdtemp(prefix="embedding_cache_")
+os.environ["RESPONSE_CACHE_DIR"] = tempfile.mkdtemp(prefix="response_cache_")
+
+from ai_agents import MultiAgentAI
+
+def make_server(median_ms: float, tail_prob: float, tail_mult: float, seed: int):
+    """Stand-in /chat/completions whose delay is lognormal around ``median_ms``, times ``tail_mult`` with ``tail_prob``."""
+    rng = np.random.default_rng(seed)
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        requests_seen = 0
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers['Content-Length']))
+            with lock:
+                type(self).requests_seen += 1
+                delay = median_ms / 1000 * rng.lognormal(0, 0.25)
+                if rng.random() < tail_prob:
+                    delay *= tail_mult
+            time.sleep(delay)
+            content = json.dumps({'required_skills': ['python'], 'experience_level': 'entry'})
+            payload = json.dumps({'choices': [{'message': {'role': 'assistant', 'content': content}}]}).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            try:
+                self.wfile.write(payload)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, Handler
+
+class StandInGemini:
+    """Gemini-shaped client (generate_content(prompt).text) backed by a stand-in server."""
+
+    class Response:
+        def __init__(self, text):
+            self.text = text
+
+    def __init__(self, url: str):
+        self.url = url
+        self.session = requests.Session()
+
+    def generate_content(self, prompt):
+        response = self.session.post(self.url, json={'messages': [{'role': 'user', 'content': prompt}]}, timeout=30)
+        response.raise_for_status()
+        return self.Response(response.json()['choices'][0]['message']['content'])
+
+def run_once(hedging: bool, args) -> dict:
+    primary, primary_handler = make_server(args.median_ms, args.tail_prob, args.tail_mult, seed=1)
+    backup, backup_handler = make_server(args.backup_median_ms, args.tail_prob, args.tail_mult, seed=2)
+    ai = MultiAgentAI({
+        'openai_api_key': 'test', 'gemini_api_key': 'test', 'cohere_api_key': 'test',
+        'groq_api_key': 'test', 'openrouter_api_key': 'test',
+        'llm_hedging': hedging, 'hedge_budget_ratio': args.budget,
+        'router_explore_seconds': 3600,
+    })
+    ai.groq_url = f"http://127.0.0.1:{primary.server_port}/chat/completions"
+    ai.gemini_model = StandInGemini(f"http://127.0.0.1:{backup.server_port}/chat/completions")
+
+    latencies = []
+    for i in range(args.calls):
+        start = time.perf_counter()
+        ai.analyze_job_description(f"Posting {i}: backend intern, Python", bypass_cache=True)
+        latencies.append(time.perf_counter() - start)
+    time.sleep(0.2)  # let abandoned calls land before counting requests
+
+    latencies = np.array(latencies) * 1000
+    stats = ai.get_hedge_stats()
+    result = {
+        'p50': np.percentile(latencies, 50), 'p90': np.percentile(latencies, 90),
+        'p99': np.percentile(latencies, 99), 'max': latencies.max(), 'total_s': latencies.sum() / 1000,
+        'requests': primary_handler.requests_seen + backup_handler.requests_seen,
+        'hedged': stats['hedged'], 'wins': stats['hedge_wins'], 'over_budget': stats['over_budget'],
+    }
+    primary.shutdown()
+    backup.shutdown()
+    return result
+
+def run_benchmark(args):
+    print(f"{args.calls} sequential analyses; primary median {args.median_ms:.0f}ms, backup median "
+          f"{args.backup_median_ms:.0f}ms, tail {args.tail_prob:.0%} x{args.tail_mult:.0f}, "
+          f"hedge budget {args.budget:.0%}\n")
+    print(f"{'mode':<10} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8} {'total':>8} {'requests':>9} "
+          f"{'hedged':>7} {'won':>5} {'capped':>7}")
+    for hedging in (False, True):
+        r = run_once(hedging, args)
+        print(f"{'hedged' if hedging else 'baseline':<10} {r['p50']:>6.0f}ms {r['p90']:>6.0f}ms {r['p99']:>6.0f}ms "
+              f"{r['max']:>6.0f}ms {r['total_s']:>7.1f}s {r['requests']:>9} {r['hedged']:>7} {r['wins']:>5} "
+              f"{r['over_budget']:>7}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate hedged LLM requests against stand-in servers")
+    parser.add_argument("--calls", type=int, default=200, help="Sequential analysis calls per mode")
+    parser.add_argument("--median-ms", type=float, default=80, help="Primary provider median latency")
+    parser.add_argument("--backup-median-ms", type=float, default=120, help="Backup provider median latency")
+    parser.add_argument("--tail-prob", type=float, default=0.05, help="Probability of a slow (tail) response")
+    parser.add_argument("--tail-mult", type=float, default=10, help="Latency multiplier for tail responses")
+    parser.add_argument("--budget", type=float, default=0.15, help="Max share of calls that may be hedged")
+    run_benchmark(parser.parse_args())
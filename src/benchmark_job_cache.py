@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark Job Cache
+
+This script compares the journal-backed JobCache against the previous
+behaviour of rewriting the whole JSON file on every add(), and compares
+startup cost of the exact and Bloom-filter modes.
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from job_cache import JobCache
+
+def make_ids(count: int):
+    return [f"https://www.linkedin.com/jobs/view/{4000000000 + i}/" for i in range(count)]
+
+def legacy_inserts(path: str, ids):
+    """Reproduce the old add(): add to a set and dump the full list each time."""
+    jobs = set()
+    for job_id in ids:
+        jobs.add(job_id)
+        with open(path, "w") as f:
+            json.dump(list(jobs), f)
+
+def journal_inserts(path: str, ids):
+    cache = JobCache(path)
+    for job_id in ids:
+        cache.add(job_id)
+
+def bulk_inserts(path: str, ids, chunk: int = 500):
+    cache = JobCache(path)
+    for i in range(0, len(ids), chunk):
+        cache.add_many(ids[i:i + chunk])
+
+def time_run(fn, ids) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        fn(os.path.join(tmp, "job_cache.json"), ids)
+        return time.perf_counter() - start
+
+def startup_cost(path: str, probabilistic: bool):
+    """Time and peak Python allocations for opening an existing cache."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    cache = JobCache(path, probabilistic=probabilistic)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    cache.exists("https://www.linkedin.com/jobs/view/1/")
+    return elapsed, peak
+
+def run_startup_benchmark(sizes):
+    print(f"\n{'entries':>10} {'exact load':>12} {'exact peak':>12} {'bloom load':>12} {'bloom peak':>12}")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "job_cache.json")
+            cache = JobCache(path, probabilistic=True)
+            cache.add_many(make_ids(size))
+            cache.compact()
+            cache.close()
+            exact_time, exact_peak = startup_cost(path, probabilistic=False)
+            bloom_time, bloom_peak = startup_cost(path, probabilistic=True)
+        print(f"{size:>10} {exact_time:>11.3f}s {exact_peak / 1e6:>10.1f}MB "
+              f"{bloom_time:>11.3f}s {bloom_peak / 1e6:>10.1f}MB")
+
+def run_benchmark(sizes, legacy_max: int):
+    print(f"{'inserts':>10} {'legacy':>12} {'add()':>12} {'add_many()':>12}")
+    for size in sizes:
+        ids = make_ids(size)
+        if size <= legacy_max:
+            legacy = f"{time_run(legacy_inserts, ids):.2f}s"
+        else:
+            legacy = "skipped"
+        journal = time_run(journal_inserts, ids)
+        bulk = time_run(bulk_inserts, ids)
+        print(f"{size:>10} {legacy:>12} {journal:>11.2f}s {bulk:>11.2f}s")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark JobCache inserts")
+    parser.add_argument("--sizes", default="10000,100000", help="Comma-separated insert counts")
+    parser.add_argument("--legacy-max", type=int, default=10000,
+                        help="Largest size to run the quadratic legacy path for")
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",")]
+    run_benchmark(sizes, args.legacy_max)
+    run_startup_benchmark(sizes)
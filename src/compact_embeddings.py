@@ -0,0 +1,131 @@
+"""
+Compact on-disk format for embedding matrices.
+
+Vectors are stored as float16, or as int8 codes with one float32 scale per
+vector (``v ~= codes * scale``), in ``<name>.npy`` (plus ``<name>.scales.npy``
+for int8) next to a ``<name>.json`` file holding the format and one metadata
+dict per row. Files are memory-mapped on load and only the rows being scored
+are dequantized, a chunk at a time.
+"""
+import json
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+FORMATS = ("float32", "float16", "int8")
+SCORE_CHUNK_ROWS = 65536
+
+def quantize(vectors: np.ndarray, fmt: str = "float16") -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """Encode a (rows, dim) matrix; returns (codes, per-row scales or None)."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown embedding format '{fmt}' (expected one of {FORMATS})")
+    matrix = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    if fmt != "int8":
+        return matrix.astype(fmt), None
+    scales = np.abs(matrix).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.clip(np.rint(matrix / scales[:, np.newaxis]), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+def dequantize(codes: np.ndarray, scales: Optional[np.ndarray] = None) -> np.ndarray:
+    """Back to float32 (rows, dim)."""
+    matrix = np.asarray(codes, dtype=np.float32)
+    if scales is not None:
+        matrix = matrix * np.asarray(scales, dtype=np.float32)[:, np.newaxis]
+    return matrix
+
+class CompactEmbeddings:
+    """A saved embedding matrix with its per-row metadata, memory-mapped."""
+
+    def __init__(self, codes: np.ndarray, scales: Optional[np.ndarray], metadata: List[Dict], fmt: str):
+        self.codes = codes
+        self.scales = scales
+        self.metadata = metadata
+        self.format = fmt
+        self._norms: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @property
+    def dim(self) -> int:
+        return self.codes.shape[1] if self.codes.ndim == 2 else 0
+
+    def vectors(self, rows: Optional[Sequence[int]] = None) -> np.ndarray:
+        """Dequantized float32 copies of ``rows`` (all rows by default)."""
+        if rows is None:
+            return dequantize(self.codes, self.scales)
+        rows = np.asarray(rows)
+        return dequantize(self.codes[rows], None if self.scales is None else self.scales[rows])
+
+    def dot(self, query: np.ndarray) -> np.ndarray:
+        """``matrix @ query`` in float32, dequantizing one chunk of rows at a time."""
+        query = np.asarray(query, dtype=np.float32).ravel()
+        out = np.empty(len(self), dtype=np.float32)
+        for start in range(0, len(self), SCORE_CHUNK_ROWS):
+            end = min(start + SCORE_CHUNK_ROWS, len(self))
+            out[start:end] = np.asarray(self.codes[start:end], dtype=np.float32) @ query
+            if self.scales is not None:
+                # Per-row scales commute with the dot product, so apply them afterwards
+                out[start:end] *= self.scales[start:end]
+        return out
+
+    def norms(self) -> np.ndarray:
+        """Row norms, computed once per load."""
+        if self._norms is not None:
+            return self._norms
+        norms = np.empty(len(self), dtype=np.float32)
+        for start in range(0, len(self), SCORE_CHUNK_ROWS):
+            end = min(start + SCORE_CHUNK_ROWS, len(self))
+            norms[start:end] = np.linalg.norm(np.asarray(self.codes[start:end], dtype=np.float32), axis=1)
+            if self.scales is not None:
+                norms[start:end] *= self.scales[start:end]
+        self._norms = norms
+        return norms
+
+    def similarity_scores(self, query: np.ndarray) -> np.ndarray:
+        """Cosine similarity of every row to ``query``, mapped to 0-1 like embedding_backends.similarity_scores."""
+        query = np.asarray(query, dtype=np.float32).ravel()
+        query_norm = np.linalg.norm(query)
+        norms = self.norms()
+        scores = np.zeros(len(self), dtype=np.float32)
+        valid = norms > 0
+        if query_norm == 0 or not valid.any():
+            return scores
+        cosine = self.dot(query / query_norm)[valid] / norms[valid]
+        scores[valid] = (np.clip(cosine, -1.0, 1.0) + 1) / 2
+        return scores
+
+def save_embeddings(path: str, vectors: np.ndarray, metadata: Optional[List[Dict]] = None,
+                    fmt: str = "float16") -> Dict[str, int]:
+    """
+    Write ``vectors`` and their metadata under ``path`` (without extension).
+
+    Returns the bytes written per file, for reporting.
+    """
+    codes, scales = quantize(vectors, fmt)
+    metadata = metadata if metadata is not None else [{} for _ in range(len(codes))]
+    if len(metadata) != len(codes):
+        raise ValueError(f"{len(metadata)} metadata rows for {len(codes)} vectors")
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    np.save(f"{path}.npy", codes)
+    files = [f"{path}.npy"]
+    if scales is not None:
+        np.save(f"{path}.scales.npy", scales)
+        files.append(f"{path}.scales.npy")
+    with open(f"{path}.json", "w", encoding="utf-8") as f:
+        json.dump({'format': fmt, 'count': len(codes), 'dim': codes.shape[1], 'items': metadata},
+                  f, ensure_ascii=False)
+    files.append(f"{path}.json")
+    return {os.path.basename(name): os.path.getsize(name) for name in files}
+
+def load_embeddings(path: str, mmap: bool = True) -> CompactEmbeddings:
+    """Open embeddings saved with save_embeddings (memory-mapped unless ``mmap`` is False)."""
+    with open(f"{path}.json", encoding="utf-8") as f:
+        header = json.load(f)
+    mode = "r" if mmap else None
+    codes = np.load(f"{path}.npy", mmap_mode=mode)
+    scales = np.load(f"{path}.scales.npy", mmap_mode=mode) if header['format'] == "int8" else None
+    return CompactEmbeddings(codes, scales, header['items'], header['format'])
@@ -4,10 +4,12 @@ AI Embedding Agent for generating text embeddings with Cohere v3 and fallback to
 import os
 import time
 import logging
+import threading
+import warnings
 from typing import List, Optional, Dict, Any
-import concurrent.futures
-from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures import Future, ThreadPoolExecutor
 import backoff
+import httpx
 import numpy as np
 import cohere
 from openai import OpenAI
@@ -17,6 +19,19 @@ os.environ["TOKENIZERS_PARALLELISM"] = "false"
 
 logger = logging.getLogger(__name__)
 
+class BatchEmbeddings(list):
+    """
+    Embedding batches in input order.
+    
+    Batches that failed (or came back with missing vectors) hold ``[]`` for every
+    missing text and are listed in ``failed``; ``errors`` maps their index to the reason.
+    """
+    
+    def __init__(self, batches: List[List[List[float]]], failed: List[int], errors: Dict[int, str]):
+        super().__init__(batches)
+        self.failed = failed
+        self.errors = errors
+
 class EmbeddingAgent:
     """
     AI Embedding Agent that generates embeddings using Cohere v3 with fallback to OpenAI.
@@ -27,20 +42,46 @@ class EmbeddingAgent:
     EMBEDDING_TIMEOUT = 30  # seconds
     MAX_RETRIES = 2
     
-    def __init__(self, cohere_api_key: str, openai_api_key: Optional[str] = None):
+    def __init__(self, cohere_api_key: str, openai_api_key: Optional[str] = None,
+                 max_workers: int = 4, max_in_flight: Optional[int] = None):
         """
         Initialize the Embedding Agent.
         
         Args:
             cohere_api_key: API key for Cohere
             openai_api_key: Optional API key for OpenAI fallback
+            max_workers: Size of the agent's worker pool for parallel batches
+            max_in_flight: Most batches submitted but not finished at once (default 2 * max_workers)
+        """
+        # The HTTP clients enforce the timeout, so no helper thread is needed per request
+        self.cohere_client = cohere.Client(cohere_api_key, timeout=self.EMBEDDING_TIMEOUT)
+        self.openai_client = OpenAI(api_key=openai_api_key, timeout=self.EMBEDDING_TIMEOUT) if openai_api_key else None
+        self.max_in_flight = max_in_flight or 2 * max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="embedding-agent")
+        # Validated lazily: by the first real Cohere response or an explicit warmup()
+        self._validated = threading.Event()
+    
+    @property
+    def validated(self) -> bool:
+        return self._validated.is_set()
+    
+    def warmup(self, background: bool = False) -> Optional[Future]:
+        """
+        Validate the Cohere connection ahead of the first real request.
+        
+        Args:
+            background: Run on the agent's pool and return a Future, so startup work
+                        (resume parsing, browser launch) can overlap the round trip
         """
-        self.cohere_client = cohere.Client(cohere_api_key)
-        self.openai_client = OpenAI(api_key=openai_api_key) if openai_api_key else None
+        if background:
+            return self._executor.submit(self._validate_cohere_connection)
         self._validate_cohere_connection()
+        return None
     
     def _validate_cohere_connection(self):
-        """Validate Cohere connection and model availability."""
+        """Validate Cohere connection and model availability (no-op once validated)."""
+        if self.validated:
+            return
         try:
             # Simple validation by getting a small embedding
             test_embedding = self._get_cohere_embedding(["test"])[0]
@@ -70,30 +111,27 @@ class EmbeddingAgent:
         Returns:
             List of embedding vectors
         """
-        with ThreadPoolExecutor(max_workers=1) as executor:
-            future = executor.submit(
-                self.cohere_client.embed,
+        try:
+            response = self.cohere_client.embed(
                 model="embed-english-v3.0",
                 texts=texts,
                 input_type="search_document"
             )
+            embeddings = response.embeddings
             
-            try:
-                response = future.result(timeout=self.EMBEDDING_TIMEOUT)
-                embeddings = response.embeddings
-                
-                # Validate embedding dimensions
-                if any(len(emb) != self.COHERE_EMBED_DIM for emb in embeddings):
-                    raise ValueError("Invalid embedding dimension received from Cohere")
-                    
-                return embeddings
+            # Validate embedding dimensions; the first good response also validates the connection
+            if any(len(emb) != self.COHERE_EMBED_DIM for emb in embeddings):
+                raise ValueError("Invalid embedding dimension received from Cohere")
+            self._validated.set()
                 
-            except FutureTimeoutError:
-                logger.warning("Cohere embedding request timed out")
-                raise TimeoutError("Cohere embedding request timed out")
-            except Exception as e:
-                logger.error(f"Error getting Cohere embeddings: {str(e)}")
-                raise
+            return embeddings
+            
+        except httpx.TimeoutException:
+            logger.warning("Cohere embedding request timed out")
+            raise TimeoutError("Cohere embedding request timed out")
+        except Exception as e:
+            logger.error(f"Error getting Cohere embeddings: {str(e)}")
+            raise
     
     def _get_openai_embedding(self, texts: List[str]) -> List[List[float]]:
         """
@@ -176,30 +214,59 @@ class EmbeddingAgent:
     def batch_get_embeddings(
         self, 
         texts_list: List[List[str]], 
-        max_workers: int = 4
-    ) -> List[List[List[float]]]:
+        max_in_flight: Optional[int] = None,
+        max_workers: Optional[int] = None
+    ) -> BatchEmbeddings:
         """
-        Process multiple batches of texts in parallel.
+        Process multiple batches of texts in parallel on the agent's worker pool.
         
         Args:
             texts_list: List of text batches to process
-            max_workers: Maximum number of parallel workers
+            max_in_flight: Cap on batches submitted but not yet finished (default: the agent's)
+            max_workers: Deprecated and ignored; size the pool with EmbeddingAgent(max_workers=...)
             
         Returns:
-            List of embedding batches
+            BatchEmbeddings with one entry per input batch, in input order
         """
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = [
-                executor.submit(self.get_embeddings, batch)
-                for batch in texts_list
-            ]
-            
-            results = []
-            for future in concurrent.futures.as_completed(futures):
-                try:
-                    results.append(future.result())
-                except Exception as e:
-                    logger.error(f"Error in batch processing: {str(e)}")
-                    results.append([])
-                    
-        return results
+        if max_workers is not None:
+            warnings.warn(
+                "batch_get_embeddings(max_workers=...) is ignored; pass max_workers to EmbeddingAgent instead",
+                DeprecationWarning, stacklevel=2
+            )
+        limit = threading.BoundedSemaphore(max_in_flight or self.max_in_flight)
+        futures = []
+        for batch in texts_list:
+            # Block here rather than queueing thousands of batches at once
+            limit.acquire()
+            future = self._executor.submit(self.get_embeddings, batch)
+            future.add_done_callback(lambda _: limit.release())
+            futures.append(future)
+        
+        results, failed, errors = [], [], {}
+        for index, (batch, future) in enumerate(zip(texts_list, futures)):
+            try:
+                embeddings = future.result()
+                missing = [i for i, embedding in enumerate(embeddings) if not embedding]
+                if missing:
+                    failed.append(index)
+                    errors[index] = f"missing embeddings for texts {missing}"
+            except Exception as e:
+                logger.error(f"Error in batch {index}: {str(e)}")
+                embeddings = [[] for _ in batch]
+                failed.append(index)
+                errors[index] = str(e)
+            results.append(embeddings)
+        
+        if failed:
+            logger.warning(f"{len(failed)}/{len(texts_list)} embedding batches failed: {failed}")
+        return BatchEmbeddings(results, failed, errors)
+    
+    def close(self):
+        """Shut down the agent's worker pool."""
+        self._executor.shutdown(wait=True)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
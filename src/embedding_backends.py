@@ -0,0 +1,243 @@
+"""
+Pluggable local embedding backends.
+
+Every backend returns an object with ``encode(texts, batch_size=32)`` giving one
+L2-normalized float32 row per text, so ResumeParser, SkillMatcher and the
+embedding cache do not care which one is active. The backend is chosen with
+EMBEDDING_BACKEND:
+
+- ``torch``: sentence-transformers on PyTorch (default)
+- ``onnx``: the same model exported to ONNX and int8 dynamically quantized,
+  run with ONNX Runtime and a Rust ``tokenizers`` tokenizer (no torch at runtime).
+  Cosine similarity to the torch embedding of the same text stays at or above
+  ``1 - ONNX_COSINE_TOLERANCE``; benchmark_embedding_backends.py checks this.
+- ``static``: a distilled token->vector table, memory-mapped from a ``.npy``
+  file and mean-pooled in NumPy. Needs only numpy and ``tokenizers``, encodes
+  in well under a millisecond per text, and is what the Lambda bundle ships.
+
+Backend-qualified model keys (``"onnx:all-MiniLM-L6-v2"``) keep vectors from
+different backends apart in the model registry and the embedding cache.
+"""
+import logging
+import os
+from typing import Callable, Dict, List
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BACKEND = "torch"
+DEFAULT_MODEL = "all-MiniLM-L6-v2"
+ONNX_COSINE_TOLERANCE = 0.02
+ONNX_MODEL_FILE = "model_qint8.onnx"
+STATIC_VECTORS_FILE = "embeddings.npy"
+MAX_SEQ_LENGTH = 256  # all-MiniLM-L6-v2's max_seq_length
+
+def selected_backend() -> str:
+    return os.getenv("EMBEDDING_BACKEND", DEFAULT_BACKEND).strip().lower() or DEFAULT_BACKEND
+
+def model_key(model_name: str, backend: str = None) -> str:
+    """Registry/cache key for ``model_name`` on ``backend`` (the configured one by default)."""
+    backend = backend or selected_backend()
+    return model_name if backend == "torch" else f"{backend}:{model_name}"
+
+def split_model_key(key: str):
+    backend, _, model_name = key.rpartition(":")
+    return backend or "torch", model_name
+
+def _l2_normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+def similarity_scores(query: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+    """
+    Cosine similarity of ``query`` against every row of ``matrix`` in one matrix-vector product.
+
+    Scores are mapped from [-1, 1] to [0, 1]; zero rows (or a zero query) score 0.0.
+    """
+    query_vec = np.asarray(query, dtype=np.float32).ravel()
+    rows = np.atleast_2d(np.asarray(matrix, dtype=np.float32))
+    if rows.shape[1] != query_vec.shape[0]:
+        raise ValueError(f"Embedding dimension mismatch: query={query_vec.shape}, rows={rows.shape}")
+
+    query_norm = np.linalg.norm(query_vec)
+    row_norms = np.linalg.norm(rows, axis=1)
+    scores = np.zeros(len(rows), dtype=np.float32)
+    valid = row_norms > 0
+    if query_norm == 0 or not valid.any():
+        return scores
+
+    cosine = rows[valid] @ (query_vec / query_norm) / row_norms[valid]
+    scores[valid] = (np.clip(cosine, -1.0, 1.0) + 1) / 2
+    return scores
+
+def load_torch(model_name: str):
+    """sentence-transformers model; torch is imported here, on first load only."""
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name)
+
+class OnnxEmbeddingModel:
+    """Mean-pooled, normalized sentence embeddings from a (quantized) ONNX transformer."""
+
+    def __init__(self, model_dir: str, model_file: str = ONNX_MODEL_FILE, num_threads: int = None):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(
+            os.path.join(model_dir, model_file), options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {node.name for node in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=MAX_SEQ_LENGTH)
+        self.tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")
+
+    def encode(self, texts: List[str], batch_size: int = 32, **kwargs) -> np.ndarray:
+        if isinstance(texts, str):
+            texts = [texts]
+        rows = []
+        for i in range(0, len(texts), batch_size):
+            encodings = self.tokenizer.encode_batch(list(texts[i:i + batch_size]))
+            input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+            attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+            feeds = {'input_ids': input_ids, 'attention_mask': attention_mask}
+            if 'token_type_ids' in self.input_names:
+                feeds['token_type_ids'] = np.zeros_like(input_ids)
+            token_embeddings = self.session.run(None, feeds)[0]
+
+            # Mean pooling over real tokens, as the sentence-transformers Pooling layer does
+            mask = attention_mask[:, :, np.newaxis].astype(np.float32)
+            pooled = (token_embeddings * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+            rows.append(_l2_normalize(pooled.astype(np.float32)))
+        return np.vstack(rows) if rows else np.zeros((0, 0), dtype=np.float32)
+
+def load_onnx(model_name: str):
+    model_dir = os.getenv("EMBEDDING_ONNX_DIR", os.path.join("models", f"{model_name}-onnx"))
+    if not os.path.exists(os.path.join(model_dir, ONNX_MODEL_FILE)):
+        raise FileNotFoundError(
+            f"No ONNX model in {model_dir}; run `python embedding_backends.py export {model_name} {model_dir}`"
+        )
+    return OnnxEmbeddingModel(model_dir)
+
+def export_onnx(model_name: str, output_dir: str, quantize: bool = True) -> str:
+    """
+    Export a sentence-transformers model to ONNX and int8-quantize it (build-time step, needs torch).
+
+    Writes ``model.onnx``, ``model_qint8.onnx`` and ``tokenizer.json`` to ``output_dir``.
+    """
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    os.makedirs(output_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(f"sentence-transformers/{model_name}")
+    model = AutoModel.from_pretrained(f"sentence-transformers/{model_name}").eval()
+    tokenizer.backend_tokenizer.save(os.path.join(output_dir, "tokenizer.json"))
+
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    fp32_path = os.path.join(output_dir, "model.onnx")
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            (sample['input_ids'], sample['attention_mask'], sample['token_type_ids']),
+            fp32_path,
+            input_names=['input_ids', 'attention_mask', 'token_type_ids'],
+            output_names=['last_hidden_state'],
+            dynamic_axes={name: {0: 'batch', 1: 'sequence'}
+                          for name in ('input_ids', 'attention_mask', 'token_type_ids', 'last_hidden_state')},
+            opset_version=14,
+        )
+
+    if not quantize:
+        return fp32_path
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    quantized_path = os.path.join(output_dir, ONNX_MODEL_FILE)
+    quantize_dynamic(fp32_path, quantized_path, weight_type=QuantType.QInt8)
+    logger.info(f"✅ Exported {model_name} to {quantized_path}")
+    return quantized_path
+
+class StaticEmbeddingModel:
+    """Mean of per-token static vectors; no transformer forward pass at all."""
+
+    def __init__(self, model_dir: str):
+        from tokenizers import Tokenizer
+
+        # Memory-mapped, so only the rows for tokens actually seen are paged in
+        self.vectors = np.load(os.path.join(model_dir, STATIC_VECTORS_FILE), mmap_mode="r")
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.no_padding()
+        self.tokenizer.enable_truncation(max_length=512)
+
+    def encode(self, texts: List[str], batch_size: int = 32, **kwargs) -> np.ndarray:
+        if isinstance(texts, str):
+            texts = [texts]
+        pooled = np.zeros((len(texts), self.vectors.shape[1]), dtype=np.float32)
+        for i in range(0, len(texts), batch_size):
+            encodings = self.tokenizer.encode_batch(list(texts[i:i + batch_size]), add_special_tokens=False)
+            for j, encoding in enumerate(encodings, start=i):
+                if encoding.ids:
+                    pooled[j] = self.vectors[np.asarray(encoding.ids)].astype(np.float32).mean(axis=0)
+        return _l2_normalize(pooled)
+
+def load_static(model_name: str):
+    model_dir = os.getenv("EMBEDDING_STATIC_DIR", os.path.join("models", f"{model_name}-static"))
+    if not os.path.exists(os.path.join(model_dir, STATIC_VECTORS_FILE)):
+        raise FileNotFoundError(
+            f"No static embeddings in {model_dir}; run `python embedding_backends.py distill {model_name} {model_dir}`"
+        )
+    return StaticEmbeddingModel(model_dir)
+
+def distill_static(model_name: str, output_dir: str, dimensions: int = 256, batch_size: int = 1024) -> str:
+    """
+    Build a static token table from a sentence-transformers model (build-time step, needs torch).
+
+    Every vocabulary token is embedded on its own with the full model, the table is reduced
+    to ``dimensions`` with PCA and stored as float16 in ``embeddings.npy`` next to ``tokenizer.json``.
+    """
+    from tokenizers import Tokenizer
+    from transformers import AutoTokenizer
+
+    os.makedirs(output_dir, exist_ok=True)
+    hf_tokenizer = AutoTokenizer.from_pretrained(f"sentence-transformers/{model_name}")
+    tokenizer_path = os.path.join(output_dir, "tokenizer.json")
+    hf_tokenizer.backend_tokenizer.save(tokenizer_path)
+
+    vocab = Tokenizer.from_file(tokenizer_path).get_vocab()
+    tokens = [token for token, _ in sorted(vocab.items(), key=lambda item: item[1])]
+    model = load_torch(model_name)
+    table = np.asarray(model.encode(tokens, batch_size=batch_size, normalize_embeddings=False), dtype=np.float32)
+
+    if dimensions and dimensions < table.shape[1]:
+        centered = table - table.mean(axis=0)
+        _, _, components = np.linalg.svd(centered, full_matrices=False)
+        table = centered @ components[:dimensions].T
+
+    vectors_path = os.path.join(output_dir, STATIC_VECTORS_FILE)
+    np.save(vectors_path, table.astype(np.float16))
+    logger.info(f"✅ Distilled {len(tokens)} token vectors ({table.shape[1]} dims) to {vectors_path}")
+    return vectors_path
+
+BACKENDS: Dict[str, Callable[[str], object]] = {
+    'torch': load_torch,
+    'onnx': load_onnx,
+    'static': load_static,
+}
+
+def load_model(key: str):
+    """Model registry loader: ``key`` is a model name, optionally prefixed with ``backend:``."""
+    backend, model_name = split_model_key(key)
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend '{backend}' (expected one of {sorted(BACKENDS)})")
+    return BACKENDS[backend](model_name)
+
+if __name__ == "__main__":
+    import sys
+    commands = {'export': export_onnx, 'distill': distill_static}
+    if len(sys.argv) != 4 or sys.argv[1] not in commands:
+        print("Usage: python embedding_backends.py {export|distill} <model_name> <output_dir>")
+        sys.exit(1)
+    logging.basicConfig(level=logging.INFO)
+    commands[sys.argv[1]](sys.argv[2], sys.argv[3])
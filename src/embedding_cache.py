@@ -0,0 +1,288 @@
+"""
+Persistent, content-addressed cache for text embeddings.
+
+Vectors are keyed by (provider, model, hash of the normalized text) and stored
+as float32 rows in one append-only file that is read through a memory map. A
+small SQLite table maps each key to its offset and dimension and records the
+last access time, which drives LRU eviction once the cache exceeds its size cap.
+Compaction writes a new, numbered vector file and switches to it in the same
+transaction that rewrites the offsets, so a crash leaves the old pair intact.
+"""
+import glob
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class EmbeddingCache:
+    """Disk-backed embedding cache shared by every similarity path."""
+
+    def __init__(self, cache_dir: str = "embedding_cache", max_bytes: int = 256 * 1024 * 1024):
+        """
+        Open (or create) the cache.
+
+        Args:
+            cache_dir: Directory holding ``index.db`` and the vector file it names (``vectors.f32`` at first)
+            max_bytes: Upper bound on live vector bytes before LRU eviction kicks in
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+        self.index_file = os.path.join(cache_dir, "index.db")
+        self._lock = threading.Lock()
+        self._map: Optional[np.memmap] = None
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'compactions': 0}
+
+        self.conn = sqlite3.connect(self.index_file, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                provider TEXT NOT NULL,
+                model TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                offset INTEGER NOT NULL,
+                dim INTEGER NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (provider, model, text_hash)
+            );
+            CREATE INDEX IF NOT EXISTS idx_embeddings_last_access ON embeddings(last_access);
+            CREATE TABLE IF NOT EXISTS state (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+        """)
+        row = self.conn.execute("SELECT value FROM state WHERE key = 'vectors_file'").fetchone()
+        self.vectors_file = os.path.join(cache_dir, row[0] if row else "vectors.f32")
+        self._live_floats = self.conn.execute("SELECT COALESCE(SUM(dim), 0) FROM embeddings").fetchone()[0]
+        if not os.path.exists(self.vectors_file):
+            open(self.vectors_file, "wb").close()
+        # Vector files left by a compaction that was interrupted before or after its commit
+        for path in glob.glob(os.path.join(cache_dir, "vectors*.f32*")):
+            if os.path.abspath(path) != os.path.abspath(self.vectors_file):
+                os.remove(path)
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Canonical form used for hashing: NFC, collapsed whitespace, trimmed."""
+        return " ".join(unicodedata.normalize("NFC", text or "").split())
+
+    @classmethod
+    def text_hash(cls, text: str) -> str:
+        return hashlib.sha256(cls.normalize(text).encode("utf-8")).hexdigest()
+
+    def _vectors(self, end: int) -> np.memmap:
+        """Memory map covering at least ``end`` floats, remapping after appends."""
+        if self._map is None or len(self._map) < end:
+            self._map = np.memmap(self.vectors_file, dtype=np.float32, mode="r")
+        return self._map
+
+    def _existing(self, provider: str, model: str, hashes: Sequence[str]) -> Dict[str, tuple]:
+        """Map the hashes already cached for (provider, model) to their (offset, dim)."""
+        rows = {}
+        unique = list(dict.fromkeys(hashes))
+        for i in range(0, len(unique), 500):
+            chunk = unique[i:i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            for text_hash, offset, dim in self.conn.execute(
+                f"SELECT text_hash, offset, dim FROM embeddings "
+                f"WHERE provider = ? AND model = ? AND text_hash IN ({placeholders})",
+                (provider, model, *chunk)
+            ):
+                rows[text_hash] = (offset, dim)
+        return rows
+
+    def get_many(self, provider: str, model: str, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """Look up embeddings for ``texts``; misses come back as None."""
+        hashes = [self.text_hash(text) for text in texts]
+        results: List[Optional[np.ndarray]] = [None] * len(texts)
+        with self._lock:
+            rows = self._existing(provider, model, hashes)
+            for i, text_hash in enumerate(hashes):
+                if text_hash in rows:
+                    offset, dim = rows[text_hash]
+                    results[i] = np.array(self._vectors(offset + dim)[offset:offset + dim])
+                    self.stats['hits'] += 1
+                else:
+                    self.stats['misses'] += 1
+
+            if rows:
+                now = time.time()
+                with self.conn:
+                    self.conn.executemany(
+                        "UPDATE embeddings SET last_access = ? WHERE provider = ? AND model = ? AND text_hash = ?",
+                        [(now, provider, model, text_hash) for text_hash in rows]
+                    )
+        return results
+
+    def get(self, provider: str, model: str, text: str) -> Optional[np.ndarray]:
+        return self.get_many(provider, model, [text])[0]
+
+    def put_many(self, provider: str, model: str, texts: Sequence[str], vectors: Sequence[Sequence[float]]):
+        """Store embeddings for ``texts`` (existing entries are left untouched)."""
+        now = time.time()
+        hashes = [self.text_hash(text) for text in texts]
+        with self._lock:
+            seen = set(self._existing(provider, model, hashes))
+            offset = os.path.getsize(self.vectors_file) // 4
+            rows = []
+            with open(self.vectors_file, "ab") as f:
+                for text_hash, vector in zip(hashes, vectors):
+                    if text_hash in seen:
+                        continue
+                    seen.add(text_hash)
+                    data = np.asarray(vector, dtype=np.float32).ravel()
+                    f.write(data.tobytes())
+                    rows.append((provider, model, text_hash, offset, len(data), now))
+                    offset += len(data)
+            if not rows:
+                return
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT INTO embeddings (provider, model, text_hash, offset, dim, last_access) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+            self._live_floats += sum(row[4] for row in rows)
+            self._evict_if_needed()
+
+    def put(self, provider: str, model: str, text: str, vector: Sequence[float]):
+        self.put_many(provider, model, [text], [vector])
+
+    def get_or_compute(self, provider: str, model: str, texts: Sequence[str],
+                       compute: Callable[[List[str]], Sequence[Sequence[float]]]) -> List[np.ndarray]:
+        """
+        Return embeddings for ``texts`` in order, calling ``compute`` only for the misses.
+
+        Args:
+            provider: Embedding provider name (e.g. "cohere", "sentence-transformers")
+            model: Model name within the provider
+            texts: Texts to embed
+            compute: Function embedding a list of texts, returning vectors in the same order
+        """
+        results = self.get_many(provider, model, texts)
+        missing = [i for i, vector in enumerate(results) if vector is None]
+        if missing:
+            computed = compute([texts[i] for i in missing])
+            if len(computed) != len(missing):
+                raise ValueError(f"{provider}/{model} returned {len(computed)} embeddings for {len(missing)} texts")
+            self.put_many(provider, model, [texts[i] for i in missing], computed)
+            for i, vector in zip(missing, computed):
+                results[i] = np.asarray(vector, dtype=np.float32)
+        return results
+
+    def _evict_if_needed(self):
+        """Drop least-recently-used entries until live vectors fit in max_bytes."""
+        if self._live_floats * 4 <= self.max_bytes:
+            return
+        target = int(self.max_bytes * 0.9) // 4
+        doomed = []
+        live = self._live_floats
+        for provider, model, text_hash, dim in self.conn.execute(
+            "SELECT provider, model, text_hash, dim FROM embeddings ORDER BY last_access"
+        ):
+            if live <= target:
+                break
+            doomed.append((provider, model, text_hash))
+            live -= dim
+        with self.conn:
+            self.conn.executemany(
+                "DELETE FROM embeddings WHERE provider = ? AND model = ? AND text_hash = ?", doomed
+            )
+        self._live_floats = live
+        self.stats['evictions'] += len(doomed)
+        logger.info(f"Evicted {len(doomed)} cached embeddings")
+
+        # Reclaim the file space once more than half of it is dead
+        if os.path.getsize(self.vectors_file) // 4 > 2 * self._live_floats:
+            self._compact()
+
+    def _compact(self):
+        """Copy the live rows to a new vector file, then switch to it together with the new offsets.
+
+        The offsets and the name of the current file change in one transaction; the old
+        file is only removed after the commit.
+        """
+        vectors = self._vectors(os.path.getsize(self.vectors_file) // 4)
+        generation = self.conn.execute("SELECT value FROM state WHERE key = 'generation'").fetchone()
+        generation = int(generation[0]) + 1 if generation else 1
+        new_name = f"vectors.{generation}.f32"
+        new_file = os.path.join(self.cache_dir, new_name)
+        updates = []
+        offset = 0
+        try:
+            with open(new_file, "wb") as f:
+                for provider, model, text_hash, old_offset, dim in self.conn.execute(
+                    "SELECT provider, model, text_hash, offset, dim FROM embeddings ORDER BY offset"
+                ):
+                    f.write(np.asarray(vectors[old_offset:old_offset + dim]).tobytes())
+                    updates.append((offset, provider, model, text_hash))
+                    offset += dim
+                f.flush()
+                os.fsync(f.fileno())
+            with self.conn:
+                self.conn.executemany(
+                    "UPDATE embeddings SET offset = ? WHERE provider = ? AND model = ? AND text_hash = ?", updates
+                )
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)",
+                    [('vectors_file', new_name), ('generation', str(generation))]
+                )
+        except Exception as e:
+            logger.warning(f"Embedding cache compaction failed, keeping the current file: {e}")
+            if os.path.exists(new_file):
+                os.remove(new_file)
+            return
+        old_file = self.vectors_file
+        self._map = None
+        self.vectors_file = new_file
+        os.remove(old_file)
+        self.stats['compactions'] += 1
+
+    def hit_rate(self) -> float:
+        lookups = self.stats['hits'] + self.stats['misses']
+        return self.stats['hits'] / lookups if lookups else 0.0
+
+    def get_stats(self) -> Dict:
+        return {
+            **self.stats,
+            'hit_rate': round(self.hit_rate(), 4),
+            'entries': self.conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0],
+            'live_bytes': self._live_floats * 4,
+        }
+
+    def close(self):
+        self._map = None
+        self.conn.close()
+
+_shared_cache: Optional[EmbeddingCache] = None
+_shared_lock = threading.Lock()
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Process-wide cache instance, configured from EMBEDDING_CACHE_DIR / EMBEDDING_CACHE_MAX_MB."""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = EmbeddingCache(
+                cache_dir=os.getenv("EMBEDDING_CACHE_DIR", "embedding_cache"),
+                max_bytes=int(float(os.getenv("EMBEDDING_CACHE_MAX_MB", 256)) * 1024 * 1024)
+            )
+        return _shared_cache
+
+def cached_encode(model, model_name: str, texts: List[str],
+                  provider: str = "sentence-transformers", batch_size: int = 32) -> List[np.ndarray]:
+    """Encode ``texts`` with a local model (anything with ``encode(list)``), reusing cached vectors.
+
+    All cache misses go through a single ``encode(..., batch_size=batch_size)`` call.
+    """
+    return get_embedding_cache().get_or_compute(
+        provider, model_name, texts, lambda missing: model.encode(missing, batch_size=batch_size)
+    )
@@ -0,0 +1,121 @@
+"""
+Pooled keep-alive HTTP sessions for the LLM providers.
+
+Each provider gets one ``requests.Session`` whose connection pool holds at
+most ``pool_size`` connections, so repeated calls reuse TCP/TLS connections
+instead of handshaking every time. Every request carries a (connect, read)
+timeout. A semaphore sized like the pool hands out connection slots, which
+makes the time spent waiting for a free connection measurable; it is recorded
+alongside the request latency.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 8
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_READ_TIMEOUT = 60.0
+LATENCY_WINDOW = 500  # recent requests kept for percentiles
+
+class ProviderSession:
+    """Keep-alive session for one provider with a bounded pool, timeouts and latency stats."""
+
+    def __init__(self, name: str, pool_size: int = DEFAULT_POOL_SIZE,
+                 connect_timeout: float = DEFAULT_CONNECT_TIMEOUT, read_timeout: float = DEFAULT_READ_TIMEOUT):
+        """
+        Args:
+            name: Provider name, used in logs and stats
+            pool_size: Maximum concurrent connections (callers beyond this wait for a slot)
+            connect_timeout: Seconds allowed to establish a connection
+            read_timeout: Seconds allowed between bytes of the response
+        """
+        self.name = name
+        self.pool_size = pool_size
+        self.timeout = (connect_timeout, read_timeout)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._waits = deque(maxlen=LATENCY_WINDOW)
+        self.stats = {'requests': 0, 'errors': 0, 'timeouts': 0}
+
+    def request(self, method: str, url: str, timeout=None, **kwargs) -> requests.Response:
+        """Send a request on the pooled session; latency includes any wait for a free connection."""
+        start = time.perf_counter()
+        with self._slots:
+            acquired = time.perf_counter()
+            try:
+                return self.session.request(method, url, timeout=timeout or self.timeout, **kwargs)
+            except requests.Timeout:
+                self._record('timeouts')
+                raise
+            except requests.RequestException:
+                self._record('errors')
+                raise
+            finally:
+                end = time.perf_counter()
+                with self._lock:
+                    self.stats['requests'] += 1
+                    self._waits.append(acquired - start)
+                    self._latencies.append(end - start)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def _record(self, counter: str):
+        with self._lock:
+            self.stats[counter] += 1
+
+    @staticmethod
+    def _percentile(samples, q: float) -> float:
+        if not samples:
+            return 0.0
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            latencies, waits = list(self._latencies), list(self._waits)
+            stats = dict(self.stats)
+        return {
+            **stats,
+            'pool_size': self.pool_size,
+            'p50_ms': round(self._percentile(latencies, 0.5) * 1000, 1),
+            'p90_ms': round(self._percentile(latencies, 0.9) * 1000, 1),
+            'p99_ms': round(self._percentile(latencies, 0.99) * 1000, 1),
+            'pool_wait_p90_ms': round(self._percentile(waits, 0.9) * 1000, 1),
+        }
+
+    def close(self):
+        self.session.close()
+
+_sessions: Dict[str, ProviderSession] = {}
+_sessions_lock = threading.Lock()
+
+def get_provider_session(name: str, pool_size: Optional[int] = None, connect_timeout: Optional[float] = None,
+                         read_timeout: Optional[float] = None) -> ProviderSession:
+    """Process-wide session for ``name``; settings apply when it is first created."""
+    with _sessions_lock:
+        if name not in _sessions:
+            _sessions[name] = ProviderSession(
+                name,
+                pool_size=pool_size or DEFAULT_POOL_SIZE,
+                connect_timeout=connect_timeout or DEFAULT_CONNECT_TIMEOUT,
+                read_timeout=read_timeout or DEFAULT_READ_TIMEOUT,
+            )
+        return _sessions[name]
+
+def get_http_stats() -> Dict[str, Dict]:
+    with _sessions_lock:
+        sessions = list(_sessions.values())
+    return {session.name: session.get_stats() for session in sessions}
@@ -21,6 +21,10 @@ from .skill_matcher import SkillMatcher
 from .application_automator import ApplicationAutomator
 from .application_tracker import ApplicationTracker
 from .ai_agents import MultiAgentAI
+from .embedding_cache import get_embedding_cache
+from .model_registry import get_model_registry
+from .similarity_service import SimilarityService
+from .job_embedding_store import JobEmbeddingStore
 
 class InternshipBot:
     def __init__(self, config: Dict = None):
@@ -55,6 +59,16 @@ class InternshipBot:
         self.resume_parser = ResumeParser(user_config)
         self.job_scraper = JobScraper()
         self.skill_matcher = SkillMatcher()
+        self.similarity_service = SimilarityService.from_components(
+            self.resume_parser, self.ai_agents,
+            preferred=user_config.get('embedding_model'),
+            local_batch_size=self.config.get('embedding_batch_size', 64)
+        )
+        # History of every scored posting, one store per embedding space
+        self.job_store_dir = os.getenv('JOB_EMBEDDING_STORE_DIR', 'job_embeddings')
+        self._job_stores: Dict[str, JobEmbeddingStore] = {}
+        # Parsed resumes with their embedding in compact form, reused while the file is unchanged
+        self.parsed_resume_dir = os.getenv('PARSED_RESUME_DIR', 'parsed_resumes')
         self.application_automator = ApplicationAutomator(
             openai_api_key=user_config['openai_api_key']
         )
@@ -84,6 +98,7 @@ class InternshipBot:
             'application_delay': int(os.getenv('APPLICATION_DELAY', 30)),
             'max_applications_per_run': int(os.getenv('MAX_APPLICATIONS_PER_RUN', 10)),
             'run_interval_hours': int(os.getenv('RUN_INTERVAL_HOURS', 6)),
+            'embedding_batch_size': int(os.getenv('EMBEDDING_BATCH_SIZE', 64)),
             'internship_titles': os.getenv('INTERNSHIP_TITLES', '').split(','),
             'user_name': os.getenv('USER_NAME', ''),
             'user_email': os.getenv('USER_EMAIL', ''),
@@ -110,8 +125,8 @@ class InternshipBot:
         try:
             self.logger.info(f"Loading resume from: {resume_path}")
             
-            # Parse resume using multi-agent AI
-            self.resume_data = self.resume_parser.parse_resume(resume_path)
+            # Parse resume using multi-agent AI (or reuse the stored parse of the same file)
+            self.resume_data = self.resume_parser.load_or_parse_resume(resume_path, self.parsed_resume_dir)
             
             if not self.resume_data:
                 self.logger.error("❌ Failed to parse resume")
@@ -136,6 +151,8 @@ class InternshipBot:
             self.logger.info(f"✅ Resume loaded successfully. Found {len(self.candidate_info['skills'])} skills")
             self.logger.info(f"📋 Skills: {', '.join(self.candidate_info['skills'][:5])}...")
             
+            self._rerank_history()
+            
             return True
             
         except Exception as e:
@@ -189,7 +206,7 @@ class InternshipBot:
                 )
                 
                 # Apply filtering with AI agents after scraping
-                if linkedin_internships and resume_embedding:
+                if linkedin_internships and resume_embedding is not None:
                     internships = self.job_scraper.filter_jobs(
                         linkedin_internships, 
                         keywords, 
@@ -308,7 +325,7 @@ class InternshipBot:
                     )
                     
                     # Apply filtering with AI agents after scraping
-                    if linkedin_internships and resume_embedding:
+                    if linkedin_internships and resume_embedding is not None:
                         internships = self.job_scraper.filter_jobs(
                             linkedin_internships, 
                             keywords, 
@@ -338,11 +355,13 @@ class InternshipBot:
             self.logger.info("Step 2: Evaluating and filtering internships with AI")
             recommended_internships = []
             
+            # One embedding space for the whole run, every job scored in one batch
+            self.similarity_service.start_run()
+            self._score_internships(internships)
+            
             for internship in internships:
                 try:
-                    # Use multi-agent AI for advanced analysis
-                    similarity_score = self._calculate_ai_similarity_score(internship)
-                    internship['similarity_score'] = similarity_score
+                    similarity_score = internship['similarity_score']
                     
                     # Only recommend if similarity is above threshold
                     if similarity_score >= self.config['similarity_threshold']:
@@ -421,6 +440,9 @@ class InternshipBot:
                             status='Applied',
                             applied_at=datetime.now().isoformat()
                         )
+                        # Applied postings are no longer open for re-ranking
+                        for store in self._job_stores.values():
+                            store.mark_closed([JobEmbeddingStore.job_key(internship)])
                     else:
                         results['failed_applications'] += 1
                         self.logger.warning(f"❌ Failed to apply to: {internship['title']} at {internship['company']}")
@@ -446,6 +468,14 @@ class InternshipBot:
                     continue
             
             self.logger.info("Full cycle completed successfully")
+            self.logger.info(f"📦 Embedding cache: {get_embedding_cache().get_stats()}")
+            self.logger.info(f"🧠 Models: {get_model_registry().get_stats()}")
+            self.logger.info(f"📐 Similarity: {self.similarity_service.get_stats()}")
+            self.logger.info(f"💬 LLM response cache: {self.ai_agents.response_cache.get_stats()}")
+            self.logger.info(f"🌐 LLM HTTP: {self.ai_agents.get_http_stats()}")
+            self.logger.info(f"🧭 LLM routing: {self.ai_agents.get_routing_stats()}")
+            if self.ai_agents.hedging:
+                self.logger.info(f"🔀 LLM hedging: {self.ai_agents.get_hedge_stats()}")
             
         except Exception as e:
             self.logger.error(f"Error in full cycle: {e}")
@@ -453,101 +483,116 @@ class InternshipBot:
         
         return results
     
-    def _calculate_ai_similarity_score(self, internship: Dict) -> float:
-        """Calculate similarity score using multi-agent AI with dimension validation."""
+    def _score_internships(self, internships: List[Dict]):
+        """Set similarity_score and similarity_provider on every internship in one batch.
+        
+        Internships without a description, or a batch no provider could score, get the
+        neutral 0.5 with provider "default".
+        """
+        described = [internship for internship in internships if internship.get('description', '')]
+        for internship in internships:
+            internship['similarity_score'] = 0.5
+            internship['similarity_provider'] = 'default'
+        
+        resume_text = self.resume_data.get('raw_text', '') if self.resume_data else ''
+        if not resume_text.strip():
+            self.logger.error("❌ Empty resume text provided for similarity calculation")
+            return
+        if not described:
+            return
+        
         try:
-            # Get job description
-            job_description = internship.get('description', '')
-            if not job_description:
-                return 0.5  # Default score if no description
-            
-            resume_text = self.resume_data.get('raw_text', '')
-            if not resume_text.strip():
-                self.logger.error("❌ Empty resume text provided for similarity calculation")
-                return 0.5
-            
-            # Use sentence transformer as primary method for consistency
-            if self.resume_parser.sentence_transformer:
-                try:
-                    # Ensure we use the same model for both embeddings
-                    resume_embedding = self.resume_parser.sentence_transformer.encode(resume_text)
-                    job_embedding = self.resume_parser.sentence_transformer.encode(job_description)
-                    
-                    # Debug embedding dimensions
-                    self.logger.debug(f"🔍 Resume embedding dim: {len(resume_embedding)}")
-                    self.logger.debug(f"🧾 Job embedding dim: {len(job_embedding)}")
-                    
-                    # Check if resume embedding is 1024 dimensions (Cohere standard)
-                    if len(resume_embedding) != 1024:
-                        self.logger.warning(f"⚠️ Resume embedding dimension is {len(resume_embedding)}, not 1024 (Cohere standard)")
-                        self.logger.info("🔄 Regenerating embeddings with Cohere to ensure 1024 dimensions")
-                        # Regenerate resume embedding with Cohere to get 1024 dimensions
-                        cohere_embeddings = self.ai_agents.get_embeddings([resume_text], provider="cohere", 
-                                                                       fallback_provider="openai", force_dimension=1024)
-                        if cohere_embeddings and len(cohere_embeddings) > 0 and len(cohere_embeddings[0]) == 1024:
-                            self.logger.info(f"✅ Successfully regenerated resume embedding with Cohere: {len(cohere_embeddings[0])} dimensions")
-                            resume_embedding = cohere_embeddings[0]
-                            # Also regenerate job embedding with Cohere for consistency
-                            job_cohere_embeddings = self.ai_agents.get_embeddings([job_description], provider="cohere", 
-                                                                               fallback_provider="openai", force_dimension=1024)
-                            if job_cohere_embeddings and len(job_cohere_embeddings) > 0 and len(job_cohere_embeddings[0]) == 1024:
-                                job_embedding = job_cohere_embeddings[0]
-                            else:
-                                # Skip to Cohere generation for both
-                                raise ValueError("Failed to regenerate job embedding with Cohere")
-                        else:
-                            # Skip to Cohere generation for both
-                            raise ValueError("Failed to regenerate resume embedding with Cohere")
-                    
-                    # Check for dimension mismatch between resume and job
-                    if len(resume_embedding) != len(job_embedding):
-                        self.logger.error(f"❌ Embedding dimension mismatch: resume={len(resume_embedding)}, job={len(job_embedding)}")
-                        self.logger.info("🔄 Falling back to Cohere for consistent dimensions")
-                        # Skip to Cohere fallback
-                        raise ValueError("Embedding dimension mismatch")
-                    
-                    similarity = self.resume_parser.calculate_similarity(resume_embedding, job_embedding)
-                    self.logger.info(f"✅ Calculated similarity using {'SentenceTransformer' if len(resume_embedding) != 1024 else 'Cohere'}: {similarity:.4f}")
-                    return similarity
-                except Exception as e:
-                    self.logger.error(f"❌ Error with embeddings: {e}, falling back to Cohere for both embeddings")
-            
-            # Only use Cohere as fallback, ensuring both embeddings come from the same source
-            self.logger.info("🔄 Using Cohere for embeddings with forced 1024 dimensions")
-            
-            # Use get_embeddings with force_dimension to ensure 1024 dimensions
-            embeddings = self.ai_agents.get_embeddings([resume_text, job_description], 
-                                                     provider="cohere", 
-                                                     fallback_provider="openai", 
-                                                     force_dimension=1024)
-            
-            if len(embeddings) >= 2:
-                # Verify dimensions before calculating similarity
-                if len(embeddings[0]) != 1024 or len(embeddings[1]) != 1024:
-                    self.logger.error(f"❌ Cohere embedding dimension error: resume={len(embeddings[0])}, job={len(embeddings[1])}")
-                    # Try one more time with OpenAI as last resort
-                    self.logger.info("🔄 Trying OpenAI embeddings as last resort with forced 1536 dimensions")
-                    openai_embeddings = self.ai_agents.get_embeddings([resume_text, job_description], 
-                                                                   provider="openai", 
-                                                                   fallback_provider=None, 
-                                                                   force_dimension=1536)
-                    if len(openai_embeddings) >= 2 and len(openai_embeddings[0]) == len(openai_embeddings[1]):
-                        similarity_score = self.ai_agents.calculate_similarity_score(openai_embeddings[0], openai_embeddings[1])
-                        self.logger.info(f"✅ Calculated similarity using OpenAI (1536 dimensions): {similarity_score:.4f}")
-                        return similarity_score
-                    self.logger.error("❌ All embedding methods failed to produce consistent dimensions")
-                    return 0.5  # Default if all methods fail
-                
-                similarity_score = self.ai_agents.calculate_similarity_score(embeddings[0], embeddings[1])
-                self.logger.info(f"✅ Calculated similarity using Cohere (1024 dimensions): {similarity_score:.4f}")
-                return similarity_score
-            
-            self.logger.error("❌ Failed to generate embeddings with any provider")
-            return 0.5  # Default if all methods fail
-            
+            start = time.perf_counter()
+            result = self.similarity_service.score(resume_text, [internship['description'] for internship in described])
+            for internship, score in zip(described, result.scores):
+                internship['similarity_score'] = float(score)
+                internship['similarity_provider'] = result.provider
+            self.logger.info(f"✅ Scored {len(described)} internships with {result.provider} "
+                             f"in {time.perf_counter() - start:.2f}s")
+            self._remember_postings(described, result.provider, result.vectors)
         except Exception as e:
-            self.logger.error(f"❌ Error calculating AI similarity score: {e}")
-            return 0.5
+            self.logger.error(f"❌ Error calculating AI similarity scores: {e}")
+    
+    def _job_store(self, provider: str, create: bool = True) -> Optional[JobEmbeddingStore]:
+        """Store for the provider's embedding space (None if it does not exist and create is False)."""
+        space = self.similarity_service.spaces[provider]
+        if space not in self._job_stores:
+            store_dir = os.path.join(self.job_store_dir, space)
+            if not create and not os.path.exists(store_dir):
+                return None
+            self._job_stores[space] = JobEmbeddingStore(store_dir)
+        return self._job_stores[space]
+    
+    def _remember_postings(self, internships: List[Dict], provider: str, vectors):
+        """Append freshly scored postings to the history for their embedding space."""
+        if vectors is None or not internships:
+            return
+        try:
+            store = self._job_store(provider)
+            added = store.add(internships, vectors)
+            store.index()
+            self.logger.info(f"🗃️ Stored {added} new postings in the {provider} history")
+        except Exception as e:
+            self.logger.error(f"❌ Error storing posting embeddings: {e}")
+    
+    def _rerank_history(self, top_k: int = 10):
+        """Re-rank stored open postings if the resume changed since the last run."""
+        resume_text = self.resume_data.get('raw_text', '') if self.resume_data else ''
+        if not resume_text.strip():
+            return
+        for provider in self.similarity_service.order:
+            try:
+                store = self._job_store(provider, create=False)
+                if store is None or not len(store) or not store.resume_changed(resume_text):
+                    continue
+                top = store.rerank_if_resume_changed(
+                    resume_text, self.similarity_service.resume_vector(provider, resume_text), top_k=top_k
+                )
+                self.logger.info(f"🔁 Resume changed: re-ranked {provider} history, top matches:")
+                for posting in top or []:
+                    self.logger.info(f"   {posting['score']:.2f}  {posting['title']} at {posting['company']} {posting['link'] or ''}")
+            except Exception as e:
+                self.logger.error(f"❌ Error re-ranking {provider} history: {e}")
+    
+    def _history_store(self) -> Optional[tuple]:
+        """(provider, store) for the pinned provider's history, else the first non-empty one."""
+        pinned = self.similarity_service.pinned
+        for provider in ([pinned] if pinned else []) + self.similarity_service.order:
+            store = self._job_store(provider, create=False)
+            if store is not None and len(store):
+                return provider, store
+        return None
+    
+    def similar_internships(self, internship: Dict, top_k: int = 10) -> List[Dict]:
+        """Open stored postings most similar to ``internship`` (approximate, via the ANN index)."""
+        try:
+            found = self._history_store()
+            if found is None:
+                return []
+            return found[1].similar_to(JobEmbeddingStore.job_key(internship), top_k=top_k)
+        except Exception as e:
+            self.logger.error(f"❌ Error finding similar internships: {e}")
+            return []
+    
+    def top_internships_for_resume(self, top_k: int = 50) -> List[Dict]:
+        """Best open stored postings for the current resume (approximate, via the ANN index)."""
+        resume_text = self.resume_data.get('raw_text', '') if self.resume_data else ''
+        if not resume_text.strip():
+            return []
+        try:
+            found = self._history_store()
+            if found is None:
+                return []
+            provider, store = found
+            return store.search(self.similarity_service.resume_vector(provider, resume_text), top_k, open_only=True)
+        except Exception as e:
+            self.logger.error(f"❌ Error ranking stored internships: {e}")
+            return []
+    
+    def _calculate_ai_similarity_score(self, internship: Dict) -> float:
+        """Similarity score for a single internship, in the run's pinned embedding space."""
+        self._score_internships([internship])
+        return internship['similarity_score']
     
     def _generate_ai_cover_letter(self, internship: Dict) -> str:
         """Generate cover letter using multi-agent AI."""
@@ -556,8 +601,8 @@ class InternshipBot:
             company = internship.get('company', '')
             position = internship.get('title', '')
             
-            # Use OpenRouter (Claude) for cover letter generation
-            cover_letter = self.ai_agents.generate_cover_letter_with_openrouter(
+            # OpenRouter (Claude) by default, or whichever provider is currently faster and healthy
+            cover_letter = self.ai_agents.generate_cover_letter(
                 job_description, 
                 self.resume_data, 
                 company, 
@@ -621,8 +666,11 @@ class InternshipBot:
         if export_type == "excel":
             self.application_tracker.export_to_excel()
         elif export_type == "csv":
-            # CSV is already updated automatically
-            print("CSV file updated automatically")
+            self.application_tracker.export_to_csv()
+        elif export_type == "jsonl":
+            self.application_tracker.export_to_jsonl()
+        elif export_type == "parquet":
+            self.application_tracker.export_to_parquet()
         elif export_type == "json":
             self.application_tracker.save_applications()
         else:
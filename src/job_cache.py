@@ -1,31 +1,444 @@
+import hashlib
+import heapq
 import json
+import math
+import mmap
 import os
-from typing import Set
+import struct
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+class BloomFilter:
+    """Bloom filter whose bit array lives in a memory-mapped file."""
+
+    # magic, num_bits, num_hashes, capacity, count, then the cache files state the bits reflect
+    HEADER = struct.Struct("<4sQQQQQQQ")
+    MAGIC = b"JCB2"
+
+    def __init__(self, path: str, capacity: int, false_positive_rate: float = 0.01):
+        """Open the filter at ``path``, creating it sized for ``capacity`` items if missing.
+
+        An existing file keeps the size it was created with.
+        """
+        self.path = path
+        self.capacity = max(1, capacity)
+        self.false_positive_rate = false_positive_rate
+        self.num_bits = max(8, int(math.ceil(-self.capacity * math.log(false_positive_rate) / (math.log(2) ** 2))))
+        self.num_hashes = max(1, int(round(self.num_bits / self.capacity * math.log(2))))
+        self.fresh = False
+        self._file = None
+        self._map = None
+        self._open()
+
+    def _open(self):
+        if os.path.exists(self.path) and os.path.getsize(self.path) > self.HEADER.size:
+            self._file = open(self.path, "r+b")
+            self._map = mmap.mmap(self._file.fileno(), 0)
+            magic, num_bits, num_hashes, capacity = self.HEADER.unpack_from(self._map, 0)[:4]
+            if magic == self.MAGIC and len(self._map) == self.HEADER.size + (num_bits + 7) // 8:
+                self.num_bits, self.num_hashes, self.capacity = num_bits, num_hashes, capacity
+                return
+            self.close()
+
+        # Missing or unreadable: start from an empty bit array
+        size = self.HEADER.size + (self.num_bits + 7) // 8
+        with open(self.path, "wb") as f:
+            f.truncate(size)
+        self._file = open(self.path, "r+b")
+        self._map = mmap.mmap(self._file.fileno(), size)
+        self.HEADER.pack_into(self._map, 0, self.MAGIC, self.num_bits, self.num_hashes, self.capacity, 0, 0, 0, 0)
+        self.fresh = True
+
+    @property
+    def count(self) -> int:
+        return self.HEADER.unpack_from(self._map, 0)[4]
+
+    @property
+    def synced_state(self) -> Tuple[int, int, int]:
+        """The (snapshot mtime_ns, snapshot size, journal size) last recorded by mark_synced()."""
+        return tuple(self.HEADER.unpack_from(self._map, 0)[5:])
+
+    def mark_synced(self, state: Tuple[int, int, int]):
+        """Record the state of the cache files the bits now cover."""
+        header = self.HEADER.unpack_from(self._map, 0)
+        self.HEADER.pack_into(self._map, 0, *header[:5], *state)
+
+    def _positions(self, key: str) -> Iterator[int]:
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1, h2 = struct.unpack("<QQ", digest)
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, key: str):
+        offset = self.HEADER.size
+        for pos in self._positions(key):
+            index = offset + (pos >> 3)
+            self._map[index] = self._map[index] | (1 << (pos & 7))
+        header = self.HEADER.unpack_from(self._map, 0)
+        self.HEADER.pack_into(self._map, 0, *header[:4], header[4] + 1, *header[5:])
+
+    def __contains__(self, key: str) -> bool:
+        offset = self.HEADER.size
+        return all(self._map[offset + (pos >> 3)] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    def flush(self):
+        if self._map is not None:
+            self._map.flush()
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
 
 class JobCache:
-    def __init__(self, cache_file="job_cache.json"):
+    """Set of already-seen job IDs persisted as a sorted snapshot plus an append-only journal.
+
+    New IDs are appended to the journal one line each; once the journal grows past
+    ``compact_threshold`` bytes it is merged into the snapshot and truncated.
+
+    With ``probabilistic=True`` the full ID set is never loaded: a memory-mapped Bloom
+    filter answers most exists() calls, and only positive hits are confirmed against
+    the journal entries and a binary search over the memory-mapped snapshot. The filter
+    records the journal and snapshot state it covers and is rebuilt on open when they
+    have changed since, e.g. after a run with the Bloom filter turned off.
+
+    Every entry records when it was first seen. With ``ttl_seconds`` set, older entries
+    stop counting as seen and are dropped by the next compaction, which also runs on
+    load whenever the snapshot is known to hold expired entries.
+    """
+
+    def __init__(self, cache_file="job_cache.json", compact_threshold: int = 1024 * 1024,
+                 probabilistic: bool = False, false_positive_rate: float = 0.01,
+                 expected_items: int = 1_000_000, ttl_seconds: Optional[float] = None):
         self.cache_file = cache_file
-        self.jobs = set()
+        root, _ = os.path.splitext(cache_file)
+        self.snapshot_file = root + ".snapshot"
+        self.journal_file = root + ".journal"
+        self.bloom_file = root + ".bloom"
+        self.meta_file = root + ".meta"
+        self.compact_threshold = compact_threshold
+        self.probabilistic = probabilistic
+        self.false_positive_rate = false_positive_rate
+        self.expected_items = expected_items
+        self.ttl_seconds = ttl_seconds
+        self.jobs: Dict[str, float] = {}
+        self._pending: Dict[str, float] = {}
+        self._journal_size = 0
+        self._bloom: Optional[BloomFilter] = None
+        self._snapshot_file_obj = None
+        self._snapshot_map = None
+        self.stats = {
+            'entries': 0,
+            'oldest': None,
+            'compactions': 0,
+            'evicted_last': 0,
+            'evicted_total': 0,
+        }
         self._load()
 
+    @staticmethod
+    def _key(job_id: str) -> str:
+        return json.dumps(job_id)
+
+    def _encode(self, job_id: str, first_seen: float) -> str:
+        return f"{self._key(job_id)}\t{int(first_seen)}\n"
+
+    def _decode(self, line: str) -> Optional[Tuple[str, float]]:
+        line = line.strip()
+        if not line:
+            return None
+        key, _, first_seen = line.partition("\t")
+        try:
+            # Entries written before timestamps were recorded count as seen at load time
+            return json.loads(key), float(first_seen) if first_seen else self._loaded_at
+        except ValueError:
+            # Torn write from an interrupted append
+            return None
+
+    def _read_entries(self, path: str) -> Iterator[Tuple[str, float]]:
+        if not os.path.exists(path):
+            return
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    entry = self._decode(line)
+                    if entry is not None:
+                        yield entry
+        except Exception:
+            return
+
     def _load(self):
-        if os.path.exists(self.cache_file):
-            try:
-                with open(self.cache_file, "r") as f:
-                    self.jobs = set(json.load(f))
-            except Exception:
-                self.jobs = set()
+        """Replay the compacted snapshot followed by the journal."""
+        self._loaded_at = time.time()
+        self.jobs = {}
+        self._load_meta()
+        if not os.path.exists(self.snapshot_file) and os.path.exists(self.cache_file):
+            self._migrate_legacy()
 
-    def add(self, job_id: str):
-        self.jobs.add(job_id)
-        self._save()
+        self._journal_size = self._trim_torn_tail()
+        self._pending = dict(self._read_entries(self.journal_file))
+
+        if self.probabilistic:
+            self._open_snapshot()
+            self._open_bloom()
+        else:
+            self.jobs = dict(self._read_entries(self.snapshot_file))
+            self.jobs.update(self._pending)
+
+        oldest = self.stats['oldest']
+        if self.ttl_seconds and oldest is not None and oldest < self._cutoff():
+            self.compact()
+
+    def _trim_torn_tail(self) -> int:
+        """Cut a partial last line left by an interrupted append, so the next append starts on a fresh line.
+
+        Returns the journal size after trimming.
+        """
+        if not os.path.exists(self.journal_file):
+            return 0
+        try:
+            with open(self.journal_file, "r+b") as f:
+                data = f.read()
+                size = len(data)
+                if data and not data.endswith(b"\n"):
+                    size = data.rfind(b"\n") + 1
+                    f.truncate(size)
+                return size
+        except Exception:
+            return os.path.getsize(self.journal_file)
+
+    def _load_meta(self):
+        try:
+            with open(self.meta_file, "r") as f:
+                self.stats.update(json.load(f))
+        except Exception:
+            pass
+
+    def _save_meta(self):
+        try:
+            with open(self.meta_file, "w") as f:
+                json.dump(self.stats, f)
+        except Exception:
+            pass
+
+    def _migrate_legacy(self):
+        """Convert the old single JSON list file into a snapshot (the old file is left in place)."""
+        try:
+            with open(self.cache_file, "r") as f:
+                legacy_ids = sorted(set(json.load(f)), key=self._key)
+            self._write_snapshot((job_id, self._loaded_at) for job_id in legacy_ids)
+        except Exception:
+            pass
+
+    def _files_state(self) -> Tuple[int, int, int]:
+        """Snapshot mtime_ns and size plus journal size, to tell whether the Bloom filter is current."""
+        try:
+            st = os.stat(self.snapshot_file)
+            snapshot = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            snapshot = (0, 0)
+        return snapshot + (self._journal_size,)
+
+    def _open_bloom(self, capacity: int = None):
+        if self._bloom is not None:
+            self._bloom.close()
+        self._bloom = BloomFilter(self.bloom_file, capacity or self.expected_items, self.false_positive_rate)
+        if not self._bloom.fresh and self._bloom.synced_state != self._files_state():
+            # Written by a run in exact mode (or cut short): the bits may miss IDs, so start over
+            capacity = self._bloom.capacity
+            self._bloom.close()
+            os.remove(self.bloom_file)
+            self._bloom = BloomFilter(self.bloom_file, capacity, self.false_positive_rate)
+        if self._bloom.fresh:
+            self._rebuild_bloom()
+
+    def _rebuild_bloom(self):
+        for job_id, _ in self._read_entries(self.snapshot_file):
+            self._bloom.add(job_id)
+        for job_id in self._pending:
+            self._bloom.add(job_id)
+        self._bloom.mark_synced(self._files_state())
+        self._bloom.flush()
+
+    def _open_snapshot(self):
+        self._close_snapshot()
+        if not os.path.exists(self.snapshot_file) or os.path.getsize(self.snapshot_file) == 0:
+            return
+        self._snapshot_file_obj = open(self.snapshot_file, "rb")
+        self._snapshot_map = mmap.mmap(self._snapshot_file_obj.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _close_snapshot(self):
+        if self._snapshot_map is not None:
+            self._snapshot_map.close()
+            self._snapshot_map = None
+        if self._snapshot_file_obj is not None:
+            self._snapshot_file_obj.close()
+            self._snapshot_file_obj = None
+
+    def _snapshot_lookup(self, job_id: str) -> Optional[float]:
+        """Binary search the sorted, line-oriented snapshot and return the first-seen time."""
+        mm = self._snapshot_map
+        if mm is None:
+            return None
+        target = self._key(job_id).encode("utf-8")
+        lo, hi = 0, len(mm)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = mm.rfind(b"\n", 0, mid) + 1
+            end = mm.find(b"\n", start)
+            if end == -1:
+                end = len(mm)
+            key, _, first_seen = mm[start:end].partition(b"\t")
+            if key == target:
+                return float(first_seen) if first_seen else self._loaded_at
+            if key < target:
+                lo = end + 1
+            else:
+                hi = start
+        return None
+
+    def _cutoff(self) -> float:
+        return time.time() - self.ttl_seconds if self.ttl_seconds else float("-inf")
+
+    def first_seen(self, job_id: str) -> Optional[float]:
+        """Return when ``job_id`` was first recorded, or None if it was never seen."""
+        if job_id is None:
+            return None
+        if not self.probabilistic:
+            return self.jobs.get(job_id)
+        if job_id not in self._bloom:
+            return None
+        if job_id in self._pending:
+            return self._pending[job_id]
+        return self._snapshot_lookup(job_id)
 
     def exists(self, job_id: str) -> bool:
-        return job_id in self.jobs
+        first_seen = self.first_seen(job_id)
+        return first_seen is not None and first_seen >= self._cutoff()
+
+    def add(self, job_id: str):
+        self.add_many([job_id])
+
+    def add_many(self, job_ids: Iterable[str]) -> int:
+        """Add several IDs with a single journal write. Returns how many were new."""
+        now = time.time()
+        new_ids: List[str] = []
+        for job_id in job_ids:
+            if job_id is None or self.exists(job_id):
+                continue
+            self._remember(job_id, now)
+            new_ids.append(job_id)
+        if new_ids:
+            self._append(new_ids, now)
+        return len(new_ids)
+
+    def _remember(self, job_id: str, first_seen: float):
+        self._pending[job_id] = first_seen
+        if self.probabilistic:
+            self._bloom.add(job_id)
+        else:
+            self.jobs[job_id] = first_seen
+
+    def _append(self, job_ids: List[str], first_seen: float):
+        try:
+            data = "".join(self._encode(job_id, first_seen) for job_id in job_ids)
+            with open(self.journal_file, "a", encoding="utf-8") as f:
+                f.write(data)
+            self._journal_size += len(data.encode("utf-8"))
+        except Exception:
+            return
+        if self.probabilistic:
+            self._bloom.mark_synced(self._files_state())
+        if self.stats['oldest'] is None:
+            self.stats['oldest'] = first_seen
+            self._save_meta()
+        if self._journal_size >= self.compact_threshold:
+            self.compact()
+
+    def _merged_entries(self) -> Iterator[Tuple[str, float]]:
+        """Stream snapshot and journal entries in snapshot order; journal entries win on duplicates."""
+        pending = sorted(self._pending.items(), key=lambda entry: self._key(entry[0]))
+        previous = None
+        # heapq.merge is stable, so a journal entry follows the snapshot entry it replaces
+        for entry in heapq.merge(self._read_entries(self.snapshot_file), pending,
+                                 key=lambda entry: self._key(entry[0])):
+            if previous is not None and previous[0] != entry[0]:
+                yield previous
+            previous = entry
+        if previous is not None:
+            yield previous
+
+    def _write_snapshot(self, entries: Iterable[Tuple[str, float]]) -> int:
+        tmp_file = self.snapshot_file + ".tmp"
+        written = 0
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            for job_id, first_seen in entries:
+                f.write(self._encode(job_id, first_seen))
+                written += 1
+        os.replace(tmp_file, self.snapshot_file)
+        return written
+
+    def compact(self, cutoff: Optional[float] = None) -> int:
+        """Merge the journal into the snapshot, dropping entries first seen before the cutoff.
+
+        The cutoff defaults to the TTL boundary. Returns the number of evicted entries.
+        """
+        cutoff = max(self._cutoff(), cutoff) if cutoff is not None else self._cutoff()
+        counts = {'evicted': 0, 'oldest': None}
+
+        def survivors():
+            for job_id, first_seen in self._merged_entries():
+                if first_seen < cutoff:
+                    counts['evicted'] += 1
+                    continue
+                if counts['oldest'] is None or first_seen < counts['oldest']:
+                    counts['oldest'] = first_seen
+                yield job_id, first_seen
 
-    def _save(self):
         try:
-            with open(self.cache_file, "w") as f:
-                json.dump(list(self.jobs), f)
+            total = self._write_snapshot(survivors())
+            open(self.journal_file, "w").close()
+            self._pending = {}
+            self._journal_size = 0
         except Exception:
-            pass
\ No newline at end of file
+            return 0
+
+        evicted = counts['evicted']
+        self.stats.update({
+            'entries': total,
+            'oldest': counts['oldest'],
+            'compactions': self.stats['compactions'] + 1,
+            'evicted_last': evicted,
+            'evicted_total': self.stats['evicted_total'] + evicted,
+        })
+        self._save_meta()
+
+        if self.probabilistic:
+            self._open_snapshot()
+            if evicted or total > self._bloom.capacity:
+                # Bloom filters cannot delete; rebuild from the surviving entries,
+                # growing the filter before it drifts above its target false-positive rate
+                capacity = max(self._bloom.capacity, total * 2 if total > self._bloom.capacity else 0)
+                self._bloom.close()
+                os.remove(self.bloom_file)
+                self._open_bloom(capacity=capacity)
+            self._bloom.mark_synced(self._files_state())
+            self._bloom.flush()
+        elif evicted:
+            self.jobs = {job_id: first_seen for job_id, first_seen in self.jobs.items()
+                         if first_seen >= cutoff}
+        return evicted
+
+    def expire_before(self, ts: float) -> int:
+        """Evict every entry first seen before ``ts`` (epoch seconds). Returns the evicted count."""
+        return self.compact(cutoff=ts)
+
+    def close(self):
+        """Release the memory-mapped snapshot and Bloom filter."""
+        self._close_snapshot()
+        if self._bloom is not None:
+            self._bloom.close()
+            self._bloom = None
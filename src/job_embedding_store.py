@@ -0,0 +1,309 @@
+"""
+Persistent history of scraped postings and their embeddings.
+
+Each store holds one embedding space. Vectors are appended to a flat binary
+file (float16, or int8 codes plus a float32 scale file) that is read through
+a memory map, and a SQLite table maps every row to its posting metadata.
+``rescore`` ranks the whole history against a resume vector in one pass, and
+a changed resume (detected by content hash) re-ranks the open postings.
+An IVF index (``ivf.npz``) kept in step with the matrix answers approximate
+top-k queries without scanning every row.
+"""
+import hashlib
+import logging
+import os
+import sqlite3
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+try:
+    from .ann_index import IVFIndex
+    from .compact_embeddings import CompactEmbeddings, quantize
+    from .embedding_cache import EmbeddingCache
+except ImportError:
+    from ann_index import IVFIndex
+    from compact_embeddings import CompactEmbeddings, quantize
+    from embedding_cache import EmbeddingCache
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS postings (
+    row INTEGER PRIMARY KEY,
+    job_key TEXT NOT NULL UNIQUE,
+    title TEXT,
+    company TEXT,
+    link TEXT,
+    platform TEXT,
+    location TEXT,
+    scraped_at REAL NOT NULL,
+    open INTEGER NOT NULL DEFAULT 1,
+    score REAL
+);
+CREATE INDEX IF NOT EXISTS idx_postings_open ON postings(open, scraped_at);
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+class JobEmbeddingStore:
+    """Append-only, memory-mapped embedding matrix plus a posting metadata table."""
+
+    def __init__(self, store_dir: str = "job_embeddings", fmt: str = "float16"):
+        """
+        Open (or create) a store.
+
+        Args:
+            store_dir: Directory for ``vectors.bin``, ``scales.bin``, ``postings.db`` and ``ivf.npz``
+            fmt: "float16" or "int8" (ignored for an existing store, which keeps its format)
+        """
+        os.makedirs(store_dir, exist_ok=True)
+        self.store_dir = store_dir
+        self.vectors_file = os.path.join(store_dir, "vectors.bin")
+        self.scales_file = os.path.join(store_dir, "scales.bin")
+        self.index_file = os.path.join(store_dir, "ivf.npz")
+        self.conn = sqlite3.connect(os.path.join(store_dir, "postings.db"), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+        self.format = self._get_state('format') or fmt
+        if self.format not in ("float16", "int8"):
+            raise ValueError(f"Unsupported store format '{self.format}'")
+        self._set_state('format', self.format)
+        dim = self._get_state('dim')
+        self.dim = int(dim) if dim else None
+        self._count = self.conn.execute("SELECT COUNT(*) FROM postings").fetchone()[0]
+        self._matrix: Optional[CompactEmbeddings] = None
+        self._index: Optional[IVFIndex] = None
+        self._recover()
+
+    def _get_state(self, key: str) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_state(self, key: str, value: str):
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)", (key, value))
+
+    @property
+    def _row_bytes(self) -> int:
+        return self.dim * (1 if self.format == "int8" else 2)
+
+    def _recover(self):
+        """Drop vector bytes past the last committed row (left by an interrupted add)."""
+        for path, row_bytes in ((self.vectors_file, self._row_bytes if self.dim else 0),
+                                (self.scales_file, 4 if self.format == "int8" else 0)):
+            if os.path.exists(path) and os.path.getsize(path) > self._count * row_bytes:
+                with open(path, "r+b") as f:
+                    f.truncate(self._count * row_bytes)
+
+    def __len__(self) -> int:
+        return self._count
+
+    @staticmethod
+    def job_key(posting: Dict) -> str:
+        return posting.get('id') or posting.get('link') or f"{posting.get('company', '')}|{posting.get('title', '')}"
+
+    def add(self, postings: Sequence[Dict], vectors: np.ndarray) -> int:
+        """Append postings not stored yet; returns how many were new."""
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        if len(vectors) != len(postings):
+            raise ValueError(f"{len(vectors)} vectors for {len(postings)} postings")
+        if not len(postings):
+            return 0
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+            self._set_state('dim', str(self.dim))
+        elif vectors.shape[1] != self.dim:
+            raise ValueError(f"Store holds {self.dim}-dim vectors, got {vectors.shape[1]}")
+
+        keys = [self.job_key(posting) for posting in postings]
+        existing = set()
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            existing.update(row[0] for row in self.conn.execute(
+                f"SELECT job_key FROM postings WHERE job_key IN ({','.join('?' * len(chunk))})", chunk
+            ))
+        fresh = []
+        for i, key in enumerate(keys):
+            if key not in existing:
+                existing.add(key)
+                fresh.append(i)
+        if not fresh:
+            return 0
+
+        codes, scales = quantize(vectors[fresh], self.format)
+        # Vectors first, then the rows that point at them; _recover() trims a torn append,
+        # including one left earlier in this process, so new vectors land at self._count
+        self._recover()
+        with open(self.vectors_file, "ab") as f:
+            f.write(codes.tobytes())
+        if scales is not None:
+            with open(self.scales_file, "ab") as f:
+                f.write(scales.tobytes())
+
+        now = time.time()
+        rows = []
+        for offset, i in enumerate(fresh):
+            posting = postings[i]
+            rows.append((self._count + offset, keys[i], posting.get('title'), posting.get('company'),
+                         posting.get('link'), posting.get('platform'), posting.get('location'), now))
+        try:
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT INTO postings (row, job_key, title, company, link, platform, location, scraped_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
+                )
+        except Exception:
+            self._recover()
+            raise
+        self._count += len(rows)
+        self._matrix = None
+        if self._index is not None or os.path.exists(self.index_file):
+            self.index()  # catches up on the new rows and saves
+        return len(rows)
+
+    def matrix(self) -> CompactEmbeddings:
+        """Memory-mapped view of every stored vector (rebuilt after appends)."""
+        if self._matrix is None:
+            if not self._count:
+                codes = np.zeros((0, self.dim or 0), dtype=np.int8 if self.format == "int8" else np.float16)
+                scales = np.zeros(0, dtype=np.float32) if self.format == "int8" else None
+            else:
+                dtype = np.int8 if self.format == "int8" else np.float16
+                codes = np.memmap(self.vectors_file, dtype=dtype, mode="r", shape=(self._count, self.dim))
+                scales = (np.memmap(self.scales_file, dtype=np.float32, mode="r", shape=(self._count,))
+                          if self.format == "int8" else None)
+            self._matrix = CompactEmbeddings(codes, scales, [], self.format)
+        return self._matrix
+
+    def _index_source(self, rows: np.ndarray) -> np.ndarray:
+        return self.matrix().vectors(rows)
+
+    def index(self) -> IVFIndex:
+        """The ANN index over the stored vectors, loaded or built on first use and kept current."""
+        if self._index is None and os.path.exists(self.index_file):
+            try:
+                self._index = IVFIndex.load(self.index_file, self._index_source)
+            except Exception as e:
+                logger.warning(f"⚠️ Rebuilding unreadable ANN index {self.index_file}: {e}")
+        if self._index is not None and self._index.count > self._count:
+            # Index saved after rows that _recover() later dropped
+            self._index = None
+        if self._index is None:
+            self._index = IVFIndex(self._index_source)
+        if self._index.count < self._count:
+            self._index.add(self._count - self._index.count)
+            self._index.save(self.index_file)
+        return self._index
+
+    def _closed_rows(self) -> np.ndarray:
+        return np.fromiter((row[0] for row in self.conn.execute("SELECT row FROM postings WHERE open = 0")),
+                           dtype=np.int64)
+
+    def search(self, vector: np.ndarray, top_k: int = 50, open_only: bool = False,
+               nprobe: Optional[int] = None, exclude: Sequence[int] = ()) -> List[Dict]:
+        """
+        Approximate ``top_k`` postings closest to ``vector`` through the ANN index.
+
+        Scores are on rescore's 0-1 scale; use rescore for an exact ranking.
+        """
+        if not self._count:
+            return []
+        excluded = np.asarray(list(exclude), dtype=np.int64)
+        if open_only:
+            excluded = np.concatenate([excluded, self._closed_rows()])
+        rows, cosine = self.index().search(vector, top_k, nprobe=nprobe, exclude=excluded)
+        return self._describe(rows, (np.clip(cosine, -1.0, 1.0) + 1) / 2)
+
+    def similar_to(self, job_key: str, top_k: int = 10, open_only: bool = True) -> List[Dict]:
+        """Stored postings most similar to the stored posting ``job_key`` (itself excluded)."""
+        row = self.conn.execute("SELECT row FROM postings WHERE job_key = ?", (job_key,)).fetchone()
+        if row is None:
+            return []
+        vector = self.matrix().vectors([row[0]])[0]
+        return self.search(vector, top_k, open_only=open_only, exclude=[row[0]])
+
+    def _open_rows(self, max_age_days: Optional[float]) -> np.ndarray:
+        query, params = "SELECT row FROM postings WHERE open = 1", []
+        if max_age_days is not None:
+            query += " AND scraped_at >= ?"
+            params.append(time.time() - max_age_days * 86400)
+        return np.fromiter((row[0] for row in self.conn.execute(query, params)), dtype=np.int64)
+
+    def _describe(self, rows: Sequence[int], scores: np.ndarray) -> List[Dict]:
+        columns = ['row', 'job_key', 'title', 'company', 'link', 'platform', 'location', 'scraped_at', 'open']
+        placeholders = ",".join("?" * len(rows))
+        found = {
+            row[0]: dict(zip(columns, row))
+            for row in self.conn.execute(
+                f"SELECT {', '.join(columns)} FROM postings WHERE row IN ({placeholders})", [int(r) for r in rows]
+            )
+        } if len(rows) else {}
+        return [{**found[int(row)], 'score': float(score)} for row, score in zip(rows, scores) if int(row) in found]
+
+    def rescore(self, resume_vector: np.ndarray, top_k: int = 50, open_only: bool = False,
+                max_age_days: Optional[float] = None) -> List[Dict]:
+        """
+        Rank stored postings against ``resume_vector`` (one pass over the whole matrix).
+
+        Returns the ``top_k`` best as metadata dicts with a ``score`` key, best first.
+        """
+        if not self._count:
+            return []
+        scores = self.matrix().similarity_scores(resume_vector)
+        candidates = self._open_rows(max_age_days) if open_only or max_age_days is not None else np.arange(self._count)
+        if not len(candidates):
+            return []
+        return self._top(candidates, scores[candidates], top_k)
+
+    def _top(self, rows: np.ndarray, scores: np.ndarray, top_k: int) -> List[Dict]:
+        k = min(top_k, len(rows))
+        if not k:
+            return []
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        return self._describe(rows[best], scores[best])
+
+    def mark_closed(self, job_keys: Sequence[str]):
+        """Stop treating these postings as open (applied to, expired, taken down)."""
+        with self.conn:
+            self.conn.executemany("UPDATE postings SET open = 0 WHERE job_key = ?", [(key,) for key in job_keys])
+
+    @staticmethod
+    def resume_hash(resume_text: str) -> str:
+        return hashlib.sha256(EmbeddingCache.normalize(resume_text).encode("utf-8")).hexdigest()
+
+    def resume_changed(self, resume_text: str) -> bool:
+        return self._get_state('resume_hash') != self.resume_hash(resume_text)
+
+    def rerank_if_resume_changed(self, resume_text: str, resume_vector: np.ndarray, top_k: int = 50,
+                                 max_age_days: Optional[float] = 30) -> Optional[List[Dict]]:
+        """
+        Re-rank open postings when the resume differs from the last one seen.
+
+        Stores the new score on every open posting and returns the ``top_k`` best,
+        or None if the resume is unchanged.
+        """
+        if not self.resume_changed(resume_text):
+            return None
+        open_rows = self._open_rows(max_age_days)
+        scores = np.zeros(0, dtype=np.float32)
+        if len(open_rows):
+            scores = self.matrix().similarity_scores(resume_vector)[open_rows]
+            with self.conn:
+                self.conn.executemany(
+                    "UPDATE postings SET score = ? WHERE row = ?",
+                    zip(scores.astype(float).tolist(), open_rows.tolist())
+                )
+        self._set_state('resume_hash', self.resume_hash(resume_text))
+        logger.info(f"Resume changed: re-ranked {len(open_rows)} open postings in {self.store_dir}")
+        return self._top(open_rows, scores, top_k)
+
+    def close(self):
+        self._matrix = None
+        self._index = None
+        self.conn.close()
@@ -18,7 +18,14 @@ class JobScraper:
     def __init__(self):
         """Initialize the job scraper with browser automation."""
         self.ua = UserAgent()
-        self.job_cache = JobCache()
+        # Bloom-filter mode keeps startup and memory flat for very long dedup histories;
+        # a TTL lets postings that get re-listed months later be considered again
+        ttl_days = float(os.environ.get('JOB_CACHE_TTL_DAYS', 0))
+        self.job_cache = JobCache(
+            probabilistic=os.environ.get('JOB_CACHE_BLOOM', 'false').lower() == 'true',
+            false_positive_rate=float(os.environ.get('JOB_CACHE_BLOOM_FP_RATE', 0.01)),
+            ttl_seconds=ttl_days * 86400 if ttl_days > 0 else None
+        )
         self.session = requests.Session()
         self.session.headers.update(self.get_random_headers())
         
@@ -599,7 +606,7 @@ class JobScraper:
                 continue
             if any(kw.lower() in job['title'].lower() for kw in keywords):
                 filtered.append(job)
-            elif job.get('description') and job['description'].strip() and resume_embedding and ai_agents:
+            elif job.get('description') and job['description'].strip() and resume_embedding is not None and ai_agents:
                 try:
                     # Only attempt embedding if we have a non-empty description
                     job_emb = ai_agents.generate_embeddings_with_cohere([job['description']])
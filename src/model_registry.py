@@ -0,0 +1,168 @@
+"""
+Process-wide registry of embedding models.
+
+Every consumer asks the registry for a model by name instead of constructing
+its own. The first request loads the model (timing the load and measuring the
+change in resident memory); later requests get the same instance. Handles are
+reference-counted so idle models can be unloaded explicitly.
+"""
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+try:
+    from .embedding_backends import load_model
+except ImportError:
+    from embedding_backends import load_model
+
+logger = logging.getLogger(__name__)
+
+def rss_bytes() -> int:
+    """Current resident set size of this process (0 if it cannot be read)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        # ru_maxrss is the peak, in KB on Linux; good enough where /proc is missing
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except (ImportError, OSError):
+        return 0
+
+class ModelRegistry:
+    """Thread-safe, lazily loading, reference-counted model store."""
+
+    def __init__(self, loader: Callable[[str], object] = load_model):
+        self.loader = loader
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._models: Dict[str, object] = {}
+        self._refs: Dict[str, int] = {}
+        self._stats: Dict[str, Dict] = {}
+
+    def acquire(self, name: str):
+        """Return the shared instance of ``name``, loading it on first use, and take a reference."""
+        with self._lock:
+            if name in self._models:
+                return self._take(name)
+            load_lock = self._load_locks.setdefault(name, threading.Lock())
+
+        # Only callers of the same model wait on each other while it loads
+        with load_lock:
+            # Checked and referenced under _lock, so unload_idle() cannot drop it in between
+            with self._lock:
+                if name in self._models:
+                    return self._take(name)
+
+            rss_before = rss_bytes()
+            start = time.perf_counter()
+            model = self.loader(name)
+            load_seconds = time.perf_counter() - start
+            rss_delta = max(rss_bytes() - rss_before, 0)
+            with self._lock:
+                self._models[name] = model
+                stats = self._stats.setdefault(name, {'loads': 0})
+                stats.update({
+                    'loads': stats['loads'] + 1,
+                    'load_seconds': round(load_seconds, 3),
+                    'rss_mb': round(rss_delta / 1024 / 1024, 1),
+                })
+                self._take(name)
+            logger.info(f"✅ Loaded model {name} in {load_seconds:.2f}s (+{rss_delta / 1024 / 1024:.1f} MB RSS)")
+            return model
+
+    def _take(self, name: str):
+        """Reference a loaded model; the caller holds ``_lock``."""
+        self._refs[name] = self._refs.get(name, 0) + 1
+        return self._models[name]
+
+    def release(self, name: str):
+        """Drop one reference; the model stays resident until unload_idle() is called."""
+        with self._lock:
+            if self._refs.get(name, 0) > 0:
+                self._refs[name] -= 1
+
+    def unload_idle(self) -> int:
+        """Unload every model nobody holds a reference to; returns how many were dropped."""
+        with self._lock:
+            idle = [name for name in self._models if self._refs.get(name, 0) == 0]
+            for name in idle:
+                del self._models[name]
+        for name in idle:
+            logger.info(f"Unloaded idle model {name}")
+        return len(idle)
+
+    def is_loaded(self, name: str) -> bool:
+        with self._lock:
+            return name in self._models
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """Per-model load time, resident memory added by the load, reference count and state."""
+        with self._lock:
+            return {
+                name: {**stats, 'refs': self._refs.get(name, 0), 'loaded': name in self._models}
+                for name, stats in self._stats.items()
+            }
+
+class SharedModel:
+    """
+    Lazy handle on a registry model.
+
+    Creating a handle is free; the model is acquired on the first ``encode`` (or
+    any other attribute access) and released when the handle is closed or collected.
+    A handle is falsy once loading has failed, so ``if handle:`` guards keep working.
+    """
+
+    def __init__(self, name: str, registry: Optional[ModelRegistry] = None):
+        self.name = name
+        self.registry = registry or get_model_registry()
+        self._model = None
+        self._failed = False
+
+    @property
+    def model(self):
+        if self._model is None:
+            try:
+                self._model = self.registry.acquire(self.name)
+            except Exception:
+                self._failed = True
+                raise
+        return self._model
+
+    def encode(self, *args, **kwargs):
+        return self.model.encode(*args, **kwargs)
+
+    def __getattr__(self, attr):
+        # Only reached for attributes the handle itself does not define
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        return getattr(self.model, attr)
+
+    def __bool__(self) -> bool:
+        return not self._failed
+
+    def close(self):
+        if self._model is not None:
+            self._model = None
+            self.registry.release(self.name)
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+_shared_registry: Optional[ModelRegistry] = None
+_shared_lock = threading.Lock()
+
+def get_model_registry() -> ModelRegistry:
+    """Process-wide registry instance."""
+    global _shared_registry
+    with _shared_lock:
+        if _shared_registry is None:
+            _shared_registry = ModelRegistry()
+        return _shared_registry
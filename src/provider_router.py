@@ -0,0 +1,203 @@
+"""
+Latency-aware routing across LLM providers, with a circuit breaker per
+(task, provider).
+
+The router keeps a rolling window of latencies and outcomes for every
+provider on every task. A breaker opens after ``failure_threshold``
+consecutive failures and rejects traffic for ``cooldown`` seconds, then lets
+a single half-open probe through: success closes it, failure re-opens it.
+``order(task)`` ranks the providers whose breaker admits traffic by rolling
+median latency, inflated by their recent error rate. A provider that has not
+been tried for ``explore_after`` seconds is moved to the front once, so a
+recovered or faster fallback is noticed without waiting for the leader to fail.
+"""
+import logging
+import threading
+import time
+from collections import Counter, deque
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitBreaker:
+    """Closed -> open after repeated failures -> half-open probe after a cooldown."""
+
+    def __init__(self, failure_threshold: int = 3, cooldown: float = 60.0,
+                 on_change: Optional[Callable[[str, str], None]] = None):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.on_change = on_change
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_started = 0.0
+
+    def _set_state(self, state: str):
+        if state != self.state:
+            previous, self.state = self.state, state
+            if self.on_change:
+                self.on_change(previous, state)
+
+    def available(self, now: float) -> bool:
+        """Whether a call could go through now (does not claim the half-open probe)."""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN:
+            return now - self.opened_at >= self.cooldown
+        # One probe at a time; a probe that never reported back frees the slot after a cooldown
+        return now - self.probe_started >= self.cooldown
+
+    def allow(self, now: float) -> bool:
+        """Admit a call, moving open -> half-open and claiming the probe slot when due."""
+        if not self.available(now):
+            return False
+        if self.state != CLOSED:
+            self._set_state(HALF_OPEN)
+            self.probe_started = now
+        return True
+
+    def record_success(self):
+        self.failures = 0
+        self._set_state(CLOSED)
+
+    def record_failure(self, now: float):
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            self.opened_at = now
+            self._set_state(OPEN)
+
+class ProviderRouter:
+    """Orders providers per task by rolling latency and health."""
+
+    def __init__(self, routes: Dict[str, List[str]], window: int = 50, failure_threshold: int = 3,
+                 cooldown: float = 60.0, explore_after: float = 300.0):
+        """
+        Args:
+            routes: Task -> providers in default preference order (used for ties and unmeasured providers)
+            window: Calls kept per (task, provider) for latency and error rate
+            failure_threshold: Consecutive failures that open a breaker
+            cooldown: Seconds a breaker stays open before a half-open probe
+            explore_after: Seconds without a call after which a healthy provider gets one call
+        """
+        self.routes = routes
+        self.window = window
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.explore_after = explore_after
+        self._last_tried: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+        self._latencies: Dict[tuple, deque] = {}
+        self._outcomes: Dict[tuple, deque] = {}
+        self._breakers: Dict[tuple, CircuitBreaker] = {}
+        self.decisions = Counter()    # (task, provider) -> times ranked first
+        self.transitions = Counter()  # "closed->open" etc.
+
+    def _breaker(self, task: str, provider: str) -> CircuitBreaker:
+        key = (task, provider)
+        if key not in self._breakers:
+            def on_change(previous, state):
+                self.transitions[f"{previous}->{state}"] += 1
+                icon = "⚠️" if state == OPEN else "🔄"
+                logger.warning(f"{icon} Circuit for {provider} ({task}): {previous} -> {state}")
+            self._breakers[key] = CircuitBreaker(self.failure_threshold, self.cooldown, on_change)
+        return self._breakers[key]
+
+    def _median(self, task: str, provider: str) -> Optional[float]:
+        samples = self._latencies.get((task, provider))
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[len(ordered) // 2]
+
+    def latency_percentile(self, task: str, provider: str, q: float, min_samples: int = 5) -> Optional[float]:
+        """Rolling ``q`` latency quantile in seconds, or None with fewer than ``min_samples`` calls."""
+        with self._lock:
+            samples = sorted(self._latencies.get((task, provider), ()))
+        if len(samples) < min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def _error_rate(self, task: str, provider: str) -> float:
+        outcomes = self._outcomes.get((task, provider))
+        return 1 - sum(outcomes) / len(outcomes) if outcomes else 0.0
+
+    def order(self, task: str) -> List[str]:
+        """
+        Providers to try for ``task``, best first.
+
+        Providers with an open breaker are left out; unmeasured ones rank after the
+        measured ones, in default order, so a fallback is only tried (and measured)
+        when it is needed. If every breaker is open the default order is returned.
+        """
+        providers = self.routes[task]
+        now = time.monotonic()
+        with self._lock:
+            healthy = [p for p in providers if self._breaker(task, p).available(now)]
+            if not healthy:
+                self.decisions[(task, 'none_healthy')] += 1
+                return list(providers)
+
+            def cost(provider):
+                median = self._median(task, provider)
+                if median is None:
+                    return (1, 0.0, providers.index(provider))
+                return (0, median / max(0.05, 1 - self._error_rate(task, provider)), providers.index(provider))
+
+            ranked = sorted(healthy, key=cost)
+            for provider in providers:
+                # The exploration clock starts when a provider is first seen, not when the router was built
+                self._last_tried.setdefault((task, provider), now)
+            stale = [p for p in ranked[1:] if now - self._last_tried[(task, p)] >= self.explore_after]
+            if stale:
+                ranked.remove(stale[0])
+                ranked.insert(0, stale[0])
+                self._last_tried[(task, stale[0])] = now
+                self.decisions[(task, 'explorations')] += 1
+            self.decisions[(task, ranked[0])] += 1
+            return ranked
+
+    def allow(self, task: str, provider: str) -> bool:
+        """Claim a call slot for ``provider`` (takes the half-open probe when one is due)."""
+        now = time.monotonic()
+        with self._lock:
+            if not self._breaker(task, provider).allow(now):
+                return False
+            self._last_tried[(task, provider)] = now
+            return True
+
+    def record(self, task: str, provider: str, seconds: float, ok: bool):
+        """Report one finished call."""
+        key = (task, provider)
+        with self._lock:
+            self._outcomes.setdefault(key, deque(maxlen=self.window)).append(1 if ok else 0)
+            breaker = self._breaker(task, provider)
+            if ok:
+                self._latencies.setdefault(key, deque(maxlen=self.window)).append(seconds)
+                breaker.record_success()
+            else:
+                breaker.record_failure(time.monotonic())
+
+    def state(self, task: str, provider: str) -> str:
+        with self._lock:
+            return self._breaker(task, provider).state
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            tasks = {}
+            for task, providers in self.routes.items():
+                tasks[task] = {}
+                for provider in providers:
+                    median = self._median(task, provider)
+                    tasks[task][provider] = {
+                        'state': self._breaker(task, provider).state,
+                        'p50_ms': round(median * 1000, 1) if median is not None else None,
+                        'error_rate': round(self._error_rate(task, provider), 3),
+                        'calls': len(self._outcomes.get((task, provider), ())),
+                        'routed_first': self.decisions[(task, provider)],
+                    }
+            explorations = {task: self.decisions[(task, 'explorations')] for task in self.routes}
+            return {'tasks': tasks, 'transitions': dict(self.transitions), 'explorations': explorations}
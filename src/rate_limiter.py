@@ -0,0 +1,91 @@
+"""
+Token-bucket rate limiting for provider APIs, for use from asyncio code.
+
+A ProviderLimiter holds two buckets, one for requests per minute and one for
+tokens per minute, and a request waits until both can cover it. A provider
+that answers 429/503 with ``Retry-After`` pauses the whole limiter, so every
+request queued for that provider backs off together. State is guarded by a
+plain lock, so one limiter can be shared across event loops.
+"""
+import asyncio
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+class ProviderLimiter:
+    """Requests/min and tokens/min buckets for one provider."""
+
+    def __init__(self, requests_per_min: float, tokens_per_min: float, burst_seconds: float = 60.0):
+        """
+        Args:
+            requests_per_min: Sustained request rate
+            tokens_per_min: Sustained token rate (prompt plus completion budget)
+            burst_seconds: Bucket capacity, as seconds' worth of the sustained rate
+        """
+        self.request_rate = requests_per_min / 60.0
+        self.token_rate = tokens_per_min / 60.0
+        self.request_capacity = max(1.0, self.request_rate * burst_seconds)
+        self.token_capacity = max(1.0, self.token_rate * burst_seconds)
+        self._requests = self.request_capacity
+        self._tokens = self.token_capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self.stats = {'acquired': 0, 'waited_s': 0.0, 'pauses': 0}
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        self._requests = min(self.request_capacity, self._requests + elapsed * self.request_rate)
+        self._tokens = min(self.token_capacity, self._tokens + elapsed * self.token_rate)
+        self._updated = now
+
+    def _try_acquire(self, tokens: float) -> float:
+        """Take capacity and return 0, or return how long to wait before trying again."""
+        tokens = min(tokens, self.token_capacity)
+        with self._lock:
+            now = time.monotonic()
+            if now < self._paused_until:
+                return self._paused_until - now
+            self._refill(now)
+            wait = max((1 - self._requests) / self.request_rate, (tokens - self._tokens) / self.token_rate, 0.0)
+            if wait > 0:
+                return wait
+            self._requests -= 1
+            self._tokens -= tokens
+            self.stats['acquired'] += 1
+            return 0.0
+
+    async def acquire(self, tokens: float = 0):
+        """Wait until one request of ``tokens`` tokens fits in both buckets."""
+        start = time.monotonic()
+        while True:
+            wait = self._try_acquire(tokens)
+            if wait <= 0:
+                break
+            await asyncio.sleep(wait)
+        with self._lock:
+            self.stats['waited_s'] += time.monotonic() - start
+
+    def pause(self, seconds: float):
+        """Hold every request for ``seconds`` (e.g. from a Retry-After header)."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self.stats['pauses'] += 1
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {**self.stats, 'waited_s': round(self.stats['waited_s'], 3)}
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header: delta-seconds or an HTTP date. None if missing or malformed."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
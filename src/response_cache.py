@@ -0,0 +1,178 @@
+"""
+Persistent cache for LLM responses.
+
+Responses are keyed by (provider, model, hash of the prompt, call parameters)
+and stored in one SQLite table with the task that produced them. Each task
+has its own time-to-live, and the least recently used entries are evicted
+once the stored text exceeds the size cap. Hits and misses are counted per
+task.
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+DAY = 86400
+
+# How long a response stays valid, per task (seconds)
+DEFAULT_TTLS = {
+    'resume_parse': 30 * DAY,
+    'job_analysis': 7 * DAY,
+    'cover_letter': 1 * DAY,
+}
+DEFAULT_TTL = 1 * DAY
+
+class ResponseCache:
+    """Disk-backed (provider, model, prompt, params) -> response text cache."""
+
+    def __init__(self, cache_dir: str = "response_cache", max_bytes: int = 32 * 1024 * 1024,
+                 ttls: Optional[Dict[str, float]] = None):
+        """
+        Open (or create) the cache.
+
+        Args:
+            cache_dir: Directory holding ``responses.db``
+            max_bytes: Upper bound on stored response bytes before LRU eviction kicks in
+            ttls: Task -> time-to-live in seconds, overriding DEFAULT_TTLS
+        """
+        os.makedirs(cache_dir, exist_ok=True)
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self._lock = threading.Lock()
+        self.stats = {'evictions': 0, 'expired': 0}
+        self.task_stats: Dict[str, Dict[str, int]] = {}
+
+        self.conn = sqlite3.connect(os.path.join(cache_dir, "responses.db"), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                task TEXT NOT NULL,
+                provider TEXT NOT NULL,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access);
+        """)
+        self._live_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    @staticmethod
+    def make_key(provider: str, model: str, prompt: str, params: Optional[Dict] = None) -> str:
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        material = json.dumps([provider, model, prompt_hash, params or {}], sort_keys=True, default=str)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def _count(self, task: str, outcome: str):
+        counters = self.task_stats.setdefault(task, {'hits': 0, 'misses': 0, 'stores': 0, 'bypassed': 0})
+        counters[outcome] += 1
+
+    def get(self, task: str, provider: str, model: str, prompt: str, params: Optional[Dict] = None) -> Optional[str]:
+        """Cached response, or None if absent or older than the task's TTL."""
+        return self.get_any(task, [(provider, model, params)], prompt)
+
+    def get_any(self, task: str, entries: Sequence[Tuple[str, str, Optional[Dict]]], prompt: str) -> Optional[str]:
+        """
+        First cached response for ``prompt`` among ``entries`` ((provider, model, params) tuples).
+
+        Counts as one lookup: a single hit or a single miss, however many entries are probed.
+        """
+        now = time.time()
+        with self._lock:
+            for provider, model, params in entries:
+                key = self.make_key(provider, model, prompt, params)
+                row = self.conn.execute("SELECT response, size, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is not None and now - row[2] > self.ttls.get(task, DEFAULT_TTL):
+                    with self.conn:
+                        self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._live_bytes -= row[1]
+                    self.stats['expired'] += 1
+                    row = None
+                if row is None:
+                    continue
+                with self.conn:
+                    self.conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+                self._count(task, 'hits')
+                return row[0]
+            self._count(task, 'misses')
+            return None
+
+    def put(self, task: str, provider: str, model: str, prompt: str, response: str, params: Optional[Dict] = None):
+        key = self.make_key(provider, model, prompt, params)
+        size = len(response.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            old = self.conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            with self.conn:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, task, provider, model, response, size, created_at, last_access) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", (key, task, provider, model, response, size, now, now)
+                )
+            self._live_bytes += size - (old[0] if old else 0)
+            self._count(task, 'stores')
+            self._evict_if_needed()
+
+    def note_bypass(self, task: str):
+        with self._lock:
+            self._count(task, 'bypassed')
+
+    def _evict_if_needed(self):
+        """Drop least-recently-used responses until the stored text fits in max_bytes."""
+        if self._live_bytes <= self.max_bytes:
+            return
+        target = int(self.max_bytes * 0.9)
+        doomed = []
+        live = self._live_bytes
+        for key, size in self.conn.execute("SELECT key, size FROM responses ORDER BY last_access"):
+            if live <= target:
+                break
+            doomed.append((key,))
+            live -= size
+        with self.conn:
+            self.conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+        self._live_bytes = live
+        self.stats['evictions'] += len(doomed)
+        logger.info(f"Evicted {len(doomed)} cached LLM responses")
+
+    def hit_rate(self, task: Optional[str] = None) -> float:
+        counters = [self.task_stats[task]] if task else list(self.task_stats.values())
+        hits = sum(c['hits'] for c in counters if c)
+        lookups = hits + sum(c['misses'] for c in counters if c)
+        return hits / lookups if lookups else 0.0
+
+    def get_stats(self) -> Dict:
+        return {
+            **self.stats,
+            'hit_rate': round(self.hit_rate(), 4),
+            'tasks': {task: {**counters, 'hit_rate': round(self.hit_rate(task), 4)}
+                      for task, counters in self.task_stats.items()},
+            'entries': self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0],
+            'live_bytes': self._live_bytes,
+        }
+
+    def close(self):
+        self.conn.close()
+
+_shared_cache: Optional[ResponseCache] = None
+_shared_lock = threading.Lock()
+
+def get_response_cache() -> ResponseCache:
+    """Process-wide cache instance, configured from RESPONSE_CACHE_DIR / RESPONSE_CACHE_MAX_MB."""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = ResponseCache(
+                cache_dir=os.getenv("RESPONSE_CACHE_DIR", "response_cache"),
+                max_bytes=int(float(os.getenv("RESPONSE_CACHE_MAX_MB", 32)) * 1024 * 1024)
+            )
+        return _shared_cache
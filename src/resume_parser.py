@@ -1,14 +1,21 @@
 import pdfplumber
 import docx2txt
+import hashlib
+import os
 import re
 import json
 from typing import Dict, List, Optional
 import numpy as np
-from sentence_transformers import SentenceTransformer
 import logging
 from .ai_agents import MultiAgentAI
+from .embedding_cache import cached_encode
+from .model_registry import SharedModel
+from .embedding_backends import DEFAULT_MODEL, model_key, similarity_scores
+from .compact_embeddings import load_embeddings, save_embeddings
 
 class ResumeParser:
+    MODEL_NAME = DEFAULT_MODEL
+
     def __init__(self, config: Dict = None):
         """Initialize the resume parser with multi-agent AI support."""
         self.config = config or {}
@@ -17,13 +24,18 @@ class ResumeParser:
         # Initialize multi-agent AI system
         self.ai_agents = MultiAgentAI(self.config)
         
-        # Initialize sentence transformer for embeddings
-        try:
-            self.sentence_transformer = SentenceTransformer('all-MiniLM-L6-v2')
-            self.logger.info("✅ Sentence transformer loaded successfully")
-        except Exception as e:
-            self.logger.error(f"❌ Error loading sentence transformer: {e}")
-            self.sentence_transformer = None
+        # Sentence transformer for embeddings, shared through the model registry and loaded on first encode
+        self.model_key = model_key(self.MODEL_NAME)  # backend chosen by EMBEDDING_BACKEND
+        self.sentence_transformer = SharedModel(self.model_key)
+    
+    def encode_texts(self, texts: List[str], batch_size: int = 32) -> List[np.ndarray]:
+        """Embed texts with the sentence transformer, served from the shared embedding cache when possible."""
+        return cached_encode(self.sentence_transformer, self.model_key, texts, batch_size=batch_size)
+    
+    @staticmethod
+    def calculate_similarities(resume_embedding: np.ndarray, job_embeddings: np.ndarray) -> np.ndarray:
+        """Vectorized cosine similarity of one resume vector against a matrix of job vectors, mapped to 0-1."""
+        return similarity_scores(resume_embedding, job_embeddings)
     
     def extract_text_from_pdf(self, pdf_path: str) -> str:
         """Extract text from PDF file."""
@@ -70,13 +82,8 @@ class ResumeParser:
             # Use multi-agent AI to parse resume
             self.logger.info("🤖 Using multi-agent AI to parse resume...")
             
-            # Try Groq first (primary model)
-            parsed_data = self.ai_agents.parse_resume_with_groq(text)
-            
-            # If Groq fails, fallback to Gemini
-            if not parsed_data or not parsed_data.get('skills'):
-                self.logger.info("🔄 Falling back to Gemini for resume parsing...")
-                parsed_data = self.ai_agents.parse_resume_with_gemini(text)
+            # Routed to the fastest healthy provider; the router already falls back to Gemini
+            parsed_data = self.ai_agents.parse_resume(text)
             
             # Add raw text to parsed data
             parsed_data['raw_text'] = text
@@ -84,8 +91,8 @@ class ResumeParser:
             # Generate embeddings for the resume
             if self.sentence_transformer:
                 try:
-                    resume_embedding = self.sentence_transformer.encode(text)
-                    parsed_data['embedding'] = resume_embedding.tolist()
+                    resume_embedding = self.encode_texts([text])[0]
+                    parsed_data['embedding'] = np.asarray(resume_embedding, dtype=np.float32)
                     self.logger.info("✅ Generated resume embedding")
                 except Exception as e:
                     self.logger.error(f"❌ Error generating resume embedding: {e}")
@@ -153,6 +160,52 @@ class ResumeParser:
         
         return contact_info
     
+    def save_parsed_resume(self, parsed_data: Dict, path: str, fmt: str = "float16") -> Dict[str, int]:
+        """Persist parsed resume data: fields as JSON, the embedding in compact binary next to it."""
+        metadata = {key: value for key, value in parsed_data.items() if key != 'embedding'}
+        embedding = parsed_data.get('embedding')
+        vectors = np.zeros((0, 0), dtype=np.float32) if embedding is None else np.asarray(embedding)[np.newaxis, :]
+        return save_embeddings(path, vectors, [metadata] if len(vectors) else [], fmt=fmt)
+    
+    def load_parsed_resume(self, path: str) -> Dict:
+        """Load data written by save_parsed_resume, with the embedding dequantized to float32."""
+        stored = load_embeddings(path, mmap=False)
+        if not len(stored):
+            return self._default_resume_data()
+        return {**stored.metadata[0], 'embedding': stored.vectors([0])[0]}
+    
+    def parsed_resume_path(self, file_path: str, cache_dir: str) -> str:
+        """Where the parse of this exact resume file, embedded with the current model, is stored."""
+        with open(file_path, "rb") as f:
+            digest = hashlib.sha256(f.read()).hexdigest()[:16]
+        return os.path.join(cache_dir, f"{digest}-{self.model_key.replace(':', '-')}")
+    
+    def load_or_parse_resume(self, file_path: str, cache_dir: str, fmt: str = "float16") -> Dict:
+        """Reuse the stored parse of an unchanged resume; otherwise parse it and store the result.
+        
+        Only complete parses (skills and an embedding) are stored, so a failed run is retried.
+        """
+        try:
+            path = self.parsed_resume_path(file_path, cache_dir)
+        except OSError as e:
+            self.logger.error(f"❌ Error reading resume: {e}")
+            return self._default_resume_data()
+        if os.path.exists(f"{path}.json"):
+            try:
+                parsed_data = self.load_parsed_resume(path)
+                self.logger.info(f"💾 Using stored parse of {file_path}")
+                return parsed_data
+            except Exception as e:
+                self.logger.warning(f"⚠️ Stored resume parse unreadable, parsing again: {e}")
+        
+        parsed_data = self.parse_resume(file_path)
+        if parsed_data.get('skills') and parsed_data.get('embedding') is not None:
+            try:
+                self.save_parsed_resume(parsed_data, path, fmt=fmt)
+            except Exception as e:
+                self.logger.warning(f"⚠️ Could not store parsed resume: {e}")
+        return parsed_data
+    
     def _default_resume_data(self) -> Dict:
         """Return default resume data structure."""
         return {
@@ -164,7 +217,7 @@ class ResumeParser:
             'domains': [],
             'contact_info': {},
             'raw_text': '',
-            'embedding': []
+            'embedding': None
         }
     
     def calculate_similarity(self, resume_embedding: np.ndarray, job_embedding: np.ndarray) -> float:
@@ -188,23 +241,13 @@ class ResumeParser:
             self.logger.debug(f"🔍 Resume embedding dim: {len(resume_vec)}")
             self.logger.debug(f"🧾 Job embedding dim: {len(job_vec)}")
             
-            # Calculate cosine similarity
-            dot_product = np.dot(resume_vec, job_vec)
-            norm_resume = np.linalg.norm(resume_vec)
-            norm_job = np.linalg.norm(job_vec)
-            
             # Check for zero vectors
-            if norm_resume == 0 or norm_job == 0:
+            if not np.any(resume_vec) or not np.any(job_vec):
                 self.logger.warning("⚠️ Zero vector detected in similarity calculation")
                 return 0.0
             
-            similarity = dot_product / (norm_resume * norm_job)
-            
-            # Ensure the result is within [-1, 1] range
-            similarity = max(-1.0, min(1.0, similarity))
-            
-            # Convert to a 0-1 range for easier interpretation
-            normalized_similarity = (similarity + 1) / 2
+            # Single-row case of the vectorized path
+            normalized_similarity = self.calculate_similarities(resume_vec, job_vec[np.newaxis, :])[0]
             
             self.logger.debug(f"✅ Calculated similarity score: {normalized_similarity:.4f}")
             return float(normalized_similarity)
@@ -0,0 +1,137 @@
+"""
+Resume-to-job similarity in one embedding space per run.
+
+The service embeds the resume once per provider, scores a whole batch of job
+descriptions with one encode call and one matrix-vector product, and only
+changes provider between batches: every score in a batch comes from the same
+space, and the result says which provider that was.
+"""
+import hashlib
+import logging
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+try:
+    from .embedding_backends import similarity_scores
+    from .embedding_cache import get_embedding_cache
+except ImportError:
+    from embedding_backends import similarity_scores
+    from embedding_cache import get_embedding_cache
+
+logger = logging.getLogger(__name__)
+
+Encoder = Callable[[List[str]], Sequence[Sequence[float]]]
+
+DEFAULT_PROVIDER_ORDER = ["cohere", "openai", "local"]
+
+@dataclass
+class SimilarityResult:
+    """Scores for one batch of descriptions (0-1, input order) and the provider that produced them."""
+    scores: np.ndarray
+    provider: str
+    vectors: Optional[np.ndarray] = None  # the description embeddings, in the provider's space
+
+class SimilarityService:
+    """Scores job descriptions against a resume, pinning one provider per run."""
+
+    def __init__(self, encoders: Dict[str, Encoder], order: Optional[List[str]] = None,
+                 spaces: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            encoders: Provider name -> function embedding a list of texts (vectors in input order)
+            order: Provider preference; the first one that works is pinned for the run
+            spaces: Provider name -> name of its embedding space (model), defaults to the provider name
+        """
+        self.encoders = encoders
+        self.spaces = {name: (spaces or {}).get(name, name) for name in encoders}
+        self.order = [name for name in (order or list(encoders)) if name in encoders]
+        if not self.order:
+            raise ValueError("No embedding providers configured for similarity scoring")
+        self.pinned: Optional[str] = None
+        self._resume_vectors: Dict[tuple, np.ndarray] = {}
+        self.stats = {'batches': 0, 'fallbacks': 0, 'scored': 0}
+
+    @classmethod
+    def from_components(cls, resume_parser, ai_agents, preferred: Optional[str] = None,
+                        local_batch_size: int = 64) -> "SimilarityService":
+        """Build the usual providers from the bot's ResumeParser and MultiAgentAI."""
+        cache = get_embedding_cache()
+
+        def local(texts):
+            return resume_parser.encode_texts(texts, batch_size=local_batch_size)
+
+        def cohere(texts):
+            return cache.get_or_compute("cohere", ai_agents.COHERE_EMBED_MODEL, texts, ai_agents._embed_with_cohere)
+
+        def openai(texts):
+            vectors = ai_agents.generate_embeddings_with_openai(texts)
+            if len(vectors) != len(texts) or not all(vectors):
+                raise ValueError("OpenAI did not return an embedding for every text")
+            return vectors
+
+        order = list(DEFAULT_PROVIDER_ORDER)
+        if preferred in order:
+            order.remove(preferred)
+            order.insert(0, preferred)
+        spaces = {
+            'cohere': f"cohere-{ai_agents.COHERE_EMBED_MODEL}",
+            'openai': f"openai-{ai_agents.OPENAI_EMBED_MODEL}",
+            'local': f"local-{resume_parser.model_key.replace(':', '-')}",
+        }
+        return cls({'cohere': cohere, 'openai': openai, 'local': local}, order, spaces)
+
+    def start_run(self):
+        """Forget the pinned provider so the next batch picks the preferred one again."""
+        self.pinned = None
+
+    def resume_vector(self, provider: str, resume_text: str) -> np.ndarray:
+        """The resume embedded by ``provider``, computed once per resume content."""
+        key = (provider, hashlib.sha256(resume_text.encode("utf-8")).hexdigest())
+        if key not in self._resume_vectors:
+            self._resume_vectors[key] = np.asarray(self.encoders[provider]([resume_text])[0], dtype=np.float32)
+        return self._resume_vectors[key]
+
+    def _candidates(self) -> List[str]:
+        if self.pinned is None:
+            return list(self.order)
+        start = self.order.index(self.pinned)
+        return self.order[start:] + self.order[:start]
+
+    def score(self, resume_text: str, descriptions: List[str]) -> SimilarityResult:
+        """
+        Score ``descriptions`` against the resume in the pinned space.
+
+        If the pinned provider fails for this batch, the whole batch is retried on the
+        next provider, which then stays pinned for the rest of the run.
+        """
+        if not descriptions:
+            return SimilarityResult(np.zeros(0, dtype=np.float32), self.pinned or self.order[0])
+
+        errors = []
+        candidates = self._candidates()
+        for provider in candidates:
+            try:
+                resume_vector = self.resume_vector(provider, resume_text)
+                job_vectors = np.asarray(self.encoders[provider](list(descriptions)), dtype=np.float32)
+                if job_vectors.ndim != 2 or len(job_vectors) != len(descriptions):
+                    raise ValueError(f"expected {len(descriptions)} vectors, got shape {job_vectors.shape}")
+                scores = similarity_scores(resume_vector, job_vectors)
+            except Exception as e:
+                logger.warning(f"⚠️ {provider} could not score a batch of {len(descriptions)}: {e}")
+                errors.append(f"{provider}: {e}")
+                continue
+
+            if provider != candidates[0]:
+                self.stats['fallbacks'] += 1
+                logger.info(f"🔄 Similarity scoring moved from {candidates[0]} to {provider} for the rest of the run")
+            self.pinned = provider
+            self.stats['batches'] += 1
+            self.stats['scored'] += len(descriptions)
+            return SimilarityResult(scores, provider, job_vectors)
+
+        raise RuntimeError(f"All embedding providers failed: {'; '.join(errors)}")
+
+    def get_stats(self) -> Dict:
+        return {**self.stats, 'pinned': self.pinned}
@@ -1,15 +1,25 @@
 import numpy as np
-from sentence_transformers import SentenceTransformer
 from sklearn.metrics.pairwise import cosine_similarity
 from typing import Dict, List, Tuple, Optional
 import re
 import json
 from datetime import datetime
+try:
+    from .embedding_cache import cached_encode
+    from .model_registry import SharedModel
+    from .embedding_backends import model_key
+except ImportError:
+    # Imported as a top-level module by the filter scripts run from src/
+    from embedding_cache import cached_encode
+    from model_registry import SharedModel
+    from embedding_backends import model_key
 
 class SkillMatcher:
     def __init__(self, model_name: str = 'all-MiniLM-L6-v2'):
         """Initialize the skill matcher with AI model for semantic similarity."""
-        self.model = SentenceTransformer(model_name)
+        self.model_name = model_name
+        self.model_key = model_key(model_name)  # backend chosen by EMBEDDING_BACKEND
+        self.model = SharedModel(self.model_key)  # loaded once per process, on first use
         self.similarity_threshold = 0.85
         
         # Skill categories for better matching
@@ -85,9 +95,10 @@ class SkillMatcher:
     def calculate_similarity_score(self, resume_text: str, job_description: str) -> float:
         """Calculate semantic similarity between resume and job description."""
         try:
-            # Create embeddings
-            resume_embedding = self.model.encode(resume_text)
-            job_embedding = self.model.encode(job_description)
+            # Create embeddings (the resume text is usually a cache hit after the first job)
+            resume_embedding, job_embedding = cached_encode(
+                self.model, self.model_key, [resume_text, job_description]
+            )
             
             # Calculate cosine similarity
             similarity = cosine_similarity(
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Test Analyze Many
+
+This script runs MultiAgentAI.analyze_many against a local OpenAI-compatible
+stand-in for the Groq chat completions endpoint and checks that results stay
+aligned with the input, requests run concurrently within the requests/min
+limit, a 429 with Retry-After is honored, and cached prompts skip the network
+while the cache hit rate counts one lookup per prompt.
+"""
+
+import asyncio
+import json
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Keep the test's responses out of the real caches
+os.environ["EMBEDDING_CACHE_DIR"] = tempfile.mkdtemp(prefix="embedding_cache_")
+os.environ["RESPONSE_CACHE_DIR"] = tempfile.mkdtemp(prefix="response_cache_")
+
+from ai_agents import MultiAgentAI
+from rate_limiter import ProviderLimiter, retry_after_seconds
+
+THROTTLED = "posting 7"
+RETRY_AFTER = 1
+
+class StandInServer(BaseHTTPRequestHandler):
+    """OpenAI-style /chat/completions: echoes the posting id, throttles THROTTLED once."""
+    protocol_version = "HTTP/1.1"
+    arrivals = []
+    throttled = False
+    in_flight = 0
+    max_in_flight = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        posting = re.search(r"posting \d+", body['messages'][0]['content']).group(0)
+        cls = type(self)
+        with cls.lock:
+            cls.arrivals.append((time.monotonic(), posting))
+            throttle = posting == THROTTLED and not cls.throttled
+            cls.throttled = cls.throttled or throttle
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+
+        if throttle:
+            status, payload, headers = 429, b'{"error": "rate limited"}', {'Retry-After': str(RETRY_AFTER)}
+        else:
+            time.sleep(random.uniform(0.05, 0.15))
+            content = json.dumps({'required_skills': [posting], 'experience_level': 'entry'})
+            status, headers = 200, {}
+            payload = json.dumps({'choices': [{'message': {'role': 'assistant', 'content': content}}]}).encode()
+        with cls.lock:
+            cls.in_flight -= 1
+
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+class UnavailableGemini:
+    def generate_content(self, prompt):
+        raise RuntimeError("Gemini is not reachable in tests")
+
+def run_tests():
+    """
+    Run all test cases and report results.
+    """
+    passed = 0
+    failed = 0
+
+    def check(name: str, ok: bool, detail: str = ""):
+        nonlocal passed, failed
+        if ok:
+            passed += 1
+        else:
+            failed += 1
+        print(f"[{'PASS' if ok else 'FAIL'}] {name}{f' ({detail})' if detail else ''}")
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInServer)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    ai = MultiAgentAI({
+        'openai_api_key': 'test', 'gemini_api_key': 'test', 'cohere_api_key': 'test',
+        'groq_api_key': 'test', 'openrouter_api_key': 'test',
+    })
+    ai.groq_url = f"http://127.0.0.1:{server.server_port}/chat/completions"
+    ai.gemini_model = UnavailableGemini()
+    # 10 requests/s sustained with a burst of 5
+    ai._rate_limiters['groq'] = ProviderLimiter(600, 10000000, burst_seconds=0.5)
+
+    descriptions = [f"Software intern, posting {i}, Python and SQL" for i in range(30)]
+    start = time.perf_counter()
+    results = asyncio.run(ai.analyze_many(descriptions, max_concurrency=8))
+    elapsed = time.perf_counter() - start
+
+    check("one result per input", len(results) == len(descriptions))
+    check("results aligned to input order",
+          all(result.get('required_skills') == [f"posting {i}"] for i, result in enumerate(results)))
+    check("requests run concurrently", StandInServer.max_in_flight > 1, f"max {StandInServer.max_in_flight} in flight")
+
+    times = sorted(t for t, _ in StandInServer.arrivals)
+    busiest = max(sum(1 for t in times if start_t <= t < start_t + 1) for start_t in times)
+    check("requests/min limit respected", busiest <= 10 + 5 + 1, f"{busiest} requests in the busiest second")
+
+    retried = [t for t, posting in StandInServer.arrivals if posting == THROTTLED]
+    check("429 retried after Retry-After",
+          len(retried) == 2 and retried[1] - retried[0] >= RETRY_AFTER - 0.05 and elapsed >= RETRY_AFTER,
+          f"retried after {retried[1] - retried[0]:.2f}s" if len(retried) == 2 else f"{len(retried)} attempts")
+
+    StandInServer.arrivals.clear()
+    again = asyncio.run(ai.analyze_many(descriptions))
+    check("cached prompts skip the network", not StandInServer.arrivals and again == results)
+    lookups = ai.response_cache.get_stats()['tasks']['job_analysis']
+    check("one hit or miss per prompt, not per provider probed",
+          lookups['misses'] == len(descriptions) and lookups['hits'] == len(descriptions), json.dumps(lookups))
+
+    check("sync and async share cache entries",
+          ai.analyze_job_description(descriptions[3]) == results[3] and not StandInServer.arrivals)
+
+    gemini_only = "Data intern, posting 99, pandas"
+    prompt = ai._job_analysis_prompt(gemini_only)
+    ai.response_cache.put('job_analysis', 'gemini', ai.gemini_model_name, prompt,
+                          json.dumps({'required_skills': ['from gemini']}))
+    check("answers cached by Gemini are reused",
+          asyncio.run(ai.analyze_many([gemini_only]))[0] == {'required_skills': ['from gemini']}
+          and not StandInServer.arrivals)
+
+    before = ai.response_cache.get_stats()['tasks']['job_analysis']['bypassed']
+    ai.groq_url = "http://127.0.0.1:1/chat/completions"  # Groq fails, so each request also tries Gemini
+    asyncio.run(ai.analyze_many(descriptions[:3], bypass_cache=True))
+    after = ai.response_cache.get_stats()['tasks']['job_analysis']['bypassed']
+    check("bypass counted once per request", after - before == 3, f"{after - before} bypasses for 3 requests")
+
+    check("Retry-After parses seconds and dates",
+          retry_after_seconds("2") == 2.0 and retry_after_seconds("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+          and retry_after_seconds("soon") is None)
+
+    server.shutdown()
+
+    # Print summary
+    total = passed + failed
+    print(f"\nTest Summary: {passed}/{total} passed ({passed/total*100:.1f}%)")
+    if failed > 0:
+        print(f"❌ {failed} tests failed")
+    else:
+        print("✅ All tests passed!")
+    return failed == 0
+
+if __name__ == "__main__":
+    run_tests()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Test ANN Index
+
+This script checks IVFIndex against exact search on clustered synthetic
+vectors: searches are exact until the index is trained, recall@10 stays high
+once it is, appended rows are found, save/load round-trips, and
+JobEmbeddingStore keeps its index in step with the stored rows (rebuilding it
+when rows it covers were dropped by a torn-append recovery).
+"""
+
+import os
+import tempfile
+
+import numpy as np
+
+from ann_index import IVFIndex
+from job_embedding_store import JobEmbeddingStore
+
+DIM = 32
+
+def clustered(rng, count: int, centers: np.ndarray) -> np.ndarray:
+    picks = rng.integers(0, len(centers), size=count)
+    return (centers[picks] + 0.3 * rng.standard_normal((count, centers.shape[1]))).astype(np.float32)
+
+def exact_top(vectors: np.ndarray, query: np.ndarray, k: int) -> np.ndarray:
+    normed = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.argsort(-(normed @ (query / np.linalg.norm(query))))[:k]
+
+def run_tests():
+    """
+    Run all test cases and report results.
+    """
+    passed = 0
+    failed = 0
+
+    def check(name: str, ok: bool, detail: str = ""):
+        nonlocal passed, failed
+        if ok:
+            passed += 1
+        else:
+            failed += 1
+        print(f"[{'PASS' if ok else 'FAIL'}] {name}{f' ({detail})' if detail else ''}")
+
+    rng = np.random.default_rng(20)
+    centers = rng.standard_normal((40, DIM)).astype(np.float32)
+    data = clustered(rng, 12000, centers)
+    source = lambda rows: data[rows]
+    queries = clustered(rng, 50, centers)
+
+    index = IVFIndex(source, nprobe=8, min_train_rows=2000)
+    index.add(1500)
+    rows, _ = index.search(queries[0], 10)
+    check("untrained index searches exactly", not index.trained
+          and list(rows) == list(exact_top(data[:1500], queries[0], 10)))
+
+    index.add(8500)
+    recall = np.mean([len(set(index.search(q, 10)[0]) & set(exact_top(data[:10000], q, 10))) / 10 for q in queries])
+    check("trained index keeps recall@10 high", index.trained and recall >= 0.9, f"recall {recall:.3f}")
+    lists = index._inverted_lists()
+    check("every row in exactly one list", sorted(np.concatenate(lists).tolist()) == list(range(10000)))
+
+    index.add(2000)
+    rows, similarity = index.search(data[11500], 5)
+    check("appended rows are searchable", rows[0] == 11500 and similarity[0] > 0.999)
+    rows, _ = index.search(data[11500], 5, exclude=np.array([11500]))
+    check("excluded rows left out", 11500 not in rows and len(rows) == 5)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "ivf.npz")
+        index.save(path)
+        loaded = IVFIndex.load(path, source, min_train_rows=2000)
+        same = all(np.array_equal(loaded.search(q, 10)[0], index.search(q, 10)[0]) for q in queries[:10])
+        check("save/load round-trips", loaded.count == index.count and loaded.trained_at == index.trained_at and same)
+
+        # Retrain after 4x growth
+        small = IVFIndex(source, min_train_rows=1000)
+        small.add(1000)
+        trained_at = small.trained_at
+        small.add(3000)
+        check("index retrained after 4x growth", trained_at == 1000 and small.trained_at == 4000)
+
+        # Kept in step by JobEmbeddingStore
+        store_dir = os.path.join(tmp, "store")
+        store = JobEmbeddingStore(store_dir)
+        postings = [{'id': f"job-{i}"} for i in range(3000)]
+        store.add(postings[:2500], data[:2500])
+        store.index()
+        store.add(postings[2500:], data[2500:3000])
+        check("store index follows appends", store.index().count == 3000
+              and store.search(data[2900], top_k=1)[0]['job_key'] == "job-2900")
+        similar = store.similar_to("job-10", top_k=5)
+        check("similar_to excludes the posting itself", len(similar) == 5 and all(hit['job_key'] != "job-10" for hit in similar))
+        store.mark_closed([similar[0]['job_key']])
+        check("closed postings left out of open searches",
+              similar[0]['job_key'] not in [hit['job_key'] for hit in store.similar_to("job-10", top_k=5)])
+        store.close()
+
+        # Index saved past the rows a torn append left behind
+        store = JobEmbeddingStore(store_dir)
+        with store.conn:
+            store.conn.execute("DELETE FROM postings WHERE row >= 2800")
+        store.close()
+        reopened = JobEmbeddingStore(store_dir)
+        check("index rebuilt when it covers dropped rows", reopened.index().count == 2800
+              and all(hit['row'] < 2800 for hit in reopened.search(data[2900], top_k=10)))
+        reopened.close()
+
+    # Print summary
+    total = passed + failed
+    print(f"\nTest Summary: {passed}/{total} passed ({passed/total*100:.1f}%)")
+    if failed > 0:
+        print(f"❌ {failed} tests failed")
+    else:
+        print("✅ All tests passed!")
+    return failed == 0
+
+if __name__ == "__main__":
+    run_tests()
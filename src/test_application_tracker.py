@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Test Application Tracker
+
+This script checks the ApplicationTracker analytics (date-range lookup,
+weekly report, statistics and duplicate cleanup) against brute-force
+results on 50k synthetic applications, and reports how long each took. It
+also checks that the running summary counters match the table after random
+edits, full-text search against a LIKE scan, the one-shot legacy JSON
+migration, and that every export format (JSON, CSV, JSONL, Parquet, Excel)
+round-trips the table; Parquet and Excel are skipped when pyarrow or openpyxl
+is missing.
+"""
+
+import contextlib
+import csv
+import importlib.util
+import io
+import json
+import os
+import random
+import re
+import tempfile
+import time
+from datetime import datetime, timedelta
+from itertools import zip_longest
+
+from application_tracker import ApplicationTracker
+
+NUM_APPLICATIONS = 50000
+NUM_DUPLICATES = 500
+
+# Generous upper bounds so the checks stay meaningful on slow CI machines
+TIME_LIMITS = {
+    'get_applications_by_date_range': 0.25,
+    'generate_weekly_report': 0.25,
+    'get_statistics': 1.0,
+    'clean_duplicates': 2.0,
+    'get_applications_summary': 0.01,
+}
+
+def make_applications(count: int, seed: int = 11):
+    rng = random.Random(seed)
+    now = datetime.now()
+    return [
+        {
+            'title': rng.choice(["Software Intern", "Data Science Intern", "ML Intern", "Frontend Intern"]),
+            'company': rng.choice(["Acme", "Globex", "Initech", "Hooli", "Umbrella"]),
+            'platform': rng.choice(["linkedin", "indeed"]),
+            'link': f"https://www.linkedin.com/jobs/view/{i}/",
+            'similarity_score': round(rng.random(), 3),
+            'status': rng.choice(["Applied", "Failed", "Pending"]),
+            'applied_at': (now - timedelta(minutes=rng.randint(0, 60 * 24 * 180))).isoformat(),
+        }
+        for i in range(count)
+    ]
+
+def make_duplicates(applications, count: int, seed: int = 12):
+    """Copies that differ only in case, spacing and link tracking parameters."""
+    rng = random.Random(seed)
+    duplicates = []
+    for app in rng.sample(applications, count):
+        duplicates.append({
+            **app,
+            'title': f"  {app['title'].upper()} ",
+            'company': app['company'].lower(),
+            'link': app['link'].upper() + "?trk=public_jobs",
+        })
+    return duplicates
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+def run_tests():
+    """
+    Run all test cases and report results.
+    """
+    passed = 0
+    failed = 0
+
+    def check(name: str, ok: bool, elapsed: float = None):
+        nonlocal passed, failed
+        limit = TIME_LIMITS.get(name)
+        if elapsed is not None and limit is not None and elapsed > limit:
+            ok = False
+        status = "PASS" if ok else "FAIL"
+        if ok:
+            passed += 1
+        else:
+            failed += 1
+        timing = f" ({elapsed * 1000:.1f}ms, limit {limit * 1000:.0f}ms)" if elapsed is not None else ""
+        print(f"[{status}] {name}{timing}")
+
+    applications = make_applications(NUM_APPLICATIONS)
+    duplicates = make_duplicates(applications, NUM_DUPLICATES)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tracker = ApplicationTracker(os.path.join(tmp, "applications.txt"))
+        print(f"Tracking {NUM_APPLICATIONS + NUM_DUPLICATES} applications...\n")
+        with contextlib.redirect_stdout(io.StringIO()):
+            for app in applications + duplicates:
+                tracker.add_application(**app)
+        everything = applications + duplicates
+
+        # Date-range lookup
+        end = datetime.now() - timedelta(days=30)
+        start = end - timedelta(days=7)
+        result, elapsed = timed(lambda: tracker.get_applications_by_date_range(start, end))
+        expected = sum(1 for app in everything if start.isoformat() <= app['applied_at'] <= end.isoformat())
+        check('get_applications_by_date_range', len(result) == expected, elapsed)
+
+        # Weekly report
+        report, elapsed = timed(tracker.generate_weekly_report)
+        week_start = report['period_start']
+        expected = sum(1 for app in everything if app['applied_at'] >= week_start)
+        check('generate_weekly_report', report['total_applications'] == expected, elapsed)
+
+        # Statistics
+        stats, elapsed = timed(tracker.get_statistics)
+        weekly_total = sum(week['total'] for week in stats['weekly'])
+        check('get_statistics', stats['total_applications'] == len(everything) == weekly_total, elapsed)
+
+        # Duplicate cleanup
+        with contextlib.redirect_stdout(io.StringIO()):
+            removed, elapsed = timed(tracker.clean_duplicates)
+        check('clean_duplicates', removed == NUM_DUPLICATES, elapsed)
+
+        # Summary counters follow the cleanup
+        summary, elapsed = timed(tracker.get_applications_summary)
+        check('get_applications_summary', summary['total_applications'] == NUM_APPLICATIONS, elapsed)
+
+        tracker.close()
+
+    # Running counters against the table
+    with tempfile.TemporaryDirectory() as tmp:
+        tracker = ApplicationTracker(os.path.join(tmp, "applications.txt"))
+        rng = random.Random(14)
+        pool = make_applications(300, seed=15)
+        for i, app in enumerate(pool):
+            # Distinct timestamps so the recent list has one right answer
+            app['applied_at'] = (datetime.now() - timedelta(minutes=rng.randint(0, 10 ** 6), seconds=i)).isoformat()
+        drift = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            for step in range(600):
+                action = rng.random()
+                if action < 0.6:
+                    app = dict(rng.choice(pool))
+                    app['status'] = rng.choice(["Applied", "Failed", "Pending"])
+                    app['platform'] = rng.choice(["linkedin", "indeed"])
+                    tracker.add_application(**app, overwrite=rng.random() < 0.5)
+                elif action < 0.95 and tracker.applications:
+                    tracker.update_application_status(rng.choice(tracker.applications)['id'],
+                                                      rng.choice(["Applied", "Failed", "Pending"]))
+                elif action < 0.98:
+                    tracker.clean_duplicates()
+                else:
+                    tracker.clear_applications()
+                summary = tracker.get_applications_summary()
+                statuses = {row['status']: row['n'] for row in tracker.conn.execute(
+                    "SELECT status, COUNT(*) AS n FROM applications GROUP BY status")}
+                platforms = {row['platform']: row['n'] for row in tracker.conn.execute(
+                    "SELECT platform, COUNT(*) AS n FROM applications GROUP BY platform")}
+                recent = [row['id'] for row in tracker.conn.execute(
+                    "SELECT id FROM applications ORDER BY applied_at DESC LIMIT ?", (tracker.RECENT_LIMIT,))]
+                if (summary['total_applications'] != sum(statuses.values())
+                        or summary['successful_applications'] != statuses.get('Applied', 0)
+                        or summary['failed_applications'] != statuses.get('Failed', 0)
+                        or summary['pending_applications'] != statuses.get('Pending', 0)
+                        or summary['platforms'] != platforms
+                        or [app['id'] for app in summary['recent_applications']] != recent):
+                    drift.append(step)
+        check('running counters match the table after random edits', not drift)
+        tracker.close()
+
+    # Full-text search
+    with tempfile.TemporaryDirectory() as tmp:
+        tracker = ApplicationTracker(os.path.join(tmp, "applications.txt"))
+        with contextlib.redirect_stdout(io.StringIO()):
+            for app in make_applications(2000, seed=16):
+                tracker.add_application(**app)
+            tracker.add_application("Café Backend Intern", "Société Générale", "linkedin",
+                                    link="https://example.com/jobs/cafe-1")
+
+        def scan(terms):
+            return sorted(app['id'] for app in tracker.applications
+                          if all(any(word.startswith(term) for field in ('title', 'company', 'link')
+                                     for word in re.findall(r"[^\W_]+", app[field].lower()))
+                                 for term in terms))
+
+        mismatched = [query for query in ("data", "ml intern", "Glob", "hoo sci", "view 17")
+                      if sorted(app['id'] for app in tracker.search_applications(query)) != scan(query.lower().split())]
+        check('search matches word prefixes like a full scan', tracker.fts_enabled and not mismatched)
+        check('search folds accents', [app['company'] for app in tracker.search_applications("societe cafe")]
+              == ["Société Générale"])
+        with contextlib.redirect_stdout(io.StringIO()):
+            cafe = tracker.search_applications("cafe")[0]
+            tracker.conn.execute("UPDATE applications SET title = 'Tea Intern' WHERE id = ?", (cafe['id'],))
+            tracker.conn.commit()
+        check('index follows updates', not tracker.search_applications("cafe backend")
+              and tracker.search_applications("tea")[0]['id'] == cafe['id'])
+        check('search limit and empty query', len(tracker.search_applications("intern", limit=5)) == 5
+              and len(tracker.search_applications("  ")) == len(tracker.applications))
+        tracker.close()
+
+    # Re-adding a tracked link and duplicate keys
+    with tempfile.TemporaryDirectory() as tmp:
+        tracker = ApplicationTracker(os.path.join(tmp, "applications.txt"))
+        link = "https://www.indeed.com/viewjob?jk=abc123"
+        with contextlib.redirect_stdout(io.StringIO()):
+            tracker.add_application("Data Intern", "Acme", "indeed", link, 0.8, "Interview")
+            readded = tracker.add_application("Data Intern", "Acme", "indeed", link, 0.5, "Applied")
+        stored = tracker.applications[0]
+        check('re-adding a tracked link keeps its status', not readded and stored['status'] == "Interview"
+              and stored['similarity_score'] == 0.8 and tracker.get_applications_summary()['total_applications'] == 1)
+        with contextlib.redirect_stdout(io.StringIO()):
+            overwritten = tracker.add_application("Data Intern", "Acme", "indeed", link, 0.5, "Applied", overwrite=True)
+        summary = tracker.get_applications_summary()
+        check('overwrite=True replaces the status', overwritten and tracker.applications[0]['status'] == "Applied"
+              and summary['successful_applications'] == 1 and summary['total_applications'] == 1)
+        tracker.close()
+
+        key = ApplicationTracker._dedup_key
+        base = {'company': "Acme", 'title': "Data Intern"}
+        check('dedup key keeps posting IDs in the query',
+              key({**base, 'link': "https://www.indeed.com/viewjob?jk=abc123"})
+              != key({**base, 'link': "https://www.indeed.com/viewjob?jk=def456"})
+              and key({**base, 'link': "https://boards.greenhouse.io/acme?gh_jid=1"})
+              != key({**base, 'link': "https://boards.greenhouse.io/acme?gh_jid=2"}))
+        check('dedup key drops tracking parameters',
+              key({**base, 'link': "https://www.indeed.com/viewjob?jk=abc123"})
+              == key({**base, 'link': "https://www.indeed.com/viewjob?utm_source=mail&from=serp&jk=abc123&utm_medium=x"})
+              and key({**base, 'link': "https://www.linkedin.com/jobs/view/7/"})
+              == key({**base, 'link': "https://www.linkedin.com/jobs/view/7?trk=public_jobs&refId=a1&trackingId=b2"}))
+
+    # Legacy JSON migration
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_file = os.path.join(tmp, "legacy.txt")
+        legacy = make_applications(3, seed=13)
+        legacy[2]['link'] = legacy[0]['link']
+        with open(legacy_file, 'w', encoding='utf-8') as f:
+            json.dump(legacy, f)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            tracker = ApplicationTracker(legacy_file)
+        check('migration merges repeated links and reports real counts',
+              len(tracker.applications) == 2 and "Migrated 2 applications" in output.getvalue()
+              and "Merged 1 legacy" in output.getvalue())
+        tracker.close()
+
+        broken_file = os.path.join(tmp, "broken.txt")
+        with open(broken_file, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(legacy)[:-5])
+        with contextlib.redirect_stdout(io.StringIO()):
+            tracker = ApplicationTracker(broken_file)
+        version = tracker.conn.execute("PRAGMA user_version").fetchone()[0]
+        tracker.close()
+        with open(broken_file, 'w', encoding='utf-8') as f:
+            json.dump(legacy[:2], f)
+        with contextlib.redirect_stdout(io.StringIO()):
+            tracker = ApplicationTracker(broken_file)
+        check('failed migration is retried on next start', version == 0 and len(tracker.applications) == 2)
+        tracker.close()
+
+    # Export round trips
+    with tempfile.TemporaryDirectory() as tmp:
+        tracker = ApplicationTracker(os.path.join(tmp, "applications.txt"))
+        with contextlib.redirect_stdout(io.StringIO()):
+            empty_export = tracker.export_to_jsonl(os.path.join(tmp, "empty.jsonl"))
+            for app in make_applications(25, seed=14):
+                tracker.add_application(**app)
+            tracker.add_application("Stagiaire Données", "Société Générale", "indeed",
+                                    "https://fr.indeed.com/viewjob?jk=é1", 0.5, "Pending")
+            tracker.update_application_status(3, "Failed")
+        expected = tracker.applications
+        check('export with no applications reports nothing to export', not empty_export)
+
+        def as_text(rows):
+            return [{column: '' if app[column] is None else str(app[column]) for column in tracker.COLUMNS}
+                    for app in rows]
+
+        paths = {fmt: os.path.join(tmp, f"export.{fmt}") for fmt in ("csv", "jsonl", "parquet", "xlsx")}
+        with contextlib.redirect_stdout(io.StringIO()):
+            tracker.save_applications()
+            exported = {'csv': tracker.export_to_csv(paths['csv']), 'jsonl': tracker.export_to_jsonl(paths['jsonl'])}
+        with open(tracker.applications_file, encoding='utf-8') as f:
+            check('save_applications writes the JSON file', json.load(f) == expected)
+        with open(paths['csv'], newline='', encoding='utf-8') as f:
+            check('CSV export round-trips', exported['csv'] and list(csv.DictReader(f)) == as_text(expected))
+        with open(paths['jsonl'], encoding='utf-8') as f:
+            check('JSONL export round-trips', exported['jsonl'] and [json.loads(line) for line in f] == expected)
+
+        if importlib.util.find_spec("pyarrow") is None:
+            print("[SKIP] Parquet export round-trips (pyarrow not installed)")
+        else:
+            import pyarrow.parquet as pq
+            with contextlib.redirect_stdout(io.StringIO()):
+                exported = tracker.export_to_parquet(paths['parquet'])
+            check('Parquet export round-trips', exported and pq.read_table(paths['parquet']).to_pylist() == expected)
+
+        if importlib.util.find_spec("openpyxl") is None:
+            print("[SKIP] Excel export round-trips (openpyxl not installed)")
+        else:
+            from openpyxl import load_workbook
+            with contextlib.redirect_stdout(io.StringIO()):
+                exported = tracker.export_to_excel(paths['xlsx'])
+            rows = list(load_workbook(paths['xlsx'], read_only=True)["Applications"].iter_rows(values_only=True))
+            check('Excel export round-trips', exported and rows[0] == tracker.COLUMNS
+                  and as_text(dict(zip_longest(tracker.COLUMNS, row)) for row in rows[1:]) == as_text(expected))
+        tracker.close()
+
+    # Print summary
+    total = passed + failed
+    print(f"\nTest Summary: {passed}/{total} passed ({passed/total*100:.1f}%)")
+    if failed > 0:
+        print(f"❌ {failed} tests failed")
+    else:
+        print("✅ All tests passed!")
+    return failed == 0
+
+if __name__ == "__main__":
+    run_tests()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Test Compact Embeddings
+
+This script checks the compact embedding formats: float16 and int8 round trips
+stay within their error bounds, scores keep the float32 top-k rankings
+(top-50 overlap of at least 99% for float16 and 95% for int8), saved files
+reload memory-mapped with their metadata, and ResumeParser stores a parsed
+resume once and reuses it while the file is unchanged. The ResumeParser part
+is skipped when its dependencies are missing.
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+from compact_embeddings import dequantize, load_embeddings, quantize, save_embeddings
+from embedding_backends import similarity_scores
+
+TOP_K = 50
+
+def make_embeddings(count: int, dim: int, seed: int = 18) -> np.ndarray:
+    """Clustered unit vectors, like job embeddings."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((40, dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, 40, count)] + 0.6 * rng.standard_normal((count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+def top_k_overlap(reference: np.ndarray, candidate: np.ndarray) -> float:
+    return len(set(np.argsort(-reference)[:TOP_K]) & set(np.argsort(-candidate)[:TOP_K])) / TOP_K
+
+def run_tests():
+    """
+    Run all test cases and report results.
+    """
+    passed = 0
+    failed = 0
+
+    def check(name: str, ok: bool, detail: str = ""):
+        nonlocal passed, failed
+        if ok:
+            passed += 1
+        else:
+            failed += 1
+        print(f"[{'PASS' if ok else 'FAIL'}] {name}{f' ({detail})' if detail else ''}")
+
+    def skip(name: str, reason: str):
+        print(f"[SKIP] {name} ({reason})")
+
+    vectors = make_embeddings(20000, 384)
+    queries = make_embeddings(20, 384, seed=81)
+
+    # Round trips
+    codes, scales = quantize(vectors, "float16")
+    error = np.abs(dequantize(codes, scales) - vectors).max()
+    check("float16 round trip within half-precision error", codes.dtype == np.float16 and scales is None
+          and error < 1e-3, f"max error {error:.1e}")
+    codes, scales = quantize(vectors, "int8")
+    bound = np.abs(vectors).max(axis=1) / 127.0 / 2 + 1e-6
+    error = np.abs(dequantize(codes, scales) - vectors)
+    check("int8 round trip within half a quantization step per row", codes.dtype == np.int8
+          and scales.shape == (len(vectors),) and (error.max(axis=1) <= bound).all(), f"max error {error.max():.1e}")
+    zero_codes, zero_scales = quantize(np.zeros((2, 8)), "int8")
+    check("zero vectors survive int8", not dequantize(zero_codes, zero_scales).any() and (zero_scales == 1.0).all())
+    try:
+        quantize(vectors[:2], "int4")
+        rejected = False
+    except ValueError:
+        rejected = True
+    check("unknown format rejected", rejected)
+
+    # Saved, memory-mapped scoring
+    with tempfile.TemporaryDirectory() as tmp:
+        metadata = [{'job_key': f"job-{i}"} for i in range(len(vectors))]
+        for fmt, min_overlap in (("float16", 0.99), ("int8", 0.95)):
+            path = os.path.join(tmp, fmt, "jobs")
+            sizes = save_embeddings(path, vectors, metadata, fmt=fmt)
+            stored = load_embeddings(path)
+            check(f"[{fmt}] reloaded memory-mapped with metadata",
+                  isinstance(stored.codes, np.memmap) and stored.format == fmt and len(stored) == len(vectors)
+                  and stored.dim == 384 and stored.metadata[123] == {'job_key': "job-123"})
+            check(f"[{fmt}] smaller than float32 on disk",
+                  sizes['jobs.npy'] <= vectors.nbytes // (2 if fmt == "float16" else 4) + 128, str(sizes))
+            overlaps, errors = [], []
+            for query in queries:
+                reference = similarity_scores(query, vectors)
+                scores = stored.similarity_scores(query)
+                overlaps.append(top_k_overlap(reference, scores))
+                errors.append(np.abs(scores - reference).max())
+            check(f"[{fmt}] top-{TOP_K} overlap with float32 scores", np.mean(overlaps) >= min_overlap,
+                  f"{np.mean(overlaps):.1%}, max score error {max(errors):.1e}")
+            rows = [5, 17, 19999]
+            check(f"[{fmt}] selected rows dequantized", np.allclose(stored.vectors(rows), vectors[rows], atol=1e-2))
+
+        try:
+            save_embeddings(os.path.join(tmp, "bad"), vectors[:3], metadata[:2])
+            mismatched = False
+        except ValueError:
+            mismatched = True
+        check("metadata count must match the vectors", mismatched)
+
+        # Parsed resume stored and reused by ResumeParser
+        sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        try:
+            from src.resume_parser import ResumeParser
+        except ImportError as e:
+            skip("parsed resume stored and reused", f"ResumeParser unavailable: {e}")
+        else:
+            parser = ResumeParser.__new__(ResumeParser)
+            parser.model_key = "sentence-transformers:stand-in"
+            parser.logger = __import__("logging").getLogger("test")
+            parses = []
+
+            def parse_resume(file_path):
+                parses.append(file_path)
+                return {'skills': ["python", "sql"], 'raw_text': "Python and SQL", 'contact_info': {'email': "a@b.c"},
+                        'embedding': vectors[0]}
+            parser.parse_resume = parse_resume
+            resume = os.path.join(tmp, "resume.pdf")
+            with open(resume, "wb") as f:
+                f.write(b"%PDF resume v1")
+            cache_dir = os.path.join(tmp, "parsed")
+            first = parser.load_or_parse_resume(resume, cache_dir)
+            second = parser.load_or_parse_resume(resume, cache_dir)
+            check("parsed resume stored and reused", len(parses) == 1 and second['skills'] == ["python", "sql"]
+                  and second['contact_info'] == {'email': "a@b.c"} and second['embedding'].dtype == np.float32
+                  and np.allclose(second['embedding'], first['embedding'], atol=1e-3))
+            with open(resume, "wb") as f:
+                f.write(b"%PDF resume v2")
+            parser.load_or_parse_resume(resume, cache_dir)
+            check("changed resume parsed again", len(parses) == 2)
+
+    # Print summary
+    total = passed + failed
+    print(f"\nTest Summary: {passed}/{total} passed ({passed/total*100:.1f}%)")
+    if failed > 0:
+        print(f"❌ {failed} tests failed")
+    else:
+        print("✅ All tests passed!")
+    return failed == 0
+
+if __name__ == "__main__":
+    run_tests()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Test Embedding Agent
+
+This script runs EmbeddingAgent.batch_get_embeddings against a stand-in Cohere
+client and checks that batches come back in input order, failed or partial
+batches are reported in ``failed``/``errors``, ``max_in_flight`` bounds the
+batches running at once, the Cohere connection is only validated on first use
+or warmup(), and the deprecated ``max_workers`` keyword still works.
+"""
+
+import random
+import threading
+import time
+import warnings
+
+from embedding_agent import EmbeddingAgent
+
+DIM = EmbeddingAgent.COHERE_EMBED_DIM
+
+class FakeCohere:
+    """Cohere-shaped client: the first component of each vector encodes its text."""
+
+    class Response:
+        def __init__(self, embeddings):
+            self.embeddings = embeddings
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def embed(self, model, texts, input_type):
+        with self.lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(random.uniform(0, self.delay))
+            if any("boom" in text for text in texts):
+                raise ValueError("bad input")
+            return self.Response([[float(len(text))] + [0.0] * (DIM - 1) for text in texts])
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+def make_agent(delay: float = 0.0, **kwargs) -> EmbeddingAgent:
+    agent = EmbeddingAgent("test", **kwargs)
+    agent.cohere_client = FakeCohere(delay)
+    return agent
+
+def aligned(batches, results) -> bool:
+    return len(batches) == len(results) and all(
+        [vector[0] for vector in result] == [float(len(text)) for text in batch]
+        for batch, result in zip(batches, results)
+    )
+
+def run_tests():
+    """
+    Run all test cases and report results.
+    """
+    passed = 0
+    failed = 0
+
+    def check(name: str, ok: bool, detail: str = ""):
+        nonlocal passed, failed
+        if ok:
+            passed += 1
+        else:
+            failed += 1
+        print(f"[{'PASS' if ok else 'FAIL'}] {name}{f' ({detail})' if detail else ''}")
+
+    rng = random.Random(5)
+    batches = [[f"text {i}-{j}" + "x" * rng.randint(0, 40) for j in range(rng.randint(1, 6))] for i in range(40)]
+
+    # Ordering
+    with make_agent(delay=0.02, max_workers=8) as agent:
+        results = agent.batch_get_embeddings(batches)
+        check("batches returned in input order", aligned(batches, results) and not results.failed)
+        check("batches run in parallel", agent.cohere_client.max_in_flight > 1,
+              f"max {agent.cohere_client.max_in_flight} in flight")
+
+    # Failed and partial batches
+    with make_agent() as agent:
+        partial = [f"ok {i}" for i in range(32)] + ["boom"] * 8
+        mixed = [["a", "bb"], ["boom"], partial, ["cccc"]]
+        results = agent.batch_get_embeddings(mixed)
+        check("failed batch reported with its reason",
+              1 in results.failed and results[1] == [[]] and bool(results.errors.get(1)), str(results.errors))
+        check("partial batch reported with the missing texts",
+              2 in results.failed and results[2][32:] == [[]] * 8 and "32" in results.errors[2], str(results.errors))
+        check("good batches unaffected",
+              results.failed == [1, 2] and aligned([mixed[0], mixed[3]], [results[0], results[3]]))
+
+    # Back-pressure
+    with make_agent(delay=0.02, max_workers=8, max_in_flight=2) as agent:
+        results = agent.batch_get_embeddings(batches[:12])
+        check("max_in_flight bounds running batches", agent.cohere_client.max_in_flight <= 2 and aligned(batches[:12], results),
+              f"max {agent.cohere_client.max_in_flight} in flight")
+        agent.cohere_client.max_in_flight = 0
+        agent.batch_get_embeddings(batches[:12], max_in_flight=1)
+        check("per-call max_in_flight override", agent.cohere_client.max_in_flight == 1)
+
+    # Lazy validation
+    with make_agent() as agent:
+        check("no request at construction", agent.cohere_client.calls == 0 and not agent.validated)
+        agent.warmup()
+        agent.warmup()
+        check("warmup validates once", agent.validated and agent.cohere_client.calls == 1)
+    with make_agent() as agent:
+        future = agent.warmup(background=True)
+        future.result(timeout=5)
+        check("background warmup returns a future", agent.validated)
+    with make_agent() as agent:
+        agent.get_embedding("first real request")
+        check("first real response validates the connection", agent.validated and agent.cohere_client.calls == 1)
+
+    # Deprecated keyword
+    with make_agent() as agent:
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            results = agent.batch_get_embeddings(batches[:3], max_workers=4)
+        check("max_workers accepted with a deprecation warning",
+              aligned(batches[:3], results) and any(issubclass(w.category, DeprecationWarning) for w in caught))
+
+    # Print summary
+    total = passed + failed
+    print(f"\nTest Summary: {passed}/{total} passed ({passed/total*100:.1f}%)")
+    if failed > 0:
+        print(f"❌ {failed} tests failed")
+    else:
+        print("✅ All tests passed!")
+    return failed == 0
+
+if __name__ == "__main__":
+    run_tests()
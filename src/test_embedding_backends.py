@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test Embedding Backends
+
+This script checks the static backend against a tiny in-test vocabulary
+(output shape, L2 normalization, mean pooling, out-of-vocabulary words and
+empty texts), and that the ONNX backend stays within ONNX_COSINE_TOLERANCE of
+the torch embedding of the same text. The ONNX check needs onnxruntime,
+sentence-transformers and an exported model (see ``python embedding_backends.py
+export``); each part is skipped when what it needs is missing.
+"""
+
+import importlib.util
+import os
+import tempfile
+
+import numpy as np
+
+from embedding_backends import (DEFAULT_MODEL, ONNX_COSINE_TOLERANCE, ONNX_MODEL_FILE, STATIC_VECTORS_FILE,
+                                load_model, model_key)
+
+VOCAB = ["[UNK]", "python", "data", "intern", "sql", "react", "marketing"]
+STATIC_DIM = 8
+
+SAMPLE_TEXTS = [
+    "Software engineering intern working on Python backend services",
+    "Data science internship: SQL, pandas and machine learning models",
+    "Frontend developer intern with React and TypeScript",
+    "Summer research assistant in computational biology",
+    "Marketing intern for social media campaigns",
+    "",
+]
+
+def write_static_model(model_dir: str) -> np.ndarray:
+    """Save a WordLevel tokenizer over VOCAB and a random float16 token table; returns the table."""
+    from tokenizers import Tokenizer
+    from tokenizers.models import WordLevel
+    from tokenizers.pre_tokenizers import Whitespace
+
+    tokenizer = Tokenizer(WordLevel({token: i for i, token in enumerate(VOCAB)}, unk_token="[UNK]"))
+    tokenizer.pre_tokenizer = Whitespace()
+    tokenizer.save(os.path.join(model_dir, "tokenizer.json"))
+    table = np.random.default_rng(13).standard_normal((len(VOCAB), STATIC_DIM)).astype(np.float16)
+    np.save(os.path.join(model_dir, STATIC_VECTORS_FILE), table)
+    return table.astype(np.float32)
+
+def unit(vector: np.ndarray) -> np.ndarray:
+    return vector / np.linalg.norm(vector)
+
+def run_tests():
+    """
+    Run all test cases and report results.
+    """
+    passed = 0
+    failed = 0
+
+    def check(name: str, ok: bool, detail: str = ""):
+        nonlocal passed, failed
+        if ok:
+            passed += 1
+        else:
+            failed += 1
+        print(f"[{'PASS' if ok else 'FAIL'}] {name}{f' ({detail})' if detail else ''}")
+
+    def skip(name: str, reason: str):
+        print(f"[SKIP] {name} ({reason})")
+
+    # Static backend on a tiny vocabulary
+    if importlib.util.find_spec("tokenizers") is None:
+        skip("static backend", "tokenizers not installed")
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            table = write_static_model(tmp)
+            os.environ["EMBEDDING_STATIC_DIR"] = tmp
+            model = load_model(model_key("tiny", "static"))
+            texts = ["python data intern", "sql", "react react marketing", "quantum", "", "python quantum"]
+            vectors = model.encode(texts, batch_size=4)
+            check("static encode returns one row per text", vectors.shape == (len(texts), STATIC_DIM)
+                  and vectors.dtype == np.float32, str(vectors.shape))
+            check("static rows are L2-normalized", np.allclose(np.linalg.norm(vectors[[0, 1, 2, 3, 5]], axis=1), 1.0, atol=1e-5))
+            check("static vector is the normalized mean of its token rows",
+                  np.allclose(vectors[0], unit(table[[1, 2, 3]].mean(axis=0)), atol=1e-5)
+                  and np.allclose(vectors[2], unit(table[[5, 5, 6]].mean(axis=0)), atol=1e-5))
+            check("out-of-vocabulary words use the [UNK] row",
+                  np.allclose(vectors[3], unit(table[0]), atol=1e-5)
+                  and np.allclose(vectors[5], unit(table[[1, 0]].mean(axis=0)), atol=1e-5))
+            check("empty text gives a zero row, not NaN", not np.isnan(vectors).any() and not vectors[4].any())
+            check("batch size does not change the vectors", np.allclose(model.encode(texts, batch_size=1), vectors))
+            check("single string accepted", np.allclose(model.encode("sql"), vectors[1:2]))
+            del model
+            os.environ.pop("EMBEDDING_STATIC_DIR")
+
+    # ONNX parity with torch
+    onnx_dir = os.getenv("EMBEDDING_ONNX_DIR", os.path.join("models", f"{DEFAULT_MODEL}-onnx"))
+    missing = [module for module in ("onnxruntime", "tokenizers", "sentence_transformers")
+               if importlib.util.find_spec(module) is None]
+    if missing:
+        skip("ONNX embeddings match torch within tolerance", f"{', '.join(missing)} not installed")
+    elif not os.path.exists(os.path.join(onnx_dir, ONNX_MODEL_FILE)):
+        skip("ONNX embeddings match torch within tolerance", f"no exported model in {onnx_dir}")
+    else:
+        reference = np.asarray(load_model(model_key(DEFAULT_MODEL, "torch")).encode(
+            SAMPLE_TEXTS, normalize_embeddings=True), dtype=np.float32)
+        onnx = load_model(model_key(DEFAULT_MODEL, "onnx")).encode(SAMPLE_TEXTS)
+        cosines = np.sum(reference * onnx, axis=1)
+        check("ONNX embeddings match torch within tolerance", cosines.min() >= 1 - ONNX_COSINE_TOLERANCE,
+              f"min cosine {cosines.min():.4f}")
+        check("ONNX rows are L2-normalized", np.allclose(np.linalg.norm(onnx, axis=1), 1.0, atol=1e-4))
+
+    # Print summary
+    total = passed + failed
+    if total == 0:
+        print("\nTest Summary: all tests skipped")
+        return True
+    print(f"\nTest Summary: {passed}/{total} passed ({passed/total*100:.1f}%)")
+    if failed > 0:
+        print(f"❌ {failed} tests failed")
+    else:
+        print("✅ All tests passed!")
+    return failed == 0
+
+if __name__ == "__main__":
+    run_tests()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Test Embedding Cache
+
+This script checks EmbeddingCache: lookups hit on normalized text and miss
+per provider/model, get_or_compute only embeds the misses, entries survive a
+reopen, LRU eviction drops the least recently used vectors, and compaction
+keeps every surviving vector readable, including after a compaction that
+failed before its commit or left a stray vector file behind.
+"""
+
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from embedding_cache import EmbeddingCache
+
+DIM = 16
+
+def vector(i: int) -> np.ndarray:
+    return np.random.default_rng(i).standard_normal(DIM).astype(np.float32)
+
+def run_tests():
+    """
+    Run all test cases and report results.
+    """
+    passed = 0
+    failed = 0
+
+    def check(name: str, ok: bool, detail: str = ""):
+        nonlocal passed, failed
+        if ok:
+            passed += 1
+        else:
+            failed += 1
+        print(f"[{'PASS' if ok else 'FAIL'}] {name}{f' ({detail})' if detail else ''}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Hits and misses
+        cache = EmbeddingCache(tmp)
+        cache.put_many("cohere", "embed-v3", ["Python  developer", "Data intern"], [vector(1), vector(2)])
+        hits = cache.get_many("cohere", "embed-v3", ["Python developer ", "Data intern", "Unknown"])
+        check("hit on normalized text, miss on unknown text",
+              np.array_equal(hits[0], vector(1)) and np.array_equal(hits[1], vector(2)) and hits[2] is None)
+        check("other provider or model misses",
+              cache.get("openai", "embed-v3", "Data intern") is None and cache.get("cohere", "embed-v2", "Data intern") is None)
+        check("hit rate counted per lookup", cache.stats['hits'] == 2 and cache.stats['misses'] == 3, str(cache.stats))
+
+        computed = []
+        def compute(texts):
+            computed.append(list(texts))
+            return [vector(100 + len(text)) for text in texts]
+        results = cache.get_or_compute("cohere", "embed-v3", ["Data intern", "ML intern", "QA"], compute)
+        check("get_or_compute embeds only the misses in one call",
+              computed == [["ML intern", "QA"]] and np.array_equal(results[0], vector(2))
+              and np.array_equal(results[2], vector(102)))
+        cache.close()
+
+        reopened = EmbeddingCache(tmp)
+        check("entries survive a reopen", reopened.get_stats()['entries'] == 4
+              and np.array_equal(reopened.get("cohere", "embed-v3", "ML intern"), vector(109)))
+        reopened.close()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # LRU eviction and compaction
+        cache = EmbeddingCache(tmp, max_bytes=10 * DIM * 4)
+        for i in range(10):
+            cache.put("local", "mini", f"text {i}", vector(i))
+            time.sleep(0.002)
+        cache.get("local", "mini", "text 0")
+        cache.put("local", "mini", "text 10", vector(10))
+        kept = cache.get_many("local", "mini", [f"text {i}" for i in range(11)])
+        check("least recently used entries evicted first",
+              kept[0] is not None and kept[1] is None and kept[10] is not None
+              and cache.stats['evictions'] >= 1, str(cache.stats))
+
+        for i in range(11, 40):
+            cache.put("local", "mini", f"text {i}", vector(i))
+            time.sleep(0.002)
+        live = {i: v for i, v in enumerate(cache.get_many("local", "mini", [f"text {i}" for i in range(40)])) if v is not None}
+        check("compaction keeps surviving vectors readable",
+              cache.stats['compactions'] >= 1 and all(np.array_equal(v, vector(i)) for i, v in live.items())
+              and os.path.getsize(cache.vectors_file) == cache.get_stats()['live_bytes'], str(cache.get_stats()))
+        files = sorted(name for name in os.listdir(tmp) if name.startswith("vectors"))
+        check("only the current vector file kept", files == [os.path.basename(cache.vectors_file)], str(files))
+        cache.close()
+
+        reopened = EmbeddingCache(tmp, max_bytes=10 * DIM * 4)
+        again = reopened.get_many("local", "mini", [f"text {i}" for i in live])
+        check("compacted cache reopens with the same vectors",
+              all(np.array_equal(v, vector(i)) for i, v in zip(live, again)))
+
+        # Compaction that fails before its commit
+        current = reopened.vectors_file
+        reopened.conn.execute("CREATE TEMP TRIGGER stuck BEFORE UPDATE ON embeddings "
+                              "BEGIN SELECT RAISE(ABORT, 'database is locked'); END")
+        reopened._compact()
+        reopened.conn.execute("DROP TRIGGER stuck")
+        again = reopened.get_many("local", "mini", [f"text {i}" for i in live])
+        check("failed compaction keeps the old file and offsets",
+              reopened.vectors_file == current and all(np.array_equal(v, vector(i)) for i, v in zip(live, again))
+              and [name for name in os.listdir(tmp) if name.startswith("vectors")] == [os.path.basename(current)])
+        reopened.close()
+
+        # Crash after writing a new file but before the commit
+        with open(os.path.join(tmp, "vectors.99.f32"), "wb") as f:
+            f.write(b"\x00" * 64)
+        recovered = EmbeddingCache(tmp)
+        again = recovered.get_many("local", "mini", [f"text {i}" for i in live])
+        check("stray vector file from an interrupted compaction ignored and removed",
+              recovered.vectors_file == current and not os.path.exists(os.path.join(tmp, "vectors.99.f32"))
+              and all(np.array_equal(v, vector(i)) for i, v in zip(live, again)))
+        recovered.close()
+
+    # Print summary
+    total = passed + failed
+    print(f"\nTest Summary: {passed}/{total} passed ({passed/total*100:.1f}%)")
+    if failed > 0:
+        print(f"❌ {failed} tests failed")
+    else:
+        print("✅ All tests passed!")
+    return failed == 0
+
+if __name__ == "__main__":
+    run_tests()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test Hedging
+
+This script checks MultiAgentAI's opt-in request hedging with simulated
+providers: a call that outlives the leader's rolling p90 is duplicated to the
+next provider, the first answer wins, hedges stay within the budget (and are
+not charged when no backup can be started), and hedging is off unless enabled.
+"""
+
+import os
+import tempfile
+import time
+
+# Keep the test's responses out of the real caches
+os.environ["EMBEDDING_CACHE_DIR"] = tempfile.mkdtemp(prefix="embedding_cache_")
+os.environ["RESPONSE_CACHE_DIR"] = tempfile.mkdtemp(prefix="response_cache_")
+
+from ai_agents import MultiAgentAI
+
+KEYS = {'openai_api_key': 'test', 'gemini_api_key': 'test', 'cohere_api_key': 'test',
+        'groq_api_key': 'test', 'openrouter_api_key': 'test'}
+
+def simulated(ai: MultiAgentAI, provider: str, delay: float, task: str = 'job_analysis'):
+    """Attempt that sleeps ``delay`` seconds and reports to the router like a real call."""
+    def attempt():
+        start = time.perf_counter()
+        time.sleep(delay)
+        ai.router.record(task, provider, time.perf_counter() - start, ok=True)
+        return provider
+    return attempt
+
+def run_tests():
+    """
+    Run all test cases and report results.
+    """
+    passed = 0
+    failed = 0
+
+    def check(name: str, ok: bool, detail: str = ""):
+        nonlocal passed, failed
+        if ok:
+            passed += 1
+        else:
+            failed += 1
+        print(f"[{'PASS' if ok else 'FAIL'}] {name}{f' ({detail})' if detail else ''}")
+
+    ai = MultiAgentAI({**KEYS, 'llm_hedging': True, 'hedge_budget_ratio': 0.1})
+    for _ in range(10):
+        ai._route('job_analysis', {'groq': simulated(ai, 'groq', 0.02), 'gemini': simulated(ai, 'gemini', 0.03)}, dict)
+    check("no hedging while calls stay under p90", ai.get_hedge_stats()['hedged'] == 0)
+
+    start = time.perf_counter()
+    provider, _ = ai._route('job_analysis', {'groq': simulated(ai, 'groq', 1.0), 'gemini': simulated(ai, 'gemini', 0.03)}, dict)
+    elapsed = time.perf_counter() - start
+    stats = ai.get_hedge_stats()
+    check("slow call hedged to the next provider", stats['hedged'] == 1 and provider == 'gemini', str(stats))
+    check("first answer wins without waiting for the loser", elapsed < 0.3, f"{elapsed:.2f}s")
+
+    for _ in range(5):
+        ai._route('job_analysis', {'groq': simulated(ai, 'groq', 0.3), 'gemini': simulated(ai, 'gemini', 0.03)}, dict)
+    stats = ai.get_hedge_stats()
+    check("hedges capped by the budget", stats['hedged'] <= 0.1 * stats['calls'] + 1 and stats['over_budget'] > 0,
+          str(stats))
+
+    def failing():
+        raise RuntimeError("provider down")
+    provider, _ = ai._route('job_analysis', {'groq': failing, 'gemini': simulated(ai, 'gemini', 0.01)}, dict)
+    check("failed leader still falls back", provider == 'gemini')
+
+    guarded = MultiAgentAI({**KEYS, 'llm_hedging': True, 'hedge_budget_ratio': 0.5})
+    for _ in range(10):
+        guarded._route('job_analysis', {'groq': simulated(guarded, 'groq', 0.02), 'gemini': simulated(guarded, 'gemini', 0.03)}, dict)
+    slow = simulated(guarded, 'groq', 0.3)
+    def backup_trips():
+        # The backup's breaker opens after the route was ordered, while the leader is in flight
+        for _ in range(guarded.router.failure_threshold):
+            guarded.router.record('job_analysis', 'gemini', 0.01, ok=False)
+        return slow()
+    before = guarded.get_hedge_stats()
+    provider, _ = guarded._route('job_analysis', {'groq': backup_trips, 'gemini': simulated(guarded, 'gemini', 0.01)}, dict)
+    after = guarded.get_hedge_stats()
+    check("budget not charged when the only backup's circuit is open",
+          provider == 'groq' and after['hedged'] == before['hedged'] == 0
+          and after['over_budget'] == before['over_budget'], str(after))
+
+    plain = MultiAgentAI(KEYS)
+    for _ in range(10):
+        plain._route('job_analysis', {'groq': simulated(plain, 'groq', 0.01), 'gemini': simulated(plain, 'gemini', 0.01)}, dict)
+    provider, _ = plain._route('job_analysis', {'groq': simulated(plain, 'groq', 0.2), 'gemini': simulated(plain, 'gemini', 0.01)}, dict)
+    check("hedging is opt-in", provider == 'groq' and plain.get_hedge_stats()['calls'] == 0)
+
+    # Print summary
+    total = passed + failed
+    print(f"\nTest Summary: {passed}/{total} passed ({passed/total*100:.1f}%)")
+    if failed > 0:
+        print(f"❌ {failed} tests failed")
+    else:
+        print("✅ All tests passed!")
+    return failed == 0
+
+if __name__ == "__main__":
+    run_tests()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Test HTTP Clients
+
+This script checks the pooled provider sessions against a local stand-in
+server: connections are reused across requests, the pool bounds concurrent
+connections (and the wait for a slot is recorded), a hung response is
+cut off by the read timeout, and OpenAI cover letters use the pooled session.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+# Keep the test's responses out of the real caches
+os.environ["EMBEDDING_CACHE_DIR"] = tempfile.mkdtemp(prefix="embedding_cache_")
+os.environ["RESPONSE_CACHE_DIR"] = tempfile.mkdtemp(prefix="response_cache_")
+
+from ai_agents import MultiAgentAI
+from http_clients import ProviderSession
+
+class StandInServer(BaseHTTPRequestHandler):
+    """Keep-alive JSON endpoint; /slow sleeps, /hang never answers in time."""
+    protocol_version = "HTTP/1.1"
+    client_ports = set()
+    in_flight = 0
+    max_in_flight = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        cls = type(self)
+        with cls.lock:
+            cls.client_ports.add(self.client_address[1])
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+        if self.path == "/slow":
+            time.sleep(0.1)
+        elif self.path == "/hang":
+            time.sleep(2)
+        with cls.lock:
+            cls.in_flight -= 1
+
+        if self.path.endswith("/chat/completions"):
+            payload = json.dumps({'choices': [{'message': {'role': 'assistant', 'content': "Dear team"}}]}).encode()
+        else:
+            payload = json.dumps({'ok': True}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+def run_tests():
+    """
+    Run all test cases and report results.
+    """
+    passed = 0
+    failed = 0
+
+    def check(name: str, ok: bool, detail: str = ""):
+        nonlocal passed, failed
+        if ok:
+            passed += 1
+        else:
+            failed += 1
+        print(f"[{'PASS' if ok else 'FAIL'}] {name}{f' ({detail})' if detail else ''}")
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInServer)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    session = ProviderSession("stand-in", pool_size=2, connect_timeout=1, read_timeout=0.5)
+    for _ in range(10):
+        session.post(f"{base}/fast", json={'q': 1}).raise_for_status()
+    check("sequential requests reuse one connection", len(StandInServer.client_ports) == 1,
+          f"{len(StandInServer.client_ports)} connections")
+
+    StandInServer.client_ports.clear()
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        list(pool.map(lambda _: session.post(f"{base}/slow", json={}).raise_for_status(), range(6)))
+    stats = session.get_stats()
+    check("pool bounds concurrent connections", StandInServer.max_in_flight <= 2 and len(StandInServer.client_ports) <= 2,
+          f"max {StandInServer.max_in_flight} in flight")
+    check("pool wait is recorded", stats['pool_wait_p90_ms'] >= 90, f"p90 wait {stats['pool_wait_p90_ms']}ms")
+    check("latency includes pool wait", stats['p90_ms'] >= stats['pool_wait_p90_ms'] + 90, json.dumps(stats))
+
+    start = time.perf_counter()
+    try:
+        session.post(f"{base}/hang", json={})
+        timed_out = False
+    except requests.Timeout:
+        timed_out = True
+    elapsed = time.perf_counter() - start
+    check("read timeout stops a hung request", timed_out and elapsed < 1.5, f"{elapsed:.2f}s")
+    check("timeouts are counted", session.get_stats()['timeouts'] == 1)
+
+    session.close()
+
+    ai = MultiAgentAI({
+        'openai_api_key': 'test', 'gemini_api_key': 'test', 'cohere_api_key': 'test',
+        'groq_api_key': 'test', 'openrouter_api_key': 'test',
+    })
+    ai.openai_base_url = f"{base}/v1"
+    before = ai.http['openai'].get_stats()['requests']
+    letter = ai._cover_letter_openai("Backend intern", {'skills': ['python']}, "Acme", "Intern", bypass_cache=True)
+    check("OpenAI cover letters use the pooled session",
+          letter == "Dear team" and ai.http['openai'].get_stats()['requests'] == before + 1)
+
+    server.shutdown()
+
+    # Print summary
+    total = passed + failed
+    print(f"\nTest Summary: {passed}/{total} passed ({passed/total*100:.1f}%)")
+    if failed > 0:
+        print(f"❌ {failed} tests failed")
+    else:
+        print("✅ All tests passed!")
+    return failed == 0
+
+if __name__ == "__main__":
+    run_tests()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Test Job Cache
+
+This script checks JobCache persistence: IDs survive a reopen through the
+journal and the compacted snapshot, a torn journal append is recovered without
+losing later IDs, and the legacy JSON list file is migrated. The Bloom-filter
+mode must answer exactly like the in-memory set, also after runs that wrote
+the cache with the filter turned off, and entries past the TTL
+stop counting as seen and are evicted by compaction.
+"""
+
+import json
+import os
+import tempfile
+import time
+
+from job_cache import JobCache
+
+def add_at(cache: JobCache, job_id: str, first_seen: float):
+    """Record ``job_id`` as first seen at ``first_seen`` (epoch seconds)."""
+    cache._remember(job_id, first_seen)
+    cache._append([job_id], first_seen)
+
+def run_tests():
+    """
+    Run all test cases and report results.
+    """
+    passed = 0
+    failed = 0
+
+    def check(name: str, ok: bool, detail: str = ""):
+        nonlocal passed, failed
+        if ok:
+            passed += 1
+        else:
+            failed += 1
+        print(f"[{'PASS' if ok else 'FAIL'}] {name}{f' ({detail})' if detail else ''}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Journal and snapshot
+        path = os.path.join(tmp, "journal", "job_cache.json")
+        os.makedirs(os.path.dirname(path))
+        cache = JobCache(path)
+        added = cache.add_many(["a", "b", "a", None, "c"])
+        cache.add("b")
+        check("add_many counts only new IDs", added == 3)
+        reopened = JobCache(path)
+        check("journal replayed on reopen", all(reopened.exists(job_id) for job_id in "abc")
+              and not reopened.exists("d"))
+
+        path = os.path.join(tmp, "compact", "job_cache.json")
+        os.makedirs(os.path.dirname(path))
+        cache = JobCache(path, compact_threshold=200)
+        for i in range(50):
+            cache.add(f"job-{i}")
+        check("journal compacted past the threshold",
+              cache.stats['compactions'] > 0 and os.path.getsize(cache.journal_file) < 200)
+        reopened = JobCache(path)
+        check("snapshot plus journal hold every ID", all(reopened.exists(f"job-{i}") for i in range(50))
+              and len(reopened.jobs) == 50)
+
+        # Torn append
+        path = os.path.join(tmp, "torn", "job_cache.json")
+        os.makedirs(os.path.dirname(path))
+        JobCache(path).add_many(["a", "b"])
+        with open(os.path.join(tmp, "torn", "job_cache.journal"), "a", encoding="utf-8") as f:
+            f.write('"half-writ')
+        recovered = JobCache(path)
+        recovered.add("after-crash")
+        reopened = JobCache(path)
+        check("torn journal append does not swallow the next ID",
+              reopened.exists("a") and reopened.exists("b") and reopened.exists("after-crash")
+              and not reopened.exists("half-writ"))
+
+        # Legacy JSON list
+        path = os.path.join(tmp, "legacy", "job_cache.json")
+        os.makedirs(os.path.dirname(path))
+        with open(path, "w") as f:
+            json.dump(["x", "y", "x"], f)
+        before = time.time()
+        migrated = JobCache(path)
+        check("legacy list migrated to a snapshot",
+              migrated.exists("x") and migrated.exists("y") and os.path.exists(migrated.snapshot_file)
+              and os.path.exists(path))
+        check("migrated IDs count as first seen at migration time", migrated.first_seen("x") >= int(before))
+        migrated.add("z")
+        reopened = JobCache(path)
+        check("migration runs once", all(reopened.exists(job_id) for job_id in "xyz") and len(reopened.jobs) == 3)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Bloom-filter mode
+        path = os.path.join(tmp, "job_cache.json")
+        exact = JobCache(os.path.join(tmp, "exact.json"), compact_threshold=4096)
+        bloom = JobCache(path, compact_threshold=4096, probabilistic=True, expected_items=500)
+        seen = [f"https://jobs.example.com/{i}" for i in range(2000)]
+        for start in range(0, len(seen), 100):
+            exact.add_many(seen[start:start + 100])
+            bloom.add_many(seen[start:start + 100])
+        unseen = [f"https://jobs.example.com/other/{i}" for i in range(2000)]
+        check("Bloom mode has no false negatives", all(bloom.exists(job_id) for job_id in seen))
+        check("Bloom hits confirmed against the snapshot", not any(bloom.exists(job_id) for job_id in unseen))
+        check("Bloom mode matches the exact set",
+              all(bloom.exists(job_id) == exact.exists(job_id) for job_id in seen[::7] + unseen[::7]))
+        check("filter grown past its expected size", bloom._bloom.capacity >= len(seen),
+              f"capacity {bloom._bloom.capacity}")
+        bloom.close()
+
+        reopened = JobCache(path, probabilistic=True, expected_items=500)
+        check("Bloom filter reused on reopen", not reopened._bloom.fresh and all(reopened.exists(job_id) for job_id in seen))
+        reopened.close()
+        os.remove(os.path.join(tmp, "job_cache.bloom"))
+        rebuilt = JobCache(path, probabilistic=True, expected_items=500)
+        check("missing Bloom filter rebuilt from the snapshot and journal",
+              rebuilt._bloom.fresh and all(rebuilt.exists(job_id) for job_id in seen))
+        rebuilt.close()
+
+        # Toggling JOB_CACHE_BLOOM between runs
+        path = os.path.join(tmp, "toggled.json")
+        first = JobCache(path, probabilistic=True, expected_items=100)
+        first.add("a")
+        first.close()
+        JobCache(path).add("b")
+        reopened = JobCache(path, probabilistic=True, expected_items=100)
+        check("Bloom filter rebuilt after an exact-mode append", reopened.exists("a") and reopened.exists("b"))
+        reopened.add("c")
+        reopened.close()
+        exact_run = JobCache(path)
+        exact_run.add("d")
+        exact_run.compact()
+        reopened = JobCache(path, probabilistic=True, expected_items=100)
+        check("Bloom filter rebuilt after an exact-mode compaction",
+              reopened._bloom.fresh and all(reopened.exists(job_id) for job_id in "abcd"))
+        reopened.close()
+        reopened = JobCache(path, probabilistic=True, expected_items=100)
+        check("up-to-date Bloom filter not rebuilt", not reopened._bloom.fresh and reopened.exists("d"))
+        reopened.close()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # TTL expiry and eviction
+        path = os.path.join(tmp, "job_cache.json")
+        now = time.time()
+        cache = JobCache(path)
+        add_at(cache, "old", now - 1000)
+        add_at(cache, "recent", now - 10)
+        cache.add("fresh")
+        expiring = JobCache(path, ttl_seconds=100)
+        check("entries past the TTL no longer count as seen",
+              not expiring.exists("old") and expiring.exists("recent") and expiring.exists("fresh"))
+        check("compaction on load evicts expired entries",
+              expiring.stats['evicted_last'] == 1 and expiring.first_seen("old") is None, json.dumps(expiring.stats))
+        check("first-seen time kept through compaction", expiring.first_seen("recent") == int(now - 10))
+        expiring.add("old")
+        check("expired ID can be seen again", expiring.exists("old") and expiring.first_seen("old") >= int(now))
+
+        kept = JobCache(path)
+        evicted = kept.expire_before(now - 5)
+        reopened = JobCache(path)
+        check("expire_before evicts and persists", evicted == 1 and not reopened.exists("recent")
+              and reopened.exists("fresh") and reopened.stats['evicted_total'] == 2, json.dumps(reopened.stats))
+
+        path = os.path.join(tmp, "bloom_cache.json")
+        bloom = JobCache(path, probabilistic=True, expected_items=100)
+        add_at(bloom, "old", now - 1000)
+        bloom.add("fresh")
+        evicted = bloom.expire_before(now - 5)
+        check("Bloom mode rebuilt after eviction", evicted == 1 and not bloom.exists("old") and bloom.exists("fresh")
+              and "old" not in bloom._bloom)
+        bloom.close()
+
+    # Print summary
+    total = passed + failed
+    print(f"\nTest Summary: {passed}/{total} passed ({passed/total*100:.1f}%)")
+    if failed > 0:
+        print(f"❌ {failed} tests failed")
+    else:
+        print("✅ All tests passed!")
+    return failed == 0
+
+if __name__ == "__main__":
+    run_tests()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Test Job Embedding Store
+
+This script checks JobEmbeddingStore in both storage formats: postings are
+stored once and survive a reopen, rescore matches a brute-force ranking, a
+torn append (vectors written, rows never committed) is trimmed on open so
+later rows stay aligned (also when an insert fails mid-process), and a changed
+resume re-ranks the open postings.
+"""
+
+import os
+import tempfile
+
+import numpy as np
+
+from job_embedding_store import JobEmbeddingStore
+
+DIM = 64
+
+def make_postings(count: int, start: int = 0):
+    return [{'id': f"job-{i}", 'title': f"Intern {i}", 'company': f"Company {i % 7}",
+             'link': f"https://jobs.example.com/{i}", 'platform': 'linkedin'} for i in range(start, start + count)]
+
+def brute_force(vectors: np.ndarray, query: np.ndarray, top_k: int):
+    cosine = vectors @ query / (np.linalg.norm(vectors, axis=1) * np.linalg.norm(query))
+    return [f"job-{i}" for i in np.argsort(-cosine)[:top_k]]
+
+def run_tests():
+    """
+    Run all test cases and report results.
+    """
+    passed = 0
+    failed = 0
+
+    def check(name: str, ok: bool, detail: str = ""):
+        nonlocal passed, failed
+        if ok:
+            passed += 1
+        else:
+            failed += 1
+        print(f"[{'PASS' if ok else 'FAIL'}] {name}{f' ({detail})' if detail else ''}")
+
+    rng = np.random.default_rng(19)
+    vectors = rng.standard_normal((300, DIM)).astype(np.float32)
+    postings = make_postings(300)
+    resume = rng.standard_normal(DIM).astype(np.float32)
+
+    for fmt in ("float16", "int8"):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = JobEmbeddingStore(tmp, fmt=fmt)
+            added = store.add(postings[:200], vectors[:200])
+            again = store.add(postings[150:300], vectors[150:300])
+            check(f"[{fmt}] postings stored once", added == 200 and again == 100 and len(store) == 300)
+            store.close()
+
+            store = JobEmbeddingStore(tmp, fmt="float16")
+            top = [hit['job_key'] for hit in store.rescore(resume, top_k=10)]
+            expected = brute_force(vectors, resume, 10)
+            check(f"[{fmt}] reopened store keeps its format and rows", store.format == fmt and len(store) == 300)
+            check(f"[{fmt}] rescore matches a brute-force ranking", len(set(top[:5]) & set(expected)) == 5,
+                  f"{top[:5]} vs {expected[:5]}")
+            try:
+                store.add(make_postings(1, start=999), rng.standard_normal((1, DIM + 1)))
+                mismatched = False
+            except ValueError:
+                mismatched = True
+            check(f"[{fmt}] dimension mismatch rejected", mismatched and len(store) == 300)
+            store.close()
+
+            # Torn append: vector bytes written, rows never committed
+            with open(os.path.join(tmp, "vectors.bin"), "ab") as f:
+                f.write(b"\x01" * (DIM + 3))
+            if fmt == "int8":
+                with open(os.path.join(tmp, "scales.bin"), "ab") as f:
+                    f.write(b"\x01" * 6)
+            store = JobEmbeddingStore(tmp)
+            row_bytes = DIM * (1 if fmt == "int8" else 2)
+            check(f"[{fmt}] torn append trimmed on open",
+                  os.path.getsize(store.vectors_file) == 300 * row_bytes
+                  and (fmt != "int8" or os.path.getsize(store.scales_file) == 300 * 4))
+            extra = rng.standard_normal((5, DIM)).astype(np.float32)
+            store.add(make_postings(5, start=300), extra)
+            hit = store.rescore(extra[2], top_k=1)[0]
+            check(f"[{fmt}] rows after recovery stay aligned", hit['job_key'] == "job-302" and hit['score'] > 0.99,
+                  f"{hit['job_key']} {hit['score']:.3f}")
+
+            # Insert fails after the vectors were appended, in the same process
+            store.conn.execute("CREATE TEMP TRIGGER locked BEFORE INSERT ON postings "
+                               "BEGIN SELECT RAISE(ABORT, 'database is locked'); END")
+            try:
+                store.add(make_postings(3, start=400), rng.standard_normal((3, DIM)))
+                raised = False
+            except Exception:
+                raised = True
+            store.conn.execute("DROP TRIGGER locked")
+            check(f"[{fmt}] failed insert rolls back the appended vectors",
+                  raised and len(store) == 305 and os.path.getsize(store.vectors_file) == 305 * row_bytes)
+            with open(store.vectors_file, "ab") as f:
+                f.write(b"\x01" * row_bytes)
+            later = rng.standard_normal((2, DIM)).astype(np.float32)
+            store.add(make_postings(2, start=500), later)
+            hit = store.rescore(later[1], top_k=1)[0]
+            check(f"[{fmt}] next add in the same process stays aligned",
+                  hit['job_key'] == "job-501" and hit['score'] > 0.99, f"{hit['job_key']} {hit['score']:.3f}")
+            store.close()
+
+    # Resume change re-ranking
+    with tempfile.TemporaryDirectory() as tmp:
+        store = JobEmbeddingStore(tmp)
+        store.add(postings, vectors)
+        first = store.rerank_if_resume_changed("Python developer", resume, top_k=5)
+        check("first resume ranks the open postings", [hit['job_key'] for hit in first] == brute_force(vectors, resume, 5))
+        check("unchanged resume skipped", store.rerank_if_resume_changed("  Python   developer ", resume) is None)
+        store.mark_closed([first[0]['job_key']])
+        other = rng.standard_normal(DIM).astype(np.float32)
+        second = store.rerank_if_resume_changed("Python and Go developer", other, top_k=5)
+        expected = [key for key in brute_force(vectors, other, 6) if key != first[0]['job_key']][:5]
+        check("changed resume re-ranks open postings only",
+              [hit['job_key'] for hit in second] == expected, f"{[hit['job_key'] for hit in second]} vs {expected}")
+        stored = store.conn.execute("SELECT score FROM postings WHERE job_key = ?", (second[0]['job_key'],)).fetchone()[0]
+        check("new scores stored on the postings", abs(stored - second[0]['score']) < 1e-6)
+        store.close()
+
+        reopened = JobEmbeddingStore(tmp)
+        open_keys = {hit['job_key'] for hit in reopened.rescore(other, top_k=300, open_only=True)}
+        check("resume hash and closed postings persist across reopen",
+              reopened.rerank_if_resume_changed("Python and Go developer", other) is None
+              and len(open_keys) == 299 and first[0]['job_key'] not in open_keys)
+        reopened.close()
+
+    # Print summary
+    total = passed + failed
+    print(f"\nTest Summary: {passed}/{total} passed ({passed/total*100:.1f}%)")
+    if failed > 0:
+        print(f"❌ {failed} tests failed")
+    else:
+        print("✅ All tests passed!")
+    return failed == 0
+
+if __name__ == "__main__":
+    run_tests()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Test Model Registry
+
+This script runs ModelRegistry with a stand-in loader and checks that models
+load lazily and once, handles share one instance and are reference-counted,
+unload_idle() only drops models nobody holds, and acquire() racing against
+unload_idle() never fails or hands back a model that is being dropped.
+"""
+
+import threading
+import time
+
+from model_registry import ModelRegistry, SharedModel
+
+class StandInModel:
+    def __init__(self, name: str):
+        self.name = name
+
+    def encode(self, texts, batch_size=32):
+        return [[float(len(text))] for text in texts]
+
+class CountingLoader:
+    """Loader that records every load and takes ``delay`` seconds."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.loads = []
+        self.lock = threading.Lock()
+
+    def __call__(self, name: str):
+        time.sleep(self.delay)
+        with self.lock:
+            self.loads.append(name)
+        return StandInModel(name)
+
+def run_tests():
+    """
+    Run all test cases and report results.
+    """
+    passed = 0
+    failed = 0
+
+    def check(name: str, ok: bool, detail: str = ""):
+        nonlocal passed, failed
+        if ok:
+            passed += 1
+        else:
+            failed += 1
+        print(f"[{'PASS' if ok else 'FAIL'}] {name}{f' ({detail})' if detail else ''}")
+
+    # Lazy loading and sharing
+    loader = CountingLoader()
+    registry = ModelRegistry(loader)
+    first, second = SharedModel("mini", registry), SharedModel("mini", registry)
+    check("creating handles loads nothing", loader.loads == [] and not registry.is_loaded("mini"))
+    first.encode(["abc"])
+    second.encode(["de"])
+    check("model loaded once on first use and shared", loader.loads == ["mini"] and first.model is second.model)
+    stats = registry.get_stats()['mini']
+    check("load recorded in stats", stats['loads'] == 1 and stats['refs'] == 2 and stats['loaded'], str(stats))
+
+    # Reference counting and idle unload
+    first.close()
+    check("busy model not unloaded", registry.unload_idle() == 0 and registry.is_loaded("mini"))
+    second.close()
+    second.close()
+    check("double close releases once", registry.get_stats()['mini']['refs'] == 0)
+    check("idle model unloaded", registry.unload_idle() == 1 and not registry.is_loaded("mini"))
+    SharedModel("mini", registry).encode(["again"])
+    check("unloaded model reloaded on next use", loader.loads == ["mini", "mini"]
+          and registry.get_stats()['mini']['loads'] == 2)
+
+    def broken(name):
+        raise OSError("model files missing")
+    failing = SharedModel("missing", ModelRegistry(broken))
+    try:
+        failing.encode(["x"])
+        raised = False
+    except OSError:
+        raised = True
+    check("failed load leaves a falsy handle", raised and not failing)
+
+    # Concurrent first use
+    loader = CountingLoader(delay=0.05)
+    registry = ModelRegistry(loader)
+    models = []
+    threads = [threading.Thread(target=lambda: models.append(registry.acquire("mini"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    check("concurrent first use loads once", loader.loads == ["mini"] and len({id(m) for m in models}) == 1
+          and registry.get_stats()['mini']['refs'] == 8)
+
+    # acquire() racing unload_idle()
+    registry = ModelRegistry(CountingLoader())
+    errors = []
+    stop = threading.Event()
+
+    def unloader():
+        while not stop.is_set():
+            registry.unload_idle()
+
+    def user():
+        for _ in range(2000):
+            try:
+                model = registry.acquire("mini")
+                if registry._models.get("mini") is not model:
+                    errors.append("acquired model was dropped while referenced")
+                registry.release("mini")
+            except Exception as e:
+                errors.append(repr(e))
+
+    background = threading.Thread(target=unloader)
+    background.start()
+    users = [threading.Thread(target=user) for _ in range(4)]
+    for thread in users:
+        thread.start()
+    for thread in users:
+        thread.join()
+    stop.set()
+    background.join()
+    check("acquire never races unload_idle", not errors and registry.get_stats()['mini']['refs'] == 0,
+          f"{len(errors)} errors, first: {errors[:1]}")
+
+    # Print summary
+    total = passed + failed
+    print(f"\nTest Summary: {passed}/{total} passed ({passed/total*100:.1f}%)")
+    if failed > 0:
+        print(f"❌ {failed} tests failed")
+    else:
+        print("✅ All tests passed!")
+    return failed == 0
+
+if __name__ == "__main__":
+    run_tests()
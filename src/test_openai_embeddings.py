@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test OpenAI Embeddings
+
+This script runs MultiAgentAI.generate_embeddings_with_openai against a local
+stand-in for the OpenAI embeddings endpoint and checks batching, ordering,
+concurrency limits and per-item dimension validation.
+"""
+
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Keep the test's vectors out of the real caches
+os.environ["EMBEDDING_CACHE_DIR"] = tempfile.mkdtemp(prefix="embedding_cache_")
+os.environ["RESPONSE_CACHE_DIR"] = tempfile.mkdtemp(prefix="response_cache_")
+
+from ai_agents import MultiAgentAI
+
+BAD_DIMENSION_TEXT = "posting with a broken vector"
+
+class StandInServer(BaseHTTPRequestHandler):
+    """Answers POST /embeddings like OpenAI, with items shuffled and a small delay."""
+    requests_seen = []
+    in_flight = 0
+    max_in_flight = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        cls = type(self)
+        with cls.lock:
+            cls.requests_seen.append(body['input'])
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+        time.sleep(0.05)
+
+        data = []
+        for index, text in enumerate(body['input']):
+            dim = 8 if text == BAD_DIMENSION_TEXT else MultiAgentAI.OPENAI_EMBED_DIM
+            # First component encodes the text so the test can check alignment
+            data.append({'object': 'embedding', 'index': index, 'embedding': [float(len(text))] + [0.0] * (dim - 1)})
+        random.shuffle(data)
+
+        payload = json.dumps({'object': 'list', 'data': data}).encode()
+        with cls.lock:
+            cls.in_flight -= 1
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+def run_tests():
+    """
+    Run all test cases and report results.
+    """
+    passed = 0
+    failed = 0
+
+    def check(name: str, ok: bool, detail: str = ""):
+        nonlocal passed, failed
+        if ok:
+            passed += 1
+        else:
+            failed += 1
+        print(f"[{'PASS' if ok else 'FAIL'}] {name}{f' ({detail})' if detail else ''}")
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInServer)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{server.server_port}"
+
+    ai = MultiAgentAI({
+        'openai_api_key': 'test', 'gemini_api_key': 'test', 'cohere_api_key': 'test',
+        'groq_api_key': 'test', 'openrouter_api_key': 'test', 'openai_embed_concurrency': 3,
+    })
+    # Small token budget so 200 texts need several requests
+    ai.OPENAI_EMBED_BATCH_TOKENS = 2000
+
+    texts = [f"job description {i} " + "python " * random.Random(i).randint(1, 40) for i in range(200)]
+    texts[57] = BAD_DIMENSION_TEXT
+
+    start = time.perf_counter()
+    embeddings = ai.generate_embeddings_with_openai(texts)
+    elapsed = time.perf_counter() - start
+
+    requests_seen = list(StandInServer.requests_seen)
+    check("one result per input", len(embeddings) == len(texts))
+    check("results aligned to input order",
+          all(embeddings[i] and embeddings[i][0] == len(text) for i, text in enumerate(texts) if i != 57))
+    check("wrong-dimension item left empty", embeddings[57] == [])
+    check("batched requests", 1 < len(requests_seen) < len(texts), f"{len(requests_seen)} requests")
+    check("token budget respected",
+          all(sum(ai._estimate_tokens(t) for t in batch) <= ai.OPENAI_EMBED_BATCH_TOKENS for batch in requests_seen))
+    check("bounded concurrency", 1 < StandInServer.max_in_flight <= 3, f"max {StandInServer.max_in_flight} in flight")
+    check("faster than sequential", elapsed < len(requests_seen) * 0.05, f"{elapsed:.2f}s")
+
+    # Everything but the broken item is now cached
+    StandInServer.requests_seen.clear()
+    again = ai.generate_embeddings_with_openai(texts)
+    check("cache hits skip the network",
+          StandInServer.requests_seen == [[BAD_DIMENSION_TEXT]] and again[:57] == embeddings[:57])
+
+    server.shutdown()
+
+    # Print summary
+    total = passed + failed
+    print(f"\nTest Summary: {passed}/{total} passed ({passed/total*100:.1f}%)")
+    if failed > 0:
+        print(f"❌ {failed} tests failed")
+    else:
+        print("✅ All tests passed!")
+    return failed == 0
+
+if __name__ == "__main__":
+    run_tests()
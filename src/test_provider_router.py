@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Test Provider Router
+
+This script checks the circuit breakers and latency-aware ordering in
+provider_router.py, then runs MultiAgentAI.parse_resume against a failing
+local stand-in for Groq to check that traffic moves to Gemini, the Groq
+circuit opens, a half-open probe moves traffic back once Groq recovers, and a
+reply without skills falls through to Gemini instead of being cached.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Keep the test's responses out of the real caches
+os.environ["EMBEDDING_CACHE_DIR"] = tempfile.mkdtemp(prefix="embedding_cache_")
+os.environ["RESPONSE_CACHE_DIR"] = tempfile.mkdtemp(prefix="response_cache_")
+
+from ai_agents import MultiAgentAI
+from provider_router import CLOSED, HALF_OPEN, OPEN, ProviderRouter
+
+class StandInServer(BaseHTTPRequestHandler):
+    """Groq-style /chat/completions that fails with 500 while ``healthy`` is False."""
+    healthy = False
+    requests_seen = 0
+    skills = ['python']
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers['Content-Length']))
+        type(self).requests_seen += 1
+        if type(self).healthy:
+            content = json.dumps({'skills': type(self).skills, 'provider': 'groq'})
+            status, payload = 200, json.dumps({'choices': [{'message': {'content': content}}]}).encode()
+        else:
+            status, payload = 500, b'{"error": "overloaded"}'
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+class FakeGemini:
+    """Answers resume prompts with valid JSON after a short delay."""
+    calls = 0
+
+    class Response:
+        def __init__(self, text):
+            self.text = text
+
+    def generate_content(self, prompt):
+        type(self).calls += 1
+        time.sleep(0.05)
+        return self.Response(json.dumps({'skills': ['python'], 'provider': 'gemini'}))
+
+def run_tests():
+    """
+    Run all test cases and report results.
+    """
+    passed = 0
+    failed = 0
+
+    def check(name: str, ok: bool, detail: str = ""):
+        nonlocal passed, failed
+        if ok:
+            passed += 1
+        else:
+            failed += 1
+        print(f"[{'PASS' if ok else 'FAIL'}] {name}{f' ({detail})' if detail else ''}")
+
+    # Router on its own
+    router = ProviderRouter({'task': ['slow', 'fast']}, failure_threshold=3, cooldown=0.2)
+    check("default order before any measurement", router.order('task') == ['slow', 'fast'])
+    for _ in range(5):
+        router.record('task', 'slow', 0.30, ok=True)
+        router.record('task', 'fast', 0.10, ok=True)
+    check("fastest healthy provider ranked first", router.order('task') == ['fast', 'slow'])
+
+    for _ in range(3):
+        router.record('task', 'fast', 0.10, ok=False)
+    check("circuit opens after repeated failures",
+          router.state('task', 'fast') == OPEN and router.order('task') == ['slow'])
+    time.sleep(0.25)
+    check("open circuit offered again after cooldown", 'fast' in router.order('task'))
+    check("one half-open probe at a time",
+          router.allow('task', 'fast') and router.state('task', 'fast') == HALF_OPEN
+          and not router.allow('task', 'fast'))
+    router.record('task', 'fast', 0.10, ok=False)
+    check("failed probe re-opens the circuit", router.state('task', 'fast') == OPEN)
+    time.sleep(0.25)
+    router.allow('task', 'fast')
+    router.record('task', 'fast', 0.10, ok=True)
+    check("successful probe closes the circuit", router.state('task', 'fast') == CLOSED)
+    stats = router.get_stats()
+    check("breaker transitions exposed as metrics",
+          stats['transitions'] == {'closed->open': 1, 'open->half_open': 2, 'half_open->open': 1,
+                                   'half_open->closed': 1}, json.dumps(stats['transitions']))
+
+    late = ProviderRouter({'task': ['primary', 'backup']}, explore_after=0.2)
+    time.sleep(0.25)
+    first = late.order('task')
+    time.sleep(0.25)
+    check("exploration clock starts at first use, not router creation",
+          first == ['primary', 'backup'] and late.order('task') == ['backup', 'primary']
+          and late.get_stats()['explorations']['task'] == 1)
+
+    # MultiAgentAI against a failing Groq
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInServer)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    ai = MultiAgentAI({
+        'openai_api_key': 'test', 'gemini_api_key': 'test', 'cohere_api_key': 'test',
+        'groq_api_key': 'test', 'openrouter_api_key': 'test',
+        'circuit_failure_threshold': 2, 'circuit_cooldown_seconds': 0.5, 'router_explore_seconds': 0.5,
+    })
+    ai.groq_url = f"http://127.0.0.1:{server.server_port}/chat/completions"
+    ai.gemini_model = FakeGemini()
+
+    results = [ai.parse_resume(f"Resume {i}: Python developer") for i in range(6)]
+    check("failing provider falls back", all(r['provider'] == 'gemini' for r in results))
+    check("failing provider is not retried on every call", StandInServer.requests_seen == 1,
+          f"{StandInServer.requests_seen} requests to Groq for 6 parses")
+
+    time.sleep(0.6)
+    explored = ai.parse_resume("Resume 6: Python developer")
+    check("idle provider re-explored, repeated failure opens its circuit",
+          StandInServer.requests_seen == 2 and explored['provider'] == 'gemini'
+          and ai.router.state('resume_parse', 'groq') == OPEN)
+
+    StandInServer.healthy = True
+    time.sleep(0.6)
+    probe = ai.parse_resume("Resume after recovery")
+    check("half-open probe reaches the recovered provider",
+          StandInServer.requests_seen == 3 and probe['provider'] == 'groq'
+          and ai.router.state('resume_parse', 'groq') == CLOSED, f"probe answered by {probe['provider']}")
+    ai.router.explore_after = 60  # no further exploration of Gemini
+    check("traffic moves to the faster provider", ai.parse_resume("Resume 8")['provider'] == 'groq')
+
+    routing = ai.get_routing_stats()['tasks']['resume_parse']
+    check("routing decisions exposed as metrics",
+          routing['gemini']['routed_first'] >= 5 and routing['groq']['error_rate'] > 0, json.dumps(routing))
+
+    StandInServer.skills = []
+    seen = StandInServer.requests_seen
+    skill_less = ai.parse_resume("Resume 9: no skills listed")
+    cached_groq = ai.response_cache.conn.execute(
+        "SELECT COUNT(*) FROM responses WHERE provider = 'groq' AND response LIKE '%\"skills\": []%'").fetchone()[0]
+    check("reply without skills falls through and is not cached",
+          StandInServer.requests_seen == seen + 1 and skill_less['provider'] == 'gemini' and cached_groq == 0)
+
+    server.shutdown()
+
+    # Print summary
+    total = passed + failed
+    print(f"\nTest Summary: {passed}/{total} passed ({passed/total*100:.1f}%)")
+    if failed > 0:
+        print(f"❌ {failed} tests failed")
+    else:
+        print("✅ All tests passed!")
+    return failed == 0
+
+if __name__ == "__main__":
+    run_tests()
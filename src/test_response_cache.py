@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Test Response Cache
+
+This script runs MultiAgentAI's LLM calls against a local stand-in for the
+Groq chat completions endpoint and checks that repeated prompts are answered
+from the response cache, that the bypass flag re-queries, that unparseable
+answers are not cached, and that TTLs and size-bounded eviction hold.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Keep the test's responses out of the real caches
+os.environ["EMBEDDING_CACHE_DIR"] = tempfile.mkdtemp(prefix="embedding_cache_")
+os.environ["RESPONSE_CACHE_DIR"] = tempfile.mkdtemp(prefix="response_cache_")
+
+from ai_agents import MultiAgentAI
+from response_cache import ResponseCache
+
+BROKEN_RESUME = "resume that makes the model ramble"
+
+class StandInServer(BaseHTTPRequestHandler):
+    """Answers POST /chat/completions like Groq, echoing a JSON object (or prose for BROKEN_RESUME)."""
+    prompts_seen = []
+    lock = threading.Lock()
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        prompt = body['messages'][0]['content']
+        with type(self).lock:
+            type(self).prompts_seen.append(prompt)
+        if BROKEN_RESUME in prompt:
+            content = "Sorry, I cannot help with that."
+        else:
+            content = json.dumps({'skills': ['python'], 'call': len(type(self).prompts_seen)})
+
+        payload = json.dumps({'choices': [{'message': {'role': 'assistant', 'content': content}}]}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+class UnavailableGemini:
+    def generate_content(self, prompt):
+        raise RuntimeError("Gemini is not reachable in tests")
+
+def run_tests():
+    """
+    Run all test cases and report results.
+    """
+    passed = 0
+    failed = 0
+
+    def check(name: str, ok: bool, detail: str = ""):
+        nonlocal passed, failed
+        if ok:
+            passed += 1
+        else:
+            failed += 1
+        print(f"[{'PASS' if ok else 'FAIL'}] {name}{f' ({detail})' if detail else ''}")
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInServer)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    ai = MultiAgentAI({
+        'openai_api_key': 'test', 'gemini_api_key': 'test', 'cohere_api_key': 'test',
+        'groq_api_key': 'test', 'openrouter_api_key': 'test',
+    })
+    ai.groq_url = f"http://127.0.0.1:{server.server_port}/chat/completions"
+    ai.gemini_model = UnavailableGemini()
+
+    first = ai.parse_resume_with_groq("Jane Doe, Python developer")
+    second = ai.parse_resume_with_groq("Jane Doe, Python developer")
+    check("repeat prompt served from cache", len(StandInServer.prompts_seen) == 1 and first == second,
+          f"{len(StandInServer.prompts_seen)} requests")
+
+    refreshed = ai.parse_resume_with_groq("Jane Doe, Python developer", bypass_cache=True)
+    check("bypass flag re-queries", len(StandInServer.prompts_seen) == 2 and refreshed['call'] == 2)
+    check("bypassed response refreshes the cache", ai.parse_resume_with_groq("Jane Doe, Python developer")['call'] == 2)
+
+    ai.analyze_job_description("Backend intern, Python")
+    check("different task and prompt is a miss", len(StandInServer.prompts_seen) == 3)
+
+    ai.parse_resume_with_groq(BROKEN_RESUME)
+    ai.parse_resume_with_groq(BROKEN_RESUME)
+    check("unparseable responses are not cached", len(StandInServer.prompts_seen) == 5)
+
+    stats = ai.response_cache.get_stats()['tasks']
+    check("per-task hit counters", stats['resume_parse']['hits'] == 2 and stats['resume_parse']['bypassed'] == 1
+          and stats['job_analysis']['hits'] == 0, json.dumps(stats))
+
+    check("params are part of the key",
+          ResponseCache.make_key("groq", "m", "p", {'temperature': 0.1})
+          != ResponseCache.make_key("groq", "m", "p", {'temperature': 0.7}))
+
+    cache = ResponseCache(tempfile.mkdtemp(prefix="response_cache_"), max_bytes=1000, ttls={'cover_letter': 0.2})
+    cache.put('cover_letter', 'openai', 'gpt', 'prompt', 'Dear Hiring Manager')
+    check("fresh entry hits", cache.get('cover_letter', 'openai', 'gpt', 'prompt') == 'Dear Hiring Manager')
+    time.sleep(0.3)
+    check("entry expires after its task TTL", cache.get('cover_letter', 'openai', 'gpt', 'prompt') is None
+          and cache.stats['expired'] == 1)
+
+    for i in range(20):
+        cache.put('job_analysis', 'groq', 'm', f"prompt {i}", "x" * 100)
+    check("size-bounded eviction", cache.get_stats()['live_bytes'] <= 1000 and cache.stats['evictions'] > 0
+          and cache.get('job_analysis', 'groq', 'm', "prompt 0") is None
+          and cache.get('job_analysis', 'groq', 'm', "prompt 19") is not None)
+
+    server.shutdown()
+
+    # Print summary
+    total = passed + failed
+    print(f"\nTest Summary: {passed}/{total} passed ({passed/total*100:.1f}%)")
+    if failed > 0:
+        print(f"❌ {failed} tests failed")
+    else:
+        print("✅ All tests passed!")
+    return failed == 0
+
+if __name__ == "__main__":
+    run_tests()
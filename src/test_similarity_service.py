@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Test Similarity Service
+
+This script runs SimilarityService with stand-in embedding providers and
+checks that scores match a brute-force cosine, the first working provider is
+pinned for the run, a failing batch moves whole to the next provider (which
+then stays pinned), the resume is embedded once per provider, and the local
+provider encodes each batch's uncached descriptions in one call.
+"""
+
+import hashlib
+import os
+import tempfile
+
+import numpy as np
+
+# Keep the test's vectors out of the real caches
+os.environ["EMBEDDING_CACHE_DIR"] = tempfile.mkdtemp(prefix="embedding_cache_")
+
+from embedding_cache import cached_encode
+from similarity_service import SimilarityService
+
+class StandInEncoder:
+    """Deterministic vectors per (provider, text); fails while ``down`` is set."""
+
+    def __init__(self, name: str, dim: int):
+        self.name = name
+        self.dim = dim
+        self.down = False
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        if self.down:
+            raise ConnectionError(f"{self.name} unavailable")
+        return [self.vector(text) for text in texts]
+
+    def vector(self, text: str) -> np.ndarray:
+        seed = int.from_bytes(hashlib.sha256(f"{self.name}:{text}".encode()).digest()[:4], "little")
+        return np.random.default_rng(seed).standard_normal(self.dim).astype(np.float32)
+
+class StandInModel:
+    """Local model stand-in that records every encode() call."""
+
+    def __init__(self):
+        self.encoder = StandInEncoder("local-model", 24)
+        self.calls = []
+
+    def encode(self, texts, batch_size=32):
+        self.calls.append(list(texts))
+        return np.array(self.encoder(texts))
+
+class StandInParser:
+    """The part of ResumeParser that SimilarityService.from_components uses."""
+    model_key = "sentence-transformers:stand-in"
+
+    def __init__(self):
+        self.model = StandInModel()
+
+    def encode_texts(self, texts, batch_size=32):
+        return cached_encode(self.model, self.model_key, texts, batch_size=batch_size)
+
+class NoRemoteEmbeddings:
+    """MultiAgentAI stand-in whose remote embedding providers are all down."""
+    COHERE_EMBED_MODEL = "embed-english-v3.0"
+    OPENAI_EMBED_MODEL = "text-embedding-3-small"
+
+    def _embed_with_cohere(self, texts):
+        raise ConnectionError("cohere unavailable")
+
+    def generate_embeddings_with_openai(self, texts):
+        raise ConnectionError("openai unavailable")
+
+def brute_force(encoder: StandInEncoder, resume: str, descriptions) -> np.ndarray:
+    r = encoder.vector(resume)
+    return np.array([(np.dot(r, v) / (np.linalg.norm(r) * np.linalg.norm(v)) + 1) / 2
+                     for v in (encoder.vector(d) for d in descriptions)])
+
+def run_tests():
+    """
+    Run all test cases and report results.
+    """
+    passed = 0
+    failed = 0
+
+    def check(name: str, ok: bool, detail: str = ""):
+        nonlocal passed, failed
+        if ok:
+            passed += 1
+        else:
+            failed += 1
+        print(f"[{'PASS' if ok else 'FAIL'}] {name}{f' ({detail})' if detail else ''}")
+
+    cohere, openai, local = StandInEncoder("cohere", 32), StandInEncoder("openai", 48), StandInEncoder("local", 16)
+    service = SimilarityService({'cohere': cohere, 'openai': openai, 'local': local}, ["cohere", "openai", "local"])
+    resume = "Python developer with SQL and ML coursework"
+    batches = [[f"Posting {b}-{i}: data intern" for i in range(8)] for b in range(4)]
+
+    result = service.score(resume, batches[0])
+    check("scores match a brute-force cosine", result.provider == "cohere"
+          and np.allclose(result.scores, brute_force(cohere, resume, batches[0]), atol=1e-5))
+    check("description vectors returned in the provider's space", result.vectors.shape == (8, 32))
+
+    cohere.down = True
+    result = service.score(resume, batches[1])
+    check("failing batch moves whole to the next provider", result.provider == "openai"
+          and np.allclose(result.scores, brute_force(openai, resume, batches[1]), atol=1e-5))
+    cohere.down = False
+    calls_before = len(cohere.calls)
+    result = service.score(resume, batches[2])
+    check("fallback stays pinned for the rest of the run", result.provider == "openai"
+          and len(cohere.calls) == calls_before and service.get_stats()['fallbacks'] == 1, str(service.get_stats()))
+
+    service.start_run()
+    check("new run goes back to the preferred provider", service.score(resume, batches[3]).provider == "cohere")
+    check("resume embedded once per provider",
+          sum(1 for call in cohere.calls if call == [resume]) == 1 and sum(1 for call in openai.calls if call == [resume]) == 1)
+
+    broken = StandInEncoder("broken", 8)
+    short = SimilarityService({'broken': lambda texts: broken(texts)[:-1], 'local': local}, ["broken", "local"])
+    check("missing vectors trigger the fallback", short.score(resume, batches[0]).provider == "local")
+
+    cohere.down = openai.down = local.down = True
+    service.start_run()
+    try:
+        service.score(resume, ["Posting never scored"])
+        raised = False
+    except RuntimeError:
+        raised = True
+    check("error when every provider fails", raised)
+    calls_before = len(cohere.calls)
+    empty = service.score(resume, [])
+    check("empty batch scores nothing without calling a provider", len(empty.scores) == 0 and len(cohere.calls) == calls_before)
+
+    try:
+        SimilarityService({'cohere': cohere}, ["nope"])
+        rejected = False
+    except ValueError:
+        rejected = True
+    check("unknown provider order rejected", rejected)
+
+    # Local provider built by from_components: one batched encode per batch of misses
+    parser = StandInParser()
+    local_service = SimilarityService.from_components(parser, NoRemoteEmbeddings(), preferred="local", local_batch_size=16)
+    descriptions = [f"Local posting {i}: backend intern" for i in range(20)]
+    result = local_service.score(resume, descriptions)
+    check("local batch scored with one encode call for the descriptions",
+          result.provider == "local" and parser.model.calls == [[resume], descriptions]
+          and np.allclose(result.scores, brute_force(parser.model.encoder, resume, descriptions), atol=1e-5))
+    local_service.score(resume, descriptions[:10] + ["Local posting 20: new"])
+    check("cached descriptions skipped by the next batch", parser.model.calls[2:] == [["Local posting 20: new"]],
+          str(parser.model.calls[2:]))
+    check("empty local batch encodes nothing", len(local_service.score(resume, []).scores) == 0 and len(parser.model.calls) == 3)
+
+    # Print summary
+    total = passed + failed
+    print(f"\nTest Summary: {passed}/{total} passed ({passed/total*100:.1f}%)")
+    if failed > 0:
+        print(f"❌ {failed} tests failed")
+    else:
+        print("✅ All tests passed!")
+    return failed == 0
+
+if __name__ == "__main__":
+    run_tests()